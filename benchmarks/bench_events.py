@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Decoding TTL events and epoching"""
+import numpy as np
+
+from myopy.epochs import Epochs
+from myopy.events import find_events
+
+from .common import SCALES, make_raw
+
+
+class FindEvents:
+    params = SCALES
+    param_names = ['n_times']
+
+    def setup(self, n_times):
+        self.raw = make_raw(n_times)
+
+    def time_find_events(self, n_times):
+        find_events(self.raw)
+
+    def peakmem_find_events(self, n_times):
+        find_events(self.raw)
+
+
+class EpochsFromRaw:
+    params = SCALES
+    param_names = ['n_times']
+
+    def setup(self, n_times):
+        self.raw = make_raw(n_times)
+        self.events = find_events(self.raw)
+
+    def time_epochs(self, n_times):
+        Epochs(self.raw, self.events, event_id=[1, 2, 3, 4, 5, 6], 
+               picks=[0, 1, 2, 3], tmin=0, tmax=5.0)
+
+    def peakmem_epochs(self, n_times):
+        Epochs(self.raw, self.events, event_id=[1, 2, 3, 4, 5, 6], 
+               picks=[0, 1, 2, 3], tmin=0, tmax=5.0)
+
+
+class EpochsFromOnsets:
+    """Onset-locked epochs, one burst every 0.5 s"""
+    params = SCALES
+    param_names = ['n_times']
+
+    def setup(self, n_times):
+        self.raw = make_raw(n_times)
+        self.onsets = np.arange(0, n_times, 1000)
+
+    def time_from_onsets(self, n_times):
+        Epochs.from_onsets(self.raw, self.onsets, picks=[0, 1, 2, 3], 
+                           tmin=-0.1, tmax=0.4)
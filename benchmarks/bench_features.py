@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Feature extraction and onset detection"""
+import numpy as np
+
+from myopy.algorithms.detection import kang_onset_detection
+from myopy.emg.features import features
+from myopy.epochs import Epochs
+from myopy.events import find_events
+
+from .common import SCALES, make_raw
+
+
+class Features:
+    params = SCALES
+    param_names = ['n_times']
+
+    def setup(self, n_times):
+        raw = make_raw(n_times)
+        self.epochs = Epochs(raw, find_events(raw), event_id=[1, 2, 3, 4, 5, 6], 
+                             picks=[0, 1, 2, 3], tmin=0, tmax=5.0)
+
+    def time_features(self, n_times):
+        features(self.epochs)
+
+    def peakmem_features(self, n_times):
+        features(self.epochs)
+
+
+class KangOnsetDetection:
+    # median per sample, smaller scales
+    params = [10 ** 3, 10 ** 4, 5 * 10 ** 4]
+    param_names = ['n_times']
+    timeout = 600
+
+    def setup(self, n_times):
+        self.signal = np.ascontiguousarray(make_raw(n_times)._data[:, 0])
+
+    def time_kang_onset_detection(self, n_times):
+        kang_onset_detection(self.signal, n_train=20, n_guard=4, threshold=1.)
+
+    def peakmem_kang_onset_detection(self, n_times):
+        kang_onset_detection(self.signal, n_train=20, n_guard=4, threshold=1.)
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Import time of the headless modules
+
+Run with asv or directly with ``python benchmarks/bench_import.py``, which 
+fails if ``import myopy.io.tables`` exceeds ``IMPORT_BUDGET`` or pulls in 
+the GUI stack or SciPy.
+"""
+import json
+import subprocess
+import sys
+
+# Budget in s for importing myopy.io.tables in a fresh interpreter
+IMPORT_BUDGET = 1.0
+
+# Modules which must only be imported on demand
+HEAVY_MODULES = ('PyQt5', 'pyqtgraph', 'scipy')
+
+_CODE = """
+import json, sys, time
+t0 = time.perf_counter()
+import {module}
+t1 = time.perf_counter()
+print(json.dumps([t1 - t0, [m for m in {heavy!r} if m in sys.modules]]))
+"""
+
+
+def measure_import(module, repeat=5):
+    """Import a module in fresh interpreters
+    
+
+    Parameters
+    ----------
+    module : str
+        Name of the module.
+    repeat : int, optional
+        Number of interpreters. The default is 5.
+
+    Returns
+    -------
+    duration : float
+        Fastest import time in s.
+    heavy : list of str
+        Heavy modules that were imported as a side effect.
+
+    """
+    durations = []
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, '-c', 
+                              _CODE.format(module=module, heavy=HEAVY_MODULES)], 
+                             check=True, capture_output=True, text=True).stdout
+        duration, heavy = json.loads(out.strip().splitlines()[-1])
+        durations.append(duration)
+    return min(durations), heavy
+
+
+def check_import_budget(module='myopy.io.tables', budget=IMPORT_BUDGET):
+    """Raise a RuntimeError if importing a module is too slow or too heavy"""
+    duration, heavy = measure_import(module)
+    if heavy:
+        raise RuntimeError(f"import {module} imported {', '.join(heavy)}")
+    if duration > budget:
+        raise RuntimeError(f"import {module} took {duration:.3f} s, "
+                           f"budget is {budget:.3f} s")
+    return duration
+
+
+def timeraw_import_myopy():
+    return "import myopy"
+
+
+def timeraw_import_tables():
+    return "import myopy.io.tables"
+
+
+def timeraw_import_epochs():
+    return "import myopy.epochs"
+
+
+def track_heavy_modules_tables():
+    return len(measure_import('myopy.io.tables', repeat=1)[1])
+
+track_heavy_modules_tables.unit = 'modules'
+
+
+if __name__ == '__main__':
+    duration = check_import_budget()
+    print(f"import myopy.io.tables: {duration:.3f} s "
+          f"(budget {IMPORT_BUDGET:.3f} s)")
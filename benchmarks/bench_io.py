@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Reading tables and concatenating Raws"""
+import os
+
+from myopy.io.base import concatenate_raws
+from myopy.io.compressed import read_compressed, write_compressed
+from myopy.io.tables.tables import read_table
+
+from .common import CACHE_DIR, SCALES, TABLE_SCALES, make_raw, make_table
+
+
+class ReadTable:
+    params = TABLE_SCALES
+    param_names = ['n_times']
+    timeout = 600
+
+    def setup_cache(self):
+        for n_times in self.params:
+            make_table(n_times)
+
+    def setup(self, n_times):
+        self.table = make_table(n_times)
+
+    def time_read_table(self, n_times):
+        read_table(**self.table)
+
+    def peakmem_read_table(self, n_times):
+        read_table(**self.table)
+
+
+class ReadTableCached:
+    """Reading a table from its binary sidecar, see myopy.io.cache"""
+    params = TABLE_SCALES
+    param_names = ['n_times']
+    timeout = 600
+
+    def setup_cache(self):
+        for n_times in self.params:
+            read_table(**make_table(n_times), cache=True,
+                       cache_dir=os.path.join(CACHE_DIR, 'sidecars'))
+
+    def setup(self, n_times):
+        self.table = make_table(n_times)
+        self.cache_dir = os.path.join(CACHE_DIR, 'sidecars')
+
+    def time_read_table_cached(self, n_times):
+        read_table(**self.table, cache=True, cache_dir=self.cache_dir)
+
+    def peakmem_read_table_cached(self, n_times):
+        read_table(**self.table, cache=True, cache_dir=self.cache_dir)
+
+
+class Compressed:
+    """Lossless compressed container of a parsed table, see myopy.io.compressed"""
+    params = (TABLE_SCALES, ['zlib', 'lzma'])
+    param_names = ['n_times', 'codec']
+    timeout = 600
+
+    def setup_cache(self):
+        for n_times in self.params[0]:
+            read_table(**make_table(n_times), cache=True,
+                       cache_dir=os.path.join(CACHE_DIR, 'sidecars'))
+
+    def setup(self, n_times, codec):
+        self.raw = read_table(**make_table(n_times), cache=True,
+                              cache_dir=os.path.join(CACHE_DIR, 'sidecars'))
+        self.fname = os.path.join(CACHE_DIR, f"sim-{n_times}-{codec}.myz")
+        self.ratio = write_compressed(self.raw, self.fname, codec=codec)
+
+    def time_write_compressed(self, n_times, codec):
+        write_compressed(self.raw, self.fname, codec=codec)
+
+    def time_read_compressed(self, n_times, codec):
+        read_compressed(self.fname)
+
+    def time_read_compressed_range(self, n_times, codec):
+        # 1 s of data, decompresses at most two chunks
+        read_compressed(self.fname, tmin=2., tmax=3.)
+
+    def track_compression_ratio(self, n_times, codec):
+        return self.ratio
+    track_compression_ratio.unit = 'ratio'
+
+
+class ConcatenateRaws:
+    params = SCALES
+    param_names = ['n_times']
+    # concatenate_raws appends to the first Raw, a fresh list per call
+    number = 1
+    repeat = 5
+
+    def setup(self, n_times):
+        self.raws = [make_raw(n_times // 4) for _ in range(4)]
+
+    def time_concatenate_raws(self, n_times):
+        concatenate_raws(self.raws)
+
+    def peakmem_concatenate_raws(self, n_times):
+        concatenate_raws(self.raws)
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Numba kernels against their NumPy fallbacks
+
+Benchmarks of the 'numba' backend are skipped if Numba is not installed.
+That both backends give the same results is tested in
+``tests/test_kernels.py``.
+"""
+import numpy as np
+
+from myopy import kernels
+from myopy.algorithms.detection import kang_onset_detection
+from myopy.emg.envelope import envelope
+
+from .common import SCALES, make_raw
+
+BACKENDS = ['numpy', 'numba']
+
+
+def _use(backend):
+    try:
+        kernels.set_backend(backend)
+    except RuntimeError:
+        raise NotImplementedError(f'{backend} is not available')
+
+
+class KangOnsetDetectionBackend:
+    params = ([10 ** 4, 10 ** 5], BACKENDS)
+    param_names = ['n_times', 'backend']
+
+    def setup(self, n_times, backend):
+        self.signal = np.ascontiguousarray(make_raw(n_times)._data[:, 0])
+        _use(backend)
+
+    def teardown(self, n_times, backend):
+        kernels.set_backend(None)
+
+    def time_kang_onset_detection(self, n_times, backend):
+        kang_onset_detection(self.signal, n_train=20, n_guard=4, threshold=1.)
+
+
+class EnvelopeBackend:
+    params = (SCALES[:2], BACKENDS)
+    param_names = ['n_times', 'backend']
+
+    def setup(self, n_times, backend):
+        self.data = np.ascontiguousarray(make_raw(n_times)._data[:, :4])
+        _use(backend)
+
+    def teardown(self, n_times, backend):
+        kernels.set_backend(None)
+
+    def time_envelope_rms(self, n_times, backend):
+        envelope(self.data, 'rms', window=200)
+
+    def peakmem_envelope_rms(self, n_times, backend):
+        envelope(self.data, 'rms', window=200)
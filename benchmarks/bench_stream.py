@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Producer and consumer overhead of the real-time ring buffer"""
+import numpy as np
+
+from myopy.events import find_events
+from myopy.stream.buffer import RawStream
+from myopy.stream.sources import ReplaySource
+
+from .common import SFREQ, make_raw
+
+# Samples replayed per benchmark, 10 s at 2 kHz
+N_TIMES = 20000
+
+
+class Push:
+    """Cost of writing one block, the producer overhead per device packet"""
+    params = [1, 32, 512]
+    param_names = ['block_size']
+
+    def setup(self, block_size):
+        raw = make_raw(N_TIMES)
+        self.stream = RawStream(raw.info, buffer_size=10.)
+        self.block = np.ascontiguousarray(raw._data[:block_size])
+
+    def time_push(self, block_size):
+        self.stream.push(self.block)
+
+
+class Latest:
+    """Cost of reading the newest window, the consumer overhead per update"""
+    params = [0.1, 1., 5.]
+    param_names = ['window']
+
+    def setup(self, window):
+        raw = make_raw(N_TIMES)
+        self.stream = RawStream(raw.info, buffer_size=10.)
+        self.stream.push(raw._data)
+
+    def time_get_data(self, window):
+        self.stream.get_data(window)
+
+    def time_to_raw(self, window):
+        self.stream.to_raw(window)
+
+    def time_find_events(self, window):
+        find_events(self.stream.to_raw(window))
+
+
+class Replay:
+    """Throughput of a producer thread with a consumer polling the stream"""
+    params = [32, 512]
+    param_names = ['block_size']
+    number = 1
+    repeat = 5
+
+    def setup(self, block_size):
+        self.raw = make_raw(N_TIMES)
+
+    def time_replay_with_consumer(self, block_size):
+        stream = RawStream(self.raw.info, buffer_size=10.)
+        source = ReplaySource(stream, self.raw, block_size=block_size,
+                              speed=None).start()
+        while source.is_alive():
+            stream.get_data(0.1)
+        source.join()
+        assert stream.n_times == N_TIMES
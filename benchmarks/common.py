@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Shared fixtures of the benchmark suite"""
+import os
+import tempfile
+
+from myopy.simulation import simulate_raw, simulate_table, table_params
+
+SFREQ = 2000.
+
+# Number of samples of in-memory recordings, 4e6 samples at 2 kHz are ~33 min
+SCALES = [10 ** 5, 10 ** 6, 4 * 10 ** 6]
+
+# Parsing text is slow, tables are smaller
+TABLE_SCALES = [10 ** 4, 5 * 10 ** 4, 2 * 10 ** 5]
+
+CACHE_DIR = os.environ.get('MYOPY_BENCH_DIR', 
+                           os.path.join(tempfile.gettempdir(), 'myopy-benchmarks'))
+
+
+def make_table(n_times):
+    """Arguments of read_table for a synthetic table, written once"""
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    fname = os.path.join(CACHE_DIR, f"sim-{n_times}.txt")
+    if not os.path.exists(fname):
+        simulate_table(fname + '.tmp', n_times, sfreq=SFREQ)
+        os.replace(fname + '.tmp', fname)
+    return table_params(fname, sfreq=SFREQ)
+
+
+def make_raw(n_times):
+    """In-memory Raw with 4 EMG and 4 TTL channels"""
+    return simulate_raw(n_times, sfreq=SFREQ)
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Numba kernels of ``myopy.kernels``, imported when Numba is used
+
+Kernels are defined at module level so that ``cache=True`` can store them on
+disk and later processes skip the compilation.
+"""
+import numpy as np
+from numba import njit
+
+
+@njit(cache=True)
+def remove(cells, k, value):
+    i = np.searchsorted(cells[:k], value)
+    for j in range(i, k - 1):
+        cells[j] = cells[j + 1]
+
+
+@njit(cache=True)
+def insert(cells, k, value):
+    i = np.searchsorted(cells[:k], value)
+    for j in range(k, i, -1):
+        cells[j] = cells[j - 1]
+    cells[i] = value
+
+
+@njit(cache=True)
+def cfar(mvgav, n_out, n_side, n_guard, alpha, limit):
+    out = np.zeros(n_out, dtype=np.bool_)
+    first = min(n_side, n_out)
+    last = max(min(n_out, mvgav.size - n_side), 0)
+    k = 2 * (n_side - n_guard)
+    sliding = last > first and k > 0
+
+    for n in range(n_out):
+        if sliding and first <= n < last:
+            continue
+        # slices keep the wrap-around of negative indices of the loop
+        # in kang_onset_detection
+        lower = mvgav[n - n_side:n - n_guard]
+        upper = mvgav[n + n_guard + 1:n + n_side + 1]
+        m = lower.size + upper.size
+        if m == 0:
+            # the median of no cells is nan, no comparison is true
+            continue
+        cells = np.empty(m)
+        cells[:lower.size] = lower
+        cells[lower.size:] = upper
+        cfar_threshold = alpha * np.median(cells)
+        threshold = limit if limit < cfar_threshold else cfar_threshold
+        out[n] = mvgav[n] >= threshold
+
+    if not sliding:
+        return out
+
+    # training cells of the other cells kept sorted, two cells leave and
+    # two enter per step
+    cells = np.empty(k)
+    cells[:k // 2] = mvgav[first - n_side:first - n_guard]
+    cells[k // 2:] = mvgav[first + n_guard + 1:first + n_side + 1]
+    cells.sort()
+    for n in range(first, last):
+        if n > first:
+            remove(cells, k, mvgav[n - 1 - n_side])
+            insert(cells, k - 1, mvgav[n - n_guard - 1])
+            remove(cells, k, mvgav[n + n_guard])
+            insert(cells, k - 1, mvgav[n + n_side])
+        if k % 2:
+            median = cells[k // 2]
+        else:
+            median = (cells[k // 2 - 1] + cells[k // 2]) / 2
+        cfar_threshold = alpha * median
+        threshold = limit if limit < cfar_threshold else cfar_threshold
+        out[n] = mvgav[n] >= threshold
+    return out
+
+
+@njit(cache=True)
+def opening(x):
+    n = x.size
+    eroded = np.zeros(n, dtype=np.bool_)
+    for i in range(1, n - 1):
+        eroded[i] = x[i - 1] and x[i] and x[i + 1]
+    out = np.zeros(n, dtype=np.bool_)
+    for i in range(n):
+        out[i] = eroded[i] or (i > 0 and eroded[i - 1]) or (i < n - 1 and eroded[i + 1])
+    return out
+
+
+@njit(cache=True)
+def trailing_mean(values, tail, n_seen, window, out):
+    n_times, n_chan = values.shape
+    n_tail = tail.shape[0]
+    for c in range(n_chan):
+        total = 0.
+        for i in range(n_tail):
+            total += tail[i, c]
+        for i in range(n_times):
+            total += values[i, c]
+            j = n_tail + i - window
+            if j >= 0:
+                total -= tail[j, c] if j < n_tail else values[j - n_tail, c]
+            out[i, c] = total / min(n_seen + i + 1, window)
+    return out
@@ -3,8 +3,10 @@
 
 
 import numpy as np
-from scipy import ndimage
+from ..profiling import instrument
 
+@instrument('kang_onset_detection', 
+            nbytes=lambda result, signal, *args, **kwargs: np.asarray(signal).nbytes)
 def kang_onset_detection(signal, n_train, n_guard, rate_fa=0.05, threshold=None, 
                          window=5):
     """Determine onsets of EMG pulses using a cell-averaging CFAR algorithm
@@ -37,6 +39,7 @@ def kang_onset_detection(signal, n_train, n_guard, rate_fa=0.05, threshold=None,
 
 
     """
+    from ..kernels import cfar_binarize, binary_opening
     
     n_cells = signal.size
     n_train_per_side = int(np.floor(n_train / 2))
@@ -50,28 +53,48 @@ def kang_onset_detection(signal, n_train, n_guard, rate_fa=0.05, threshold=None,
     alpha = n_train * (np.power(rate_fa, -1/n_train) - 1)
 
     
-    # find onsets
-    binarized_signals = []
-    for n in range(min(n_cells - n_side, mvgav.size)):
-        
-        lower_train = mvgav[n-n_side : n-n_guard_per_side]
-        upper_train = mvgav[n+n_guard_per_side+1: n+n_side+1]
-        training_cells = np.concatenate([lower_train, upper_train])
-        
-        # calculate cfar threshold and modified threshold
-        cfar_threshold = alpha * np.median(training_cells)
-        adaptive_threshold = min(cfar_threshold, threshold * np.std(signal))
-        
-        if mvgav[n] >= adaptive_threshold:
-            binarized_signals.append(1)
-        else:
-            binarized_signals.append(0)
+    # find onsets, compiled with Numba if installed, see myopy.kernels
+    binarized_signals = cfar_binarize(mvgav, min(n_cells - n_side, mvgav.size), n_side, 
+                                      n_guard_per_side, alpha, threshold * np.std(signal))
     
-    eroded_signals = ndimage.binary_erosion(binarized_signals)
-    dilated_signals = ndimage.binary_dilation(eroded_signals)
+    # erosion and dilation
+    dilated_signals = binary_opening(binarized_signals)
     
     onsets = np.nonzero(np.where(np.equal(dilated_signals, np.roll(dilated_signals, 1)), 
                         False, dilated_signals))[0]
     
     return onsets, dilated_signals
     
+
+
+def onsets_to_events(onsets, sfreq, window=5, offset=0, event_id=1):
+    """Convert onsets of ``kang_onset_detection`` into an events array
+    
+    Onsets are indices into the moving average of the signal. Sample ``i``
+    of the moving average is centered on sample ``i + (window - 1) // 2`` of
+    the signal.
+
+    Parameters
+    ----------
+    onsets : ndarray
+        Onsets returned by ``kang_onset_detection``.
+    sfreq : float
+        The sample rate in Hz.
+    window : int, optional
+        The window of the moving average passed to ``kang_onset_detection``.
+        The default is 5.
+    offset : int, optional
+        Index of the first sample of the signal in the raw data, e.g. if 
+        the detection ran on a part of the recording. The default is 0.
+    event_id : int, optional
+        Event id of the onsets. The default is 1.
+
+    Returns
+    -------
+    events : ndarray
+        n_onsets x 2 array of onset times in s and event id, see 
+        ``myopy.epochs.Epochs``.
+
+    """
+    samples = np.asarray(onsets, dtype=np.int64) + (window - 1) // 2 + offset
+    return np.column_stack([samples / sfreq, np.full(samples.size, event_id)]).astype(np.float64)
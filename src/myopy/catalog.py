@@ -0,0 +1,373 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Persistent index of recordings and their events
+
+A ``Catalog`` reads every table of a study once and keeps the ``Info``, the
+number of samples and the events of ``find_events`` of each file in a local
+SQLite database. Files whose size and modification time (or content hash)
+did not change are not read again by later scans::
+
+    catalog = Catalog('study.sqlite')
+    catalog.scan('./datasets', pattern='*.txt', info=info,
+                 col_data=[19, 20, 21, 22], col_events=[23, 24, 25, 26],
+                 delimiter='\\t')
+
+    catalog.events(event_id=5)                  # DataFrame, nothing is read
+    for fname, epochs in catalog.epochs(5, tmin=0, tmax=5.):
+        ...                                     # reads only files with event 5
+
+Of each file only the rows from the first to the last selected epoch are
+read, one contiguous range per file. With ``cache=True`` the range is a
+slice of the memory-mapped sidecar.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import time
+import warnings
+import numpy as np
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    fname TEXT PRIMARY KEY,
+    root TEXT NOT NULL,
+    subject TEXT,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    sha1 TEXT,
+    sfreq REAL NOT NULL,
+    n_times INTEGER NOT NULL,
+    nchan INTEGER NOT NULL,
+    info TEXT NOT NULL,
+    read_args TEXT NOT NULL,
+    indexed REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS events (
+    fname TEXT NOT NULL REFERENCES files(fname) ON DELETE CASCADE,
+    sample INTEGER NOT NULL,
+    time REAL NOT NULL,
+    event_id INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS events_event_id ON events(event_id, fname);
+CREATE INDEX IF NOT EXISTS events_fname ON events(fname);
+"""
+
+
+def _sha1(fname, chunk_size=2 ** 20):
+    h = hashlib.sha1()
+    with open(fname, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _subject_from_fname(fname):
+    """Subject of a file, the stem up to the first '-', e.g. '01' of '01-02.txt'"""
+    return os.path.splitext(os.path.basename(fname))[0].split('-')[0]
+
+
+class Catalog:
+    """SQLite index of table recordings
+
+    Parameters
+    ----------
+    fname : str, optional
+        Path of the database, created if it does not exist. The default is
+        ':memory:', i.e. an index that is not kept.
+    cache : bool, optional
+        If True, tables are read with ``read_table(..., cache=True)``, so the
+        epochs of scanned files are read from binary sidecars. The default
+        is False.
+    cache_dir : str, optional
+        Directory of the sidecars, see ``read_table``. The default is None.
+    """
+
+    def __init__(self, fname=':memory:', cache=False, cache_dir=None):
+        self.fname = fname
+        self.cache = cache
+        self.cache_dir = cache_dir
+        self._con = sqlite3.connect(fname)
+        self._con.execute('PRAGMA foreign_keys = ON')
+        self._con.executescript(_SCHEMA)
+
+    def close(self):
+        """Close the database"""
+        self._con.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        """Number of indexed files"""
+        return self._con.execute('SELECT COUNT(*) FROM files').fetchone()[0]
+
+    def __repr__(self):
+        return f"<Catalog | {len(self)} files, {self.fname}>"
+
+    def scan(self, directory, info, col_data, col_events=None, pattern='*',
+             recursive=False, ttl_inversed=True, na_to_zero=True, delimiter=',',
+             subject=None, use_hash=False):
+        """Index the tables of a directory
+
+        New and changed files are read with ``read_table`` and their events
+        found with ``find_events``. Files of ``directory`` that no longer
+        exist are removed from the index.
+
+
+        Parameters
+        ----------
+        directory : str
+            The directory.
+        info : Info
+            The measurement info passed to ``read_table``.
+        col_data : list of int
+            Columns of the data, see ``read_table``.
+        col_events : list of int, optional
+            Columns of the events, see ``read_table``. The default is None.
+        pattern : str, optional
+            Glob pattern of the file names. The default is '*'.
+        recursive : bool, optional
+            If True, subdirectories are scanned too. The default is False.
+        ttl_inversed : bool, optional
+            See ``read_table``. The default is True.
+        na_to_zero : bool, optional
+            See ``read_table``. The default is True.
+        delimiter : str, optional
+            See ``read_table``. The default is ','.
+        subject : callable, optional
+            Function returning the subject of a file name. The default is
+            None, i.e. the part of the file name before the first '-'.
+        use_hash : bool, optional
+            If True, a file whose modification time changed is only read again
+            if the SHA-1 of its content changed as well. The default is False.
+
+        Returns
+        -------
+        fnames : list of str
+            The files that were (re-)indexed.
+
+        """
+        import glob
+        from .events import find_events
+        from .io.tables.tables import read_table
+
+        root = os.path.abspath(directory)
+        subject = _subject_from_fname if subject is None else subject
+        read_args = json.dumps({'info': json.loads(info.to_json()),
+                                'col_data': list(col_data),
+                                'col_events': None if col_events is None else list(col_events),
+                                'ttl_inversed': ttl_inversed,
+                                'na_to_zero': na_to_zero,
+                                'delimiter': delimiter})
+
+        pattern = os.path.join(root, '**', pattern) if recursive else os.path.join(root, pattern)
+        fnames = sorted(f for f in glob.glob(pattern, recursive=recursive)
+                        if os.path.isfile(f))
+
+        known = {row[0]: row[1:] for row in self._con.execute(
+            'SELECT fname, size, mtime_ns, sha1, read_args FROM files WHERE root = ?',
+            (root,))}
+
+        updated = []
+        for fname in fnames:
+            stat = os.stat(fname)
+            sha1 = None
+            if fname in known:
+                size, mtime_ns, old_sha1, old_args = known[fname]
+                if old_args == read_args and size == stat.st_size:
+                    if mtime_ns == stat.st_mtime_ns:
+                        continue
+                    if use_hash and old_sha1 is not None:
+                        sha1 = _sha1(fname)
+                        if sha1 == old_sha1:
+                            with self._con:
+                                self._con.execute('UPDATE files SET mtime_ns = ? WHERE fname = ?',
+                                                  (stat.st_mtime_ns, fname))
+                            continue
+
+            if use_hash and sha1 is None:
+                sha1 = _sha1(fname)
+
+            raw = read_table(fname, info, col_data, col_events=col_events,
+                             ttl_inversed=ttl_inversed, na_to_zero=na_to_zero,
+                             delimiter=delimiter, cache=self.cache,
+                             cache_dir=self.cache_dir)
+            events = find_events(raw)
+            if events is None:
+                events = np.empty((0, 2))
+            samples = raw.time_as_index(events[:, 0], use_rounding=True)
+
+            with self._con:
+                self._con.execute('DELETE FROM files WHERE fname = ?', (fname,))
+                self._con.execute(
+                    'INSERT INTO files VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                    (fname, root, subject(fname), stat.st_size, stat.st_mtime_ns,
+                     sha1, float(raw.info['sfreq']), len(raw), raw.info['nchan'],
+                     raw.info.to_json(), read_args, time.time()))
+                self._con.executemany(
+                    'INSERT INTO events VALUES (?, ?, ?, ?)',
+                    zip([fname] * len(samples), samples.tolist(),
+                        events[:, 0].astype(float).tolist(),
+                        events[:, 1].astype(int).tolist()))
+            updated.append(fname)
+
+        removed = set(known) - set(fnames)
+        with self._con:
+            self._con.executemany('DELETE FROM files WHERE fname = ?',
+                                  [(fname,) for fname in removed])
+        return updated
+
+    def files(self, subjects=None):
+        """Indexed files
+
+        Returns
+        -------
+        files : DataFrame
+            fname, subject, size, mtime_ns, sha1, sfreq, n_times and nchan
+            per file.
+        """
+        import pandas as pd
+
+        query = ('SELECT fname, subject, size, mtime_ns, sha1, sfreq, n_times, '
+                 'nchan FROM files')
+        query, params = self._where(query, subjects=subjects)
+        return pd.read_sql_query(query + ' ORDER BY fname', self._con, params=params)
+
+    def get_info(self, fname):
+        """Info of an indexed file"""
+        from .info import Info
+
+        row = self._con.execute('SELECT info FROM files WHERE fname = ?',
+                                (os.path.abspath(fname),)).fetchone()
+        if row is None:
+            raise RuntimeError(f"{fname} is not in the catalog.")
+        return Info.from_json(row[0])
+
+    def events(self, event_id=None, subjects=None):
+        """Events of the indexed files
+
+        Parameters
+        ----------
+        event_id : int | list of int, optional
+            The event ids. The default is None, i.e. all events.
+        subjects : str | list of str, optional
+            The subjects. The default is None, i.e. all subjects.
+
+        Returns
+        -------
+        events : DataFrame
+            fname, subject, sample, time and event_id per event.
+        """
+        import pandas as pd
+
+        query = ('SELECT events.fname, files.subject, events.sample, events.time, '
+                 'events.event_id FROM events JOIN files USING (fname)')
+        query, params = self._where(query, event_id=event_id, subjects=subjects)
+        return pd.read_sql_query(query + ' ORDER BY events.fname, events.sample',
+                                 self._con, params=params)
+
+    def _where(self, query, event_id=None, subjects=None):
+        clauses, params = [], []
+        for column, values in (('events.event_id', event_id), ('files.subject', subjects)):
+            if values is None:
+                continue
+            values = [values] if np.isscalar(values) else list(values)
+            clauses.append(f"{column} IN ({', '.join('?' * len(values))})")
+            params += [v.item() if hasattr(v, 'item') else v for v in values]
+        if clauses:
+            query += ' WHERE ' + ' AND '.join(clauses)
+        return query, params
+
+    def read_raw(self, fname, start=0, stop=None):
+        """Read an indexed file with the arguments it was indexed with
+
+        Parameters
+        ----------
+        fname : str
+            The file.
+        start : int, optional
+            First sample to read. The default is 0.
+        stop : int, optional
+            Sample to stop reading at. The default is None, i.e. the end.
+
+        Returns
+        -------
+        raw : instance of Tables
+            The data, times are relative to ``start``.
+        """
+        from .info import Info
+        from .io.tables.tables import read_table
+
+        fname = os.path.abspath(fname)
+        row = self._con.execute('SELECT read_args FROM files WHERE fname = ?',
+                                (fname,)).fetchone()
+        if row is None:
+            raise RuntimeError(f"{fname} is not in the catalog.")
+        args = json.loads(row[0])
+        args['info'] = Info(args['info'])
+        return read_table(fname, start=start, stop=stop, cache=self.cache,
+                          cache_dir=self.cache_dir, **args)
+
+    def epochs(self, event_id, tmin=0, tmax=5.0, picks=None, subjects=None,
+               reject=None):
+        """Epochs of events across the indexed files
+
+        Only files containing the events are read, and of those only the rows
+        from the first to the last selected epoch, one contiguous range per
+        file. Files whose epochs are all rejected are skipped with a warning.
+
+
+        Parameters
+        ----------
+        event_id : int | list of int
+            The event ids.
+        tmin : float, optional
+            Start of the epochs in s relative to the events. The default is 0.
+        tmax : float, optional
+            End of the epochs in s relative to the events. The default is 5.
+        picks : list, optional
+            The channels, see ``Epochs``. The default is None, i.e. all
+            channels except TTL and event channels.
+        subjects : str | list of str, optional
+            The subjects. The default is None, i.e. all subjects.
+        reject : dict, optional
+            Arguments of ``Epochs.reject``. The default is None.
+
+        Yields
+        ------
+        fname : str
+            The file.
+        epochs : instance of Epochs
+            The epochs of the file, event times are relative to the start of
+            the file.
+
+        """
+        from .epochs import AllEpochsRejectedError, Epochs
+        from .info import _pick_data_channels
+
+        event_id = [event_id] if np.isscalar(event_id) else list(event_id)
+        events = self.events(event_id=event_id, subjects=subjects)
+        sizes = dict(self._con.execute('SELECT fname, n_times FROM files'))
+        for fname, group in events.groupby('fname', sort=True):
+            sfreq = self.get_info(fname)['sfreq']
+            times = group['time'].to_numpy(dtype=np.float64)
+            start = max(int(np.floor((times.min() + tmin) * sfreq)) - 1, 0)
+            stop = min(int(np.ceil((times.max() + tmax) * sfreq)) + 2, sizes[fname])
+
+            raw = self.read_raw(fname, start=start, stop=stop)
+            shifted = np.column_stack([times - start / sfreq,
+                                       group['event_id'].to_numpy()])
+            try:
+                epochs = Epochs(raw, events=shifted, event_id=event_id,
+                                picks=_pick_data_channels(raw.info, picks),
+                                tmin=tmin, tmax=tmax, reject=reject)
+            except AllEpochsRejectedError:
+                warnings.warn(f"All epochs of {fname} were rejected, the file is skipped.")
+                continue
+            epochs.events[:, 0] += start / sfreq
+            epochs.dropped_events[:, 0] += start / sfreq
+            yield fname, epochs
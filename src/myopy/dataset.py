@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Mini-batches of epochs or features for training models
+
+``batch_iter`` yields contiguous float32 batches with their labels. Batches
+are read from in-memory or memory-mapped epochs, optionally reduced to
+features, on a background thread while the previous batch is used::
+
+    dataset = EpochsDataset(epochs, features=['MAV', 'RMS'])
+    for epoch in range(n_epochs):
+        for X, y in batch_iter(dataset, batch_size=64, seed=epoch):
+            model.partial_fit(X, y)
+"""
+import queue
+import threading
+import numpy as np
+
+_END = object()
+
+
+class EpochsDataset:
+    """Epochs or features with labels, indexed by epoch
+
+    Parameters
+    ----------
+    data : instance of BaseEpochs | ndarray | DataFrame
+        Epochs, an n_epochs x ... array, e.g. memory-mapped, or a DataFrame
+        of ``features`` output with a 'class' column.
+    labels : ndarray, optional
+        Label per epoch. The default is None, i.e. the event ids of epochs
+        or the 'class' column of a DataFrame.
+    features : list of str, optional
+        Features of ``myopy.emg.features`` computed per batch from the
+        epochs. The default is None, i.e. batches of epochs.
+    exclude_bads : bool, optional
+        If True, epochs in ``bad_epochs`` are left out. The default is True.
+    dtype : dtype, optional
+        The dtype of the batches. The default is np.float32.
+    """
+
+    def __init__(self, data, labels=None, features=None, exclude_bads=True,
+                 dtype=np.float32):
+        import pandas as pd
+
+        index = None
+        if isinstance(data, pd.DataFrame):
+            if labels is None:
+                labels = data['class'].to_numpy()
+            data = data.drop(columns='class', errors='ignore').to_numpy(dtype=np.float64)
+        elif hasattr(data, 'events'):
+            if labels is None:
+                labels = data.events[:, 1]
+            if exclude_bads:
+                index = np.flatnonzero(~data.bad_epochs)
+            data = data._data
+
+        if labels is None:
+            raise RuntimeError('labels are required for arrays.')
+        labels = np.asarray(labels)
+        if labels.shape[0] != data.shape[0]:
+            raise RuntimeError(f'Got {labels.shape[0]} labels for '
+                               f'{data.shape[0]} epochs.')
+
+        if features is not None:
+            from .emg.features import _FEATURES
+
+            if data.ndim != 3:
+                raise RuntimeError('features require n_epochs x n_times x n_chan data.')
+            unknown = set(features) - set(_FEATURES)
+            if unknown:
+                raise RuntimeError(f"Unknown features {sorted(unknown)}")
+
+        self._data = data
+        self._index = np.arange(data.shape[0]) if index is None else index
+        self.labels = labels
+        self.features = None if features is None else list(features)
+        self.dtype = dtype
+
+    def __len__(self):
+        """Number of epochs"""
+        return self._index.size
+
+    @property
+    def shape(self):
+        """Shape of one sample"""
+        if self.features is None:
+            return self._data.shape[1:]
+        return (len(self.features) * self._data.shape[2],)
+
+    def __getitem__(self, index):
+        """Batch of samples and labels at positions of the dataset
+
+
+        Parameters
+        ----------
+        index : ndarray
+            Positions of the samples.
+
+        Returns
+        -------
+        X : ndarray
+            Contiguous array of n_samples x ``shape``.
+        y : ndarray
+            The labels.
+
+        """
+        rows = self._index[np.atleast_1d(index)]
+        # read in file order, memory-mapped data is read sequentially
+        order = np.argsort(rows, kind='stable')
+
+        data = np.asarray(self._data[rows[order]])
+        if self.features is not None:
+            from .emg.features import _FEATURES
+
+            data = np.asarray(data, dtype=np.float64)
+            data = np.concatenate([_FEATURES[name](data) for name in self.features],
+                                  axis=1)
+
+        X = np.empty((rows.size,) + data.shape[1:], dtype=self.dtype)
+        X[order] = data
+        return X, self.labels[rows]
+
+
+def batch_iter(dataset, batch_size=32, shuffle=True, seed=None, n_prefetch=2,
+               drop_last=False):
+    """Iterate over mini-batches
+
+
+    Parameters
+    ----------
+    dataset : instance of EpochsDataset | BaseEpochs | DataFrame
+        The data, epochs and DataFrames are wrapped in an ``EpochsDataset``.
+    batch_size : int, optional
+        Number of samples per batch. The default is 32.
+    shuffle : bool, optional
+        If True, the order of samples is drawn from a random generator
+        seeded with ``seed``. The default is True.
+    seed : int, optional
+        Seed of the shuffle, e.g. the training epoch, the same seed gives
+        the same batches. The default is None.
+    n_prefetch : int, optional
+        Number of batches prepared ahead on a background thread, 0 to read
+        batches when they are requested. The default is 2.
+    drop_last : bool, optional
+        If True, a last batch smaller than ``batch_size`` is left out. The
+        default is False.
+
+    Yields
+    ------
+    X : ndarray
+        Contiguous float32 batch of samples.
+    y : ndarray
+        The labels.
+
+    """
+    if not isinstance(dataset, EpochsDataset):
+        dataset = EpochsDataset(dataset)
+
+    n = len(dataset)
+    order = np.random.default_rng(seed).permutation(n) if shuffle else np.arange(n)
+    stop = n - n % batch_size if drop_last else n
+    batches = [order[i:i + batch_size] for i in range(0, stop, batch_size)]
+
+    if n_prefetch < 1:
+        for index in batches:
+            yield dataset[index]
+        return
+
+    buffer = queue.Queue(maxsize=n_prefetch)
+    done = threading.Event()
+
+    def _put(item):
+        while not done.is_set():
+            try:
+                buffer.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _produce():
+        try:
+            for index in batches:
+                if not _put(dataset[index]):
+                    return
+        except Exception as e:
+            _put(e)
+        else:
+            _put(_END)
+
+    thread = threading.Thread(target=_produce, daemon=True, name='batch_iter')
+    thread.start()
+    try:
+        while True:
+            item = buffer.get()
+            if item is _END:
+                break
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        # stop the producer if the consumer breaks early
+        done.set()
+        thread.join()
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Rectification and envelope of EMG signals
+
+Moving windows are trailing windows, i.e. sample ``i`` of the envelope only
+depends on samples ``i - window + 1`` to ``i``. The first ``window - 1``
+samples are averaged over the samples available so far. This makes the
+offline envelope identical to the streaming one, up to the rounding of the
+running sums of blocks of different sizes.
+"""
+import numpy as np
+from ..kernels import trailing_mean
+
+_METHODS = ('rms', 'mav', 'lowpass')
+
+
+class EnvelopeStream:
+    """Envelope of consecutive blocks of multi-channel data
+
+    Moving windows are computed from running sums of the block and the tail
+    of the previous blocks, so the cost per sample does not depend on the
+    window size. Sums are accumulated in float64, see
+    ``myopy.kernels.trailing_mean``.
+
+    Parameters
+    ----------
+    method : str
+        'rms' for the root mean square, 'mav' for the mean absolute value of
+        a moving window, 'lowpass' for the low-pass filtered rectified signal.
+    n_chan : int
+        Number of channels.
+    window : int, optional
+        Window size in samples, required for 'rms' and 'mav'.
+    sos : ndarray, optional
+        Second-order sections of the low-pass filter, required for 'lowpass'.
+        See ``myopy.filter.design_filter``.
+    """
+
+    def __init__(self, method, n_chan, window=None, sos=None):
+        if method not in _METHODS:
+            raise RuntimeError(f"method must be one of {_METHODS}, got {method!r}")
+
+        if method == 'lowpass':
+            if sos is None:
+                raise RuntimeError("method 'lowpass' requires sos.")
+            from ..filter import StreamingFilter
+            self._filter = StreamingFilter(sos, n_chan)
+        elif window is None or int(window) < 1:
+            raise RuntimeError(f"method {method!r} requires a window of at "
+                               f"least one sample.")
+
+        self.method = method
+        self.n_chan = n_chan
+        self.window = None if window is None else int(window)
+        self.reset()
+
+    def reset(self):
+        """Forget all previous blocks"""
+        self._n_seen = 0
+        self._tail = np.zeros((0, self.n_chan))
+        if self.method == 'lowpass':
+            self._filter.reset()
+
+    def process(self, block, out=None):
+        """Envelope of the next block
+
+
+        Parameters
+        ----------
+        block : ndarray
+            n_times x n_chan block of data.
+        out : ndarray, optional
+            Array of the same shape the envelope is written to. May be
+            ``block`` itself. The default is None.
+
+        Returns
+        -------
+        out : ndarray
+            The envelope, float32 for float32 blocks and float64 otherwise.
+
+        """
+        if out is None:
+            dtype = block.dtype if block.dtype == np.float32 else np.float64
+            out = np.empty(block.shape, dtype=dtype)
+
+        n_times = block.shape[0]
+        if n_times == 0:
+            return out
+
+        if self.method == 'lowpass':
+            out[:] = self._filter.process(np.abs(block, dtype=np.float64))
+            return out
+
+        if self.method == 'rms':
+            values = np.square(block, dtype=np.float64)
+        else:
+            values = np.abs(block, dtype=np.float64)
+
+        mean = trailing_mean(values, self._tail, self._n_seen, self.window)
+
+        if self.method == 'rms':
+            # cancellation in the cumulative sum can give tiny negative values
+            np.sqrt(np.maximum(mean, 0, out=mean), out=out)
+        else:
+            out[:] = mean
+
+        n_keep = self.window - 1
+        if n_times >= n_keep:
+            self._tail = values[n_times - n_keep:].copy()
+        else:
+            self._tail = np.concatenate([self._tail, values])[-n_keep:]
+        self._n_seen += n_times
+
+        return out
+
+
+def envelope(data, method='rms', window=None, sos=None, out=None,
+             chunk_size=2 ** 16):
+    """Envelope of n_times x n_chan data
+
+
+    Parameters
+    ----------
+    data : ndarray
+        n_times x n_chan array of data.
+    method : str, optional
+        'rms', 'mav' or 'lowpass', see ``EnvelopeStream``. The default is
+        'rms'.
+    window : int, optional
+        Window size in samples for 'rms' and 'mav'.
+    sos : ndarray, optional
+        Second-order sections of the low-pass filter for 'lowpass'.
+    out : ndarray, optional
+        Array of the same shape the envelope is written to. May be ``data``
+        itself. The default is None.
+    chunk_size : int, optional
+        Number of samples processed at once. Bounds the size of temporary
+        arrays and of the cumulative sums. The default is 2 ** 16.
+
+    Returns
+    -------
+    out : ndarray
+        The envelope.
+
+    """
+    if out is None:
+        dtype = data.dtype if data.dtype == np.float32 else np.float64
+        out = np.empty(data.shape, dtype=dtype)
+
+    stream = EnvelopeStream(method, data.shape[1], window=window, sos=sos)
+    for start in range(0, data.shape[0], chunk_size):
+        stop = start + chunk_size
+        stream.process(data[start:stop], out=out[start:stop])
+
+    return out
@@ -8,30 +8,14 @@ Created on Tue Oct 25 12:45:45 2022
 
 import numpy as np
 import pandas as pd
-import scipy.io
-from scipy.stats import skew 
-from scipy.stats import kurtosis
 import pickle 
-from scipy import stats
+from ..profiling import instrument
 
 class features:
     
     def __init__(self, epochs, features=None):
         
-        self._feature_dict = {
-                'IEMG': IEMG,
-                'MAV': MAV,
-                'MMAV1': MMAV1,
-                'MMAV2': MMAV2,
-                'VAR': VAR,
-                'SD': SD,
-                #'KURT': Kurt,
-                #'SKEW': Skew,
-                'SSI': SSI,
-                'RMS': RMS,
-                'AAC': AAC,
-                'WL': WL,                
-                }
+        self._feature_dict = dict(_FEATURES)
         
         self._epochs = epochs
         self._features = features
@@ -48,18 +32,12 @@ class features:
         self._values, self._labels, self._classes = self.calculate()
     
     def find_emg(self, epochs):
-        chs = epochs.info['chs']
-        
-        indices = []
-
-        for i, d in enumerate(chs):
-            if d.get('ch_type') == 'EMG':
-                indices.append(i)
-        
+        indices = epochs.info['chs'].get_picks('EMG')
         
         return len(indices)
         
     
+    @instrument('features', nbytes=lambda result, self: self._epochs._data.nbytes)
     def calculate(self):
         
         events = np.unique(self._events[:,1])
@@ -135,21 +113,17 @@ def MAV(data):
     return np.mean(np.absolute(data), axis=1)
 
 def MMAV1(data):
-    """Calculate modified MAV type 1"""
-    
-    for idx in range(data.shape[0]):
-        data[idx, :, :] = (window_function(n=data.shape[1], mav_type=1) * data[idx,:,:].T).T
+    """Calculate modified MAV type 1, data is not modified"""
     
-    return np.mean(np.absolute(data), axis=1)
+    w = window_function(n=data.shape[1], mav_type=1)
+    return np.mean(np.absolute(data) * w[:, None], axis=1)
 
 
 def MMAV2(data):
-    """Calculate modified MAV type 2"""
-    for idx in range(data.shape[0]):
-        data[idx, :, :] = (window_function(n=data.shape[1], mav_type=2) * data[idx,:,:].T).T
-    
+    """Calculate modified MAV type 2, data is not modified"""
     
-    return np.mean(np.absolute(data), axis=1)
+    w = window_function(n=data.shape[1], mav_type=2)
+    return np.mean(np.absolute(data) * w[:, None], axis=1)
 
     
     
@@ -180,7 +154,7 @@ def Kurt(data):
     None.
 
     """
-    
+    from scipy.stats import kurtosis
        
     return kurtosis(data, axis=1)
     
@@ -198,7 +172,7 @@ def Skew(data):
     None.
 
     """
-    
+    from scipy.stats import skew
         
     return skew(data, axis=1)
     
@@ -264,4 +238,23 @@ def WL(data):
 
 
 
-    
\ No newline at end of file
+    
+
+
+
+# Features computed by default, functions take and return arrays of 
+# n_epochs x n_times x n_chan and n_epochs x n_chan
+_FEATURES = {
+        'IEMG': IEMG,
+        'MAV': MAV,
+        'MMAV1': MMAV1,
+        'MMAV2': MMAV2,
+        'VAR': VAR,
+        'SD': SD,
+        #'KURT': Kurt,
+        #'SKEW': Skew,
+        'SSI': SSI,
+        'RMS': RMS,
+        'AAC': AAC,
+        'WL': WL,                
+        }
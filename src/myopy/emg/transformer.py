@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""scikit-learn compatible extraction of EMG features
+
+``EMGFeatureTransformer`` computes the features of ``myopy.emg.features``
+from n_epochs x n_times x n_chan arrays into one contiguous matrix. It has
+no state learned from data, so it can be used in a scikit-learn
+``Pipeline``, cross-validated with ``n_jobs`` and applied out-of-core::
+
+    from sklearn.pipeline import make_pipeline
+    from sklearn.linear_model import LogisticRegression
+
+    clf = make_pipeline(EMGFeatureTransformer(['MAV', 'WL']), LogisticRegression())
+    cross_val_score(clf, epochs.get_data(), epochs.events[:, 1], n_jobs=4)
+
+scikit-learn is optional. Without it the transformer has the same methods
+but no ``get_params``/``set_params``.
+"""
+import numpy as np
+from .features import _FEATURES
+
+try:
+    from sklearn.base import BaseEstimator, TransformerMixin
+    _BASES = (TransformerMixin, BaseEstimator)
+except ImportError:
+    _BASES = (object,)
+
+
+class EMGFeatureTransformer(*_BASES):
+    """Features of epochs as a n_epochs x (n_features * n_chan) matrix
+
+    Columns are feature-major, e.g. MAV1, MAV2, ..., RMS1, RMS2, ..., like
+    the columns of ``myopy.pipeline.Pipeline`` output.
+
+    Parameters
+    ----------
+    features : list of str, optional
+        Names of the features. The default is None, i.e. all features of
+        ``myopy.emg.features``.
+    chunk_size : int, optional
+        Number of epochs processed at once, bounds temporary arrays. The
+        default is None, i.e. all epochs.
+    dtype : dtype, optional
+        The dtype of the matrix. The default is np.float64.
+    """
+
+    def __init__(self, features=None, chunk_size=None, dtype=np.float64):
+        self.features = features
+        self.chunk_size = chunk_size
+        self.dtype = dtype
+
+    def _feature_list(self):
+        features = list(_FEATURES) if self.features is None else list(self.features)
+        unknown = set(features) - set(_FEATURES)
+        if unknown:
+            raise RuntimeError(f"Unknown features {sorted(unknown)}")
+        return features
+
+    @staticmethod
+    def _check(X):
+        X = np.asarray(X)
+        if X.ndim != 3:
+            raise RuntimeError(f'X must be n_epochs x n_times x n_chan, got {X.shape}.')
+        return X
+
+    def fit(self, X, y=None):
+        """Check the input, nothing is learned
+
+        Returns
+        -------
+        transformer : instance of EMGFeatureTransformer
+            The instance itself.
+        """
+        X = self._check(X)
+        self._feature_list()
+        self.n_features_in_ = X.shape[2]
+        return self
+
+    def partial_fit(self, X, y=None):
+        """Same as ``fit``, for out-of-core pipelines"""
+        return self.fit(X, y)
+
+    def transform(self, X, out=None):
+        """Compute the features
+
+
+        Parameters
+        ----------
+        X : ndarray
+            n_epochs x n_times x n_chan array, e.g. memory-mapped. If the
+            transformer was fitted, with as many channels as in ``fit``.
+        out : ndarray, optional
+            C-contiguous n_epochs x (n_features * n_chan) array the features
+            are written to. The default is None, i.e. a new array.
+
+        Returns
+        -------
+        out : ndarray
+            The features.
+
+        """
+        X = self._check(X)
+        features = self._feature_list()
+        n_epochs, _, n_chan = X.shape
+        n_fit = getattr(self, 'n_features_in_', None)
+        if n_fit is not None and n_chan != n_fit:
+            raise RuntimeError(f'X has {n_chan} channels, the transformer was '
+                               f'fitted with {n_fit}.')
+
+        shape = (n_epochs, len(features) * n_chan)
+        if out is None:
+            out = np.empty(shape, dtype=self.dtype)
+        elif out.shape != shape or not out.flags['C_CONTIGUOUS']:
+            raise RuntimeError(f'out must be a C-contiguous array of shape {shape}.')
+
+        chunk_size = self.chunk_size or max(n_epochs, 1)
+        for start in range(0, n_epochs, chunk_size):
+            stop = start + chunk_size
+            chunk = np.asarray(X[start:stop])
+            for k, name in enumerate(features):
+                out[start:stop, k * n_chan:(k + 1) * n_chan] = _FEATURES[name](chunk)
+        return out
+
+    def transform_chunks(self, chunks):
+        """Compute the features of an iterable of arrays
+
+
+        Parameters
+        ----------
+        chunks : iterable of ndarray
+            n_epochs x n_times x n_chan arrays, e.g. from a generator reading
+            epochs from disk.
+
+        Yields
+        ------
+        out : ndarray
+            The features of each chunk.
+
+        """
+        for chunk in chunks:
+            yield self.transform(chunk)
+
+    def get_feature_names_out(self, input_features=None):
+        """Names of the columns
+
+
+        Parameters
+        ----------
+        input_features : list of str, optional
+            Names of the channels. The default is None, i.e. 1, 2, ...
+
+        Returns
+        -------
+        names : ndarray
+            The names, e.g. 'MAV1' or 'MAVEMG1'.
+
+        """
+        if input_features is None:
+            n_chan = getattr(self, 'n_features_in_', None)
+            if n_chan is None:
+                raise RuntimeError('Call fit or pass input_features first.')
+            input_features = [str(i) for i in range(1, n_chan + 1)]
+        return np.array([f"{name}{ch}" for name in self._feature_list()
+                         for ch in input_features], dtype=object)
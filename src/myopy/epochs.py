@@ -2,17 +2,23 @@
 # -*- coding: utf-8 -*-
 
 import numpy as np
-from copy import deepcopy
+from copy import copy, deepcopy
 import pandas as pd
 # import pyqtgraph as pg
 # from pyqtgraph.Qt import QtCore
 from .mixin import TimeMixin, EpochsMixin
 from .io.base import BaseRaw
-from .viz.plotter import EpochsPlot
+from .profiling import instrument
+
+
+class AllEpochsRejectedError(RuntimeError):
+    """Raised when ``reject`` of ``Epochs`` rejects every epoch"""
+
 
 class BaseEpochs(TimeMixin, EpochsMixin):
     
-    def __init__(self, info, data, events, event_id=None, raw=None, picks=None, tmin=0, tmax=5.0):
+    def __init__(self, info, data, events, event_id=None, raw=None, picks=None, tmin=0, tmax=5.0,
+                 reject=None):
         """
         
 
@@ -32,6 +38,11 @@ class BaseEpochs(TimeMixin, EpochsMixin):
             Start time of the epoch in ms relative to the time-locked event. The default is 0.
         tmax : int, optional
             End time of the epoch in ms relative to the time-locked event. The default is 500.
+        reject : dict, optional
+            Arguments of ``reject``, e.g. ``dict(peak_to_peak=2., flat=1e-3)``. 
+            When epochs are created from raw, rejected epochs are not 
+            extracted and recorded in ``dropped_events``. If all are 
+            rejected, ``AllEpochsRejectedError`` is raised. The default is None.
 
         """
         
@@ -52,23 +63,36 @@ class BaseEpochs(TimeMixin, EpochsMixin):
            
         self.bad_epochs = np.full((1, self.events.shape[0]), False)[0]
         
-        times = np.arange(tmin, tmax + float(1/self.info['sfreq']), float(1/self.info['sfreq']))
-        self._set_times(times)
-        self._last_samp = int((np.absolute(tmax) + np.absolute(tmin)) * self.info['sfreq']) + 1
+        self._last_samp = _n_times(tmin, tmax, self.info['sfreq'])
+        self._set_times(tmin + np.arange(self._last_samp) / self.info['sfreq'])
         
         if tmin > tmax:
             raise RuntimeError('tmin must be smaller than tmax.')
         
         
+        # events and reason codes of epochs removed by rejection or drop_bads
+        self.dropped_events = np.empty((0, 2), dtype=self.events.dtype)
+        self.dropped_log = None
+        
         if data is None:
             self._data = None
-            self._raw_times = raw.times
             self._raw = raw
+            if reject is not None:
+                self._reject_from_raw(**reject)
             self._epochs_from_raw()
         else:
             # TODO: Handle edge cases
             self._data = data
         
+        self.reject_log = np.zeros((self.events.shape[0], self._data.shape[2]), dtype=np.int8)
+        if self.dropped_log is None:
+            self.dropped_log = np.zeros((0, self._data.shape[2]), dtype=np.int8)
+        if data is not None and reject is not None:
+            self.reject(**reject)
+        
+        self._data_is_view = False
+        self._build_event_index()
+        
     @property
     def tmin(self):
         return self._tmin
@@ -77,27 +101,93 @@ class BaseEpochs(TimeMixin, EpochsMixin):
     def tmax(self):
         return self._tmax
     
-    def _epochs_from_raw(self):
-        self._data = np.zeros((self.events.shape[0], self._last_samp, len(self.picks)))
-                
-        start_time = self.events[:, 0] + self.tmin
-        end_time = self.events[:,0] + self.tmax 
+    @instrument('epochs_from_raw', nbytes=lambda result, self: self._data.nbytes)
+    def _epochs_from_raw(self, chunk_size=256):
+        n_epochs = self.events.shape[0]
+        self._data = np.empty((n_epochs, self._last_samp, len(self.picks)))
+        for start in range(0, n_epochs, chunk_size):
+            stop = min(start + chunk_size, n_epochs)
+            self._data[start:stop] = self._raw_windows(slice(start, stop))
+    
+    def _raw_windows(self, index):
+        """Epochs of events[index] gathered from raw in one pass
         
-        start_time[start_time < np.min(self._raw_times)] = np.min(self._raw_times)
-        end_time[end_time > np.max(self._raw_times)] = np.max(self._raw_times)
+        Samples before the start or after the end of the recording are 
+        zero.
+        """
+        first = self._raw.time_as_index(self.events[index, 0] + self.tmin)
+        samples = first[:, None] + np.arange(self._last_samp)
+        outside = (samples < 0) | (samples >= len(self._raw))
+        
+        picks = np.arange(self._raw._data.shape[1])[self.picks]
+        data = self._raw._data[np.clip(samples, 0, len(self._raw) - 1)[:, :, None], picks]
+        data[outside] = 0.
+        return data
         
-        start_index = np.searchsorted( self._raw_times, start_time)
-        end_index = np.searchsorted(self._raw_times, end_time)
+    def _reject_from_raw(self, peak_to_peak=None, flat=None, chunk_size=256):
+        """Remove events whose epochs would be rejected before extracting them"""
+        n_chan = len(np.arange(self.info['nchan'])[self.picks])
+        high, low = _reject_thresholds(self.info, self.picks, n_chan, peak_to_peak, flat)
         
-        for i, sl in enumerate(list(zip(start_index, end_index + 1))):
-            data = self._raw._data[slice(*sl), self.picks]
-            
-            if end_index[i] - start_index[i] < self._last_samp - 1:
-                fill_in = np.zeros((self._last_samp, len(self.picks)))
-                fill_in[0:data.shape[0], self.picks] = self._raw._data[slice(*sl), self.picks]
-                data = fill_in
-                
-            self._data[i,:,:] = data
+        n_epochs = self.events.shape[0]
+        ptp = np.empty((n_epochs, n_chan))
+        for start in range(0, n_epochs, chunk_size):
+            stop = min(start + chunk_size, n_epochs)
+            data = self._raw_windows(slice(start, stop))
+            ptp[start:stop] = data.max(axis=1) - data.min(axis=1)
+        
+        log = _reject_codes(ptp, high, low)
+        rejected = np.any(log, axis=1)
+        self.dropped_events = self.events[rejected]
+        self.dropped_log = log[rejected]
+        self.events = self.events[~rejected]
+        self.bad_epochs = self.bad_epochs[~rejected]
+        
+        if self.events.size == 0:
+            raise AllEpochsRejectedError("All epochs were rejected.")
+    
+    def reject(self, peak_to_peak=None, flat=None, chunk_size=None):
+        """Mark epochs with too large or too small amplitudes as bad
+        
+        An epoch is bad if the peak-to-peak amplitude of a channel is larger 
+        than ``peak_to_peak`` or smaller than ``flat``. Bad epochs are added 
+        to ``bad_epochs``, epochs marked before stay bad. The reason per 
+        epoch and channel is stored in ``reject_log`` as bit flags, 
+        ``REJECT_PEAK_TO_PEAK`` and ``REJECT_FLAT``.
+
+        Parameters
+        ----------
+        peak_to_peak : float | list | dict, optional
+            Largest peak-to-peak amplitude. A float applies to all channels 
+            except TTL and event channels, a list gives one threshold per 
+            pick and a dict maps channel names to thresholds. The default is 
+            None, i.e. no upper limit.
+        flat : float | list | dict, optional
+            Smallest peak-to-peak amplitude, like ``peak_to_peak``. The 
+            default is None, i.e. no lower limit.
+        chunk_size : int, optional
+            Number of epochs read at once, e.g. of memory-mapped epochs. The 
+            default is None, i.e. all epochs.
+
+        Returns
+        -------
+        epochs : instance of BaseEpochs
+            The instance itself.
+
+        """
+        n_epochs, _, n_chan = self._data.shape
+        high, low = _reject_thresholds(self.info, self.picks, n_chan, peak_to_peak, flat)
+        
+        if chunk_size is None:
+            chunk_size = max(n_epochs, 1)
+        for start in range(0, n_epochs, chunk_size):
+            chunk = np.asarray(self._data[start:start + chunk_size])
+            ptp = chunk.max(axis=1) - chunk.min(axis=1)
+            self.reject_log[start:start + chunk_size] |= _reject_codes(ptp, high, low)
+        
+        # in place, plots share the array
+        self.bad_epochs |= np.any(self.reject_log, axis=1)
+        return self
         
     def get_data(self):
         """ Get data
@@ -111,10 +201,220 @@ class BaseEpochs(TimeMixin, EpochsMixin):
         """
         return self._data
     
+    def average(self, by='event_id', exclude_bads=True, chunk_size=None):
+        """Mean, variance and standard error across epochs
+        
+        Epochs are read chunk by chunk and accumulated in float64, see 
+        ``myopy.stats.RunningStats``. Results of several epochs, e.g. of 
+        sessions or workers, are combined with ``RunningStats.merge``.
+
+        Parameters
+        ----------
+        by : str | None, optional
+            'event_id' for statistics per event id, None for all epochs. The 
+            default is 'event_id'.
+        exclude_bads : bool, optional
+            If True, epochs in ``bad_epochs`` are left out. The default is 
+            True.
+        chunk_size : int, optional
+            Number of epochs read at once, e.g. of memory-mapped epochs. The 
+            default is None, i.e. all epochs.
+
+        Returns
+        -------
+        stats : dict | instance of RunningStats
+            Statistics of n_times x n_chan waveforms, ``stats.mean``, 
+            ``stats.std`` and ``stats.sem``. A dict of event id to statistics 
+            if ``by`` is 'event_id'.
+
+        """
+        from .stats import RunningStats
+        
+        if by not in ('event_id', None):
+            raise RuntimeError(f"by must be 'event_id' or None, got {by!r}")
+        
+        n_epochs = len(self)
+        keys = self.events[:, 1] if by == 'event_id' else np.zeros(n_epochs, dtype=int)
+        stats = {}
+        
+        if chunk_size is None:
+            chunk_size = max(n_epochs, 1)
+        for start in range(0, n_epochs, chunk_size):
+            stop = min(start + chunk_size, n_epochs)
+            chunk = np.asarray(self._data[start:stop])
+            use = ~self.bad_epochs[start:stop] if exclude_bads else np.ones(stop - start, bool)
+            for key in np.unique(keys[start:stop][use]):
+                mask = use & (keys[start:stop] == key)
+                stats.setdefault(key.item(), RunningStats()).update(chunk[mask])
+        
+        if not stats:
+            raise RuntimeError('No epochs to average.')
+        return stats if by == 'event_id' else stats[0]
+    
+    def decimate(self, factor, chunk_size=None):
+        """Decimate epochs in place with an anti-aliasing polyphase filter
+        
+        TTL and event channels are decimated by taking every ``factor``-th 
+        sample.
+
+        Parameters
+        ----------
+        factor : int
+            Decimation factor, the new sample rate is sfreq / factor.
+        chunk_size : int, optional
+            Number of epochs filtered at once. The default is None, i.e. all 
+            epochs.
+
+        Returns
+        -------
+        epochs : instance of BaseEpochs
+            The instance itself.
+
+        """
+        from scipy import signal
+        
+        factor = int(factor)
+        if factor < 1:
+            raise RuntimeError('factor must be a positive integer.')
+        if factor == 1:
+            return self
+        
+        ch_types = np.array(self.info['chs'].ch_types, dtype=object)[self.picks]
+        hold = np.isin(ch_types, ['TTL', 'event_id'])
+        
+        n_epochs, n_times, n_chan = self._data.shape
+        data = np.empty((n_epochs, -(-n_times // factor), n_chan))
+        data[:, :, hold] = self._data[:, ::factor][:, :, hold]
+        
+        if chunk_size is None:
+            chunk_size = max(n_epochs, 1)
+        filt = np.flatnonzero(~hold)
+        for start in range(0, n_epochs, chunk_size):
+            stop = start + chunk_size
+            data[start:stop, :, filt] = signal.resample_poly(
+                self._data[start:stop][:, :, filt], 1, factor, axis=1)
+        
+        self._data = data
+        self._set_times(self.times[::factor])
+        self._last_samp = data.shape[1]
+        
+        self.info = self.info.copy()
+        self.info._unlocked = True
+        self.info['sfreq'] = self.info['sfreq'] / factor
+        self.info._unlocked = False
+        
+        return self
+    
+    def _build_event_index(self):
+        """Positions of the epochs of each event id"""
+        ids = self.events[:, 1]
+        order = np.argsort(ids, kind='stable')
+        unique, first = np.unique(ids[order], return_index=True)
+        self._event_index = dict(zip(unique.tolist(), np.split(order, first[1:])))
+    
+    def _positions(self, key):
+        """Epoch positions of event ids given as str"""
+        keys = [key] if isinstance(key, str) else list(key)
+        positions = []
+        for k in keys:
+            try:
+                positions.append(self._event_index[int(k)])
+            except (KeyError, ValueError):
+                raise RuntimeError(f"Event id {k!r} is not in the epochs.") from None
+        return positions[0] if len(positions) == 1 else np.sort(np.concatenate(positions))
+    
+    def __len__(self):
+        """Number of epochs"""
+        return self.events.shape[0]
+    
+    def __getitem__(self, key):
+        """Select epochs
+        
+        ``epochs['3']`` or ``epochs[['1', '2']]`` select the epochs of event 
+        ids, integers, slices, integer arrays and boolean masks select epochs 
+        by position. Event ids are looked up in an index built once, so a 
+        selection only touches the selected epochs. Data of slices, single 
+        epochs and event ids whose epochs are consecutive are views, 
+        otherwise only the selected epochs are copied.
+
+        Returns
+        -------
+        epochs : instance of BaseEpochs
+            The selected epochs, sharing info with this instance.
+
+        """
+        if isinstance(key, str) or (isinstance(key, (list, tuple)) and key 
+                                    and all(isinstance(k, str) for k in key)):
+            index = self._positions(key)
+        elif isinstance(key, (int, np.integer)):
+            n = len(self)
+            if not -n <= key < n:
+                raise IndexError(f"Index {key} is out of range for {n} epochs.")
+            index = slice(key % n, key % n + 1)
+        elif isinstance(key, slice):
+            index = key
+        else:
+            index = np.asarray(key)
+            if index.dtype == bool:
+                index = np.flatnonzero(index)
+        
+        if isinstance(index, np.ndarray) and index.size and \
+                np.array_equal(index, np.arange(index[0], index[0] + index.size)):
+            index = slice(int(index[0]), int(index[0]) + index.size)
+        
+        return self._subset(index)
+    
+    def _subset(self, index):
+        """New instance of the epochs at index, a slice or positions"""
+        inst = copy(self)
+        inst._data = self._data[index]
+        # data of slices is shared between both instances, drop_bads of 
+        # either must not move it
+        if isinstance(index, slice):
+            self._data_is_view = True
+        inst._data_is_view = isinstance(index, slice) or self._data_is_view
+        inst.events = self.events[index]
+        inst.bad_epochs = self.bad_epochs[index].copy()
+        inst.reject_log = self.reject_log[index].copy()
+        inst.event_id = [e for e in self.event_id if e in set(inst.events[:, 1].tolist())]
+        inst._build_event_index()
+        return inst
+    
     def drop_bads(self):
-        """ Drop bad epochs """
-        self._data = self._data[~self.bad_epochs, :, :]
-        self.events = self.events[~self.bad_epochs]
+        """Drop bad epochs in place
+        
+        Good epochs are moved to the front of the data, run by run, and the 
+        data is truncated. No copy of the whole data is made. Read-only 
+        data, e.g. memory-mapped in mode 'r', and data shared with other 
+        epochs after a selection (by the selected epochs and by the epochs 
+        they were selected from) are copied instead.
+        """
+        bad = self.bad_epochs
+        if not bad.any():
+            return self
+        
+        self.dropped_events = np.concatenate([self.dropped_events, self.events[bad]])
+        self.dropped_log = np.concatenate([self.dropped_log, self.reject_log[bad]])
+        
+        keep = np.flatnonzero(~bad)
+        if not self._data.flags.writeable or self._data_is_view:
+            self._data = self._data[keep]
+            self._data_is_view = False
+        else:
+            # runs of consecutive good epochs
+            breaks = np.flatnonzero(np.diff(keep) != 1) + 1
+            n = 0
+            for run in (np.split(keep, breaks) if keep.size else []):
+                if run[0] != n:
+                    self._data[n:n + run.size] = self._data[run[0]:run[-1] + 1]
+                n += run.size
+            self._data = self._data[:n]
+        
+        self.events = self.events[keep]
+        self.reject_log = self.reject_log[keep]
+        self.bad_epochs = np.zeros(keep.size, dtype=bool)
+        self._build_event_index()
+        return self
         
     def to_data_frame(self):
         """ Epochs to data frame
@@ -147,23 +447,124 @@ class BaseEpochs(TimeMixin, EpochsMixin):
         
         return deepcopy(self)
     
-    def plot(self):
+    def plot(self, block=True):
+        """Plot epochs, clicking on an epoch toggles it in ``bad_epochs``
+        
+
+        Parameters
+        ----------
+        block : bool, optional
+            If False, return without running the Qt event loop, see 
+            ``BasePlot.open``. The default is True.
+
+        Returns
+        -------
+        plot : EpochsPlot
+            The viewer. Keep a reference when not blocking.
+
+        """
+        from .viz.plotter import EpochsPlot
+        
         return EpochsPlot(epochs=self, info=self.info, data=self._data, events=self.events, 
                           tmin=self.tmin, tmax=self.tmax, event_id=self.event_id, 
-                          picks=self.picks)
+                          picks=self.picks, block=block)
 
     
     
 class Epochs(BaseEpochs):
     
-    def __init__(self, raw, events, event_id=None, picks=None, tmin=0, tmax=5.0):
+    def __init__(self, raw, events, event_id=None, picks=None, tmin=0, tmax=5.0, reject=None):
         
         if not isinstance(raw, BaseRaw):
             raise RuntimeError("Argument raw must be an instance of fne.io.BaseRaw")
         
-        info = deepcopy(raw.info)
+        info = raw.info.copy()
         
         super(Epochs, self).__init__(info=info, data=None, events=events, 
                                      event_id=event_id, raw=raw, picks=picks, 
-                                     tmin=tmin, tmax=tmax)
+                                     tmin=tmin, tmax=tmax, reject=reject)
+    
+    @classmethod
+    def from_onsets(cls, raw, onsets, window=5, offset=0, event_id=1, picks=None, 
+                    tmin=-0.5, tmax=1.0, reject=None):
+        """Epochs locked to onsets of ``kang_onset_detection``
+        
+        Onsets are converted with ``myopy.algorithms.detection.onsets_to_events``, 
+        which corrects the offset of the moving average.
+
+        Parameters
+        ----------
+        raw : instance of BaseRaw
+            The raw data the signal of the detection was taken from.
+        onsets : ndarray
+            Onsets returned by ``kang_onset_detection``.
+        window : int, optional
+            The window of the moving average of the detection. The default 
+            is 5.
+        offset : int, optional
+            Index of the first sample of the signal in ``raw``. The default 
+            is 0.
+        event_id : int, optional
+            Event id of the onsets. The default is 1.
+        picks, tmin, tmax, reject
+            See ``Epochs``. The defaults of tmin and tmax are -0.5 and 1.0.
+
+        Returns
+        -------
+        epochs : instance of Epochs
+            The epochs, ``epochs.events`` holds onset times in s as floats.
+
+        """
+        from .algorithms.detection import onsets_to_events
         
+        events = onsets_to_events(onsets, raw.info['sfreq'], window=window, 
+                                  offset=offset, event_id=event_id)
+        return cls(raw, events, event_id=[event_id], picks=picks, tmin=tmin, 
+                   tmax=tmax, reject=reject)
+
+
+def _n_times(tmin, tmax, sfreq):
+    """Number of samples of an epoch from tmin to tmax, both included"""
+    # guard against floating point error like time_as_index, e.g.
+    # (0.3 - 0.1) * 1000 = 199.99999999999997
+    return int(np.floor((tmax - tmin) * sfreq + 1e-9)) + 1
+
+
+# Reason codes of reject_log, combined as bit flags
+REJECT_PEAK_TO_PEAK = 1
+REJECT_FLAT = 2
+
+
+def _reject_thresholds(info, picks, n_chan, peak_to_peak, flat):
+    """Upper and lower peak-to-peak limit per pick"""
+    ch_names = np.array(info['ch_names'])[picks if picks is not None else slice(None)]
+    ch_types = np.array(info['chs'].ch_types)[picks if picks is not None else slice(None)]
+    
+    def _per_pick(value, default):
+        limits = np.full(n_chan, default, dtype=np.float64)
+        if value is None:
+            return limits
+        if isinstance(value, dict):
+            unknown = set(value) - set(ch_names)
+            if unknown:
+                raise RuntimeError(f"Channels {sorted(unknown)} are not in the epochs.")
+            for i, name in enumerate(ch_names):
+                limits[i] = value.get(name, default)
+            return limits
+        value = np.asarray(value, dtype=np.float64)
+        if value.ndim == 0:
+            # TTL and event channels are not checked by default
+            limits[~np.isin(ch_types, ['TTL', 'event_id'])] = value
+            return limits
+        if value.shape != (n_chan,):
+            raise RuntimeError(f"Expected {n_chan} thresholds, got {value.size}.")
+        return value
+    
+    return _per_pick(peak_to_peak, np.inf), _per_pick(flat, -np.inf)
+
+
+def _reject_codes(ptp, high, low):
+    """Reason codes of n_epochs x n_chan peak-to-peak amplitudes"""
+    codes = (ptp > high) * np.int8(REJECT_PEAK_TO_PEAK)
+    codes |= (ptp < low) * np.int8(REJECT_FLAT)
+    return codes.astype(np.int8)
@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 import numpy as np
+from .profiling import instrument
 
 def find_event_begin(events):
     """
@@ -25,16 +26,17 @@ def binary2integer(x, ttl_inversed):
     return x.dot(1 << np.arange(x.shape[-1])) if ttl_inversed else x.dot(1 << np.arange(x.shape[-1] - 1, -1, -1))
 
 
+@instrument('find_events', nbytes=lambda result, raw: raw._data.nbytes)
 def find_events(raw):
     
     info = raw.info
-    picks = [i for i, chan in enumerate(info['chs']) if chan['ch_type'] in ['TTL', 'event_id']]
+    picks = info['chs'].get_picks(['TTL', 'event_id'])
     
     if 'ttl_inversed' in info['misc']:
         event_ids = binary2integer(raw._data[:, picks], info['misc']['ttl_inversed'])
         start_ids = find_event_begin(event_ids)
         mask = np.ma.masked_where(start_ids > -1, start_ids).mask
-        times = raw.times[mask]
+        times = raw.index_as_time(np.flatnonzero(mask))
         event_ids = event_ids[mask]
         
         return np.array([times, event_ids], dtype=int).T
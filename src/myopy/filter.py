@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""IIR filtering with second-order sections and polyphase resampling
+
+All functions work on n_times x n_chan arrays and filter along the time axis.
+SciPy is imported when a filter is designed or applied.
+"""
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+
+
+def design_filter(sfreq, l_freq=None, h_freq=None, order=4):
+    """Design a Butterworth filter as second-order sections
+
+
+    Parameters
+    ----------
+    sfreq : float
+        The sample rate in Hz.
+    l_freq : float, optional
+        Lower pass-band edge in Hz. If None, a low-pass filter is designed.
+        The default is None.
+    h_freq : float, optional
+        Upper pass-band edge in Hz. If None, a high-pass filter is designed.
+        The default is None.
+    order : int, optional
+        Order of the filter. The default is 4.
+
+    Returns
+    -------
+    sos : ndarray
+        n_sections x 6 array of second-order sections.
+
+    """
+    from scipy import signal
+
+    nyquist = sfreq / 2.
+    for freq in (l_freq, h_freq):
+        if freq is not None and not 0 < freq < nyquist:
+            raise RuntimeError(f'Filter frequencies must be between 0 and the '
+                               f'Nyquist frequency {nyquist} Hz, got {freq}.')
+
+    if l_freq is not None and h_freq is not None:
+        if l_freq >= h_freq:
+            raise RuntimeError('l_freq must be smaller than h_freq.')
+        btype, freqs = 'bandpass', [l_freq, h_freq]
+    elif l_freq is not None:
+        btype, freqs = 'highpass', l_freq
+    elif h_freq is not None:
+        btype, freqs = 'lowpass', h_freq
+    else:
+        raise RuntimeError('At least one of l_freq and h_freq must be given.')
+
+    return signal.butter(order, freqs, btype=btype, fs=sfreq, output='sos')
+
+
+def design_notch(sfreq, freqs, quality=30.):
+    """Design a cascade of notch filters as second-order sections
+
+
+    Parameters
+    ----------
+    sfreq : float
+        The sample rate in Hz.
+    freqs : float | list of float
+        Frequencies to remove in Hz, e.g. line noise and its harmonics.
+    quality : float, optional
+        Quality factor of each notch. The default is 30.
+
+    Returns
+    -------
+    sos : ndarray
+        n_sections x 6 array of second-order sections.
+
+    """
+    from scipy import signal
+
+    sos = []
+    for freq in np.atleast_1d(freqs):
+        if not 0 < freq < sfreq / 2.:
+            raise RuntimeError(f'Notch frequency {freq} Hz is outside of '
+                               f'(0, {sfreq / 2.}) Hz.')
+        b, a = signal.iirnotch(freq, quality, fs=sfreq)
+        sos.append(signal.tf2sos(b, a))
+
+    return np.concatenate(sos)
+
+
+def filter_data(data, sos, picks=None, zero_phase=False, n_jobs=1):
+    """Filter channels of an array in place
+
+
+    Parameters
+    ----------
+    data : ndarray
+        n_times x n_chan array of data, modified in place.
+    sos : ndarray
+        Second-order sections, see ``design_filter``.
+    picks : list, optional
+        Channels to filter. The default is None, i.e. all channels.
+    zero_phase : bool, optional
+        If True, filter forward and backward. The default is False.
+    n_jobs : int, optional
+        Number of threads the channels are split across. The default is 1.
+
+    Returns
+    -------
+    data : ndarray
+        The filtered data.
+
+    """
+    from scipy import signal
+
+    if picks is None:
+        picks = np.arange(data.shape[1])
+    picks = np.asarray(picks)
+    if picks.size == 0:
+        return data
+
+    def _filter(group):
+        x = data[:, group]
+        if zero_phase:
+            x = signal.sosfiltfilt(sos, x, axis=0)
+        else:
+            x = signal.sosfilt(sos, x, axis=0)
+        data[:, group] = x
+
+    groups = np.array_split(picks, max(1, min(int(n_jobs), picks.size)))
+    if len(groups) == 1:
+        _filter(groups[0])
+    else:
+        # scipy releases the GIL while filtering
+        with ThreadPoolExecutor(max_workers=len(groups)) as executor:
+            list(executor.map(_filter, groups))
+
+    return data
+
+
+class StreamingFilter:
+    """Causal filter that carries its state across consecutive blocks
+
+    Filtering a recording block by block gives the same result as filtering
+    it at once with ``filter_data(..., zero_phase=False)``.
+
+    Parameters
+    ----------
+    sos : ndarray
+        Second-order sections, see ``design_filter`` and ``design_notch``.
+    n_chan : int
+        Number of channels of the blocks.
+    """
+
+    def __init__(self, sos, n_chan):
+        self.sos = np.asarray(sos, dtype=np.float64)
+        self.n_chan = n_chan
+        self.reset()
+
+    def reset(self):
+        """Reset the filter state to zero"""
+        self.zi = np.zeros((self.sos.shape[0], 2, self.n_chan))
+
+    def process(self, block):
+        """Filter the next block
+
+
+        Parameters
+        ----------
+        block : ndarray
+            n_times x n_chan block of data.
+
+        Returns
+        -------
+        out : ndarray
+            The filtered block.
+
+        """
+        from scipy import signal
+
+        if block.shape[0] == 0:
+            return np.empty(block.shape)
+        out, self.zi = signal.sosfilt(self.sos, block, axis=0, zi=self.zi)
+        return out
+
+
+def resample_data(data, up, down, picks=None, chunk_size=None):
+    """Resample n_times x n_chan data by a rational factor up / down
+
+    Picked channels are filtered with an anti-aliasing polyphase FIR filter
+    (``scipy.signal.resample_poly``), all other channels, e.g. TTL channels,
+    are resampled by sample and hold so that their values are preserved.
+
+
+    Parameters
+    ----------
+    data : ndarray
+        n_times x n_chan array of data.
+    up : int
+        Upsampling factor.
+    down : int
+        Downsampling factor.
+    picks : list, optional
+        Channels to filter. The default is None, i.e. all channels.
+    chunk_size : int, optional
+        Number of input samples processed at once. Chunks are padded with
+        their neighbouring samples by the length of the filter, which gives
+        the same result as resampling at once. The default is None, i.e.
+        resample at once.
+
+    Returns
+    -------
+    out : ndarray
+        n_times * up / down x n_chan array of resampled data.
+
+    """
+    from scipy import signal
+
+    g = np.gcd(int(up), int(down))
+    up, down = int(up) // g, int(down) // g
+
+    n_times, n_chan = data.shape
+    n_out = -(-n_times * up // down)
+    if picks is None:
+        picks = np.arange(n_chan)
+    picks = np.asarray(picks, dtype=int)
+    hold = np.setdiff1d(np.arange(n_chan), picks)
+
+    out = np.empty((n_out, n_chan), dtype=np.float64)
+    if hold.size:
+        out[:, hold] = data[np.ix_((np.arange(n_out) * down) // up, hold)]
+    if picks.size == 0:
+        return out
+    if up == down == 1:
+        out[:, picks] = data[:, picks]
+        return out
+
+    if chunk_size is None:
+        out[:, picks] = signal.resample_poly(data[:, picks], up, down, axis=0)
+        return out
+
+    # input samples reached by the default filter of resample_poly, chunks
+    # start at multiples of down so they map to whole output samples
+    half_len = 10 * max(up, down)
+    pad = -(-(half_len // up + 2) // down) * down
+    chunk_size = max(down, chunk_size - chunk_size % down)
+
+    for start in range(0, n_times, chunk_size):
+        stop = min(start + chunk_size, n_times)
+        lo, hi = max(start - pad, 0), min(stop + pad, n_times)
+        y = signal.resample_poly(data[lo:hi, picks], up, down, axis=0)
+        first = (start - lo) * up // down
+        out_start = start * up // down
+        out_stop = n_out if stop == n_times else stop * up // down
+        out[out_start:out_stop, picks] = y[first:first + out_stop - out_start]
+
+    return out
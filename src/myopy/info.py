@@ -2,10 +2,132 @@
 # -*- coding: utf-8 -*-
 from copy import deepcopy
 
+
+class ChannelTable:
+    """Immutable table of channel names and types.
+
+    The table is shared between copies of :class:`Info`. Adding channels
+    returns a new table and leaves the original untouched, so copying an
+    Info never has to walk the channels.
+
+    Parameters
+    ----------
+    ch_names : list of str
+        The channel names.
+    ch_types : str | list of str, optional
+        The channel type of every channel or a single type for all channels.
+        The default is None.
+    """
+
+    __slots__ = ('_ch_names', '_ch_types')
+
+    def __init__(self, ch_names=(), ch_types=None):
+        ch_names = tuple(ch_names)
+        if ch_types is None or isinstance(ch_types, str):
+            ch_types = (ch_types,) * len(ch_names)
+        else:
+            ch_types = tuple(ch_types)
+
+        if len(ch_types) != len(ch_names):
+            raise RuntimeError('Number of channel types does not match number '
+                               'of channel names.')
+
+        object.__setattr__(self, '_ch_names', ch_names)
+        object.__setattr__(self, '_ch_types', ch_types)
+
+    @classmethod
+    def from_chs(cls, chs):
+        """Create a table from a list of ``{'ch_name', 'ch_type'}`` dicts."""
+        if isinstance(chs, cls):
+            return chs
+        chs = list(chs)
+        return cls([ch['ch_name'] for ch in chs],
+                   [ch.get('ch_type') for ch in chs])
+
+    @property
+    def ch_names(self):
+        """Tuple of channel names"""
+        return self._ch_names
+
+    @property
+    def ch_types(self):
+        """Tuple of channel types"""
+        return self._ch_types
+
+    def add(self, ch_names, ch_types=None):
+        """Return a new table with channels appended
+
+
+        Parameters
+        ----------
+        ch_names : list of str
+            Names of the channels to append.
+        ch_types : str | list of str, optional
+            Type of the appended channels. The default is None.
+
+        Returns
+        -------
+        table : ChannelTable
+            A new table, the instance itself is not modified.
+
+        """
+        other = ChannelTable(ch_names, ch_types)
+        return ChannelTable(self._ch_names + other._ch_names,
+                            self._ch_types + other._ch_types)
+
+    def get_picks(self, ch_types):
+        """Indices of channels whose type is in ``ch_types``"""
+        if isinstance(ch_types, str):
+            ch_types = [ch_types]
+        return [i for i, ch_type in enumerate(self._ch_types)
+                if ch_type in ch_types]
+
+    def __setattr__(self, key, val):
+        raise AttributeError('ChannelTable is immutable')
+
+    def __len__(self):
+        return len(self._ch_names)
+
+    def __iter__(self):
+        for ch_name, ch_type in zip(self._ch_names, self._ch_types):
+            yield {'ch_name': ch_name, 'ch_type': ch_type}
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return ChannelTable(self._ch_names[idx], self._ch_types[idx])
+        return {'ch_name': self._ch_names[idx], 'ch_type': self._ch_types[idx]}
+
+    def __eq__(self, other):
+        if not isinstance(other, ChannelTable):
+            return NotImplemented
+        return (self._ch_names == other._ch_names
+                and self._ch_types == other._ch_types)
+
+    def __hash__(self):
+        return hash((self._ch_names, self._ch_types))
+
+    def __repr__(self):
+        return f"<ChannelTable | {len(self)} channels>"
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __reduce__(self):
+        return (self.__class__, (self._ch_names, self._ch_types))
+
+
 class Info(dict):
-    """Measurement info"""
-    
-    
+    """Measurement info
+
+    Channel names and types are held in an immutable :class:`ChannelTable`
+    which copies of the instance share. ``info['ch_names']`` is the tuple of
+    names of that table.
+    """
+
+
     _attributes = {
         'fnames': 'fnames cannot be set directly',
         'ch_names': 'ch_names cannot be set directly',
@@ -15,12 +137,17 @@ class Info(dict):
         'misc': 'misc cannot be set directly',
         'orig_ch': 'orig_ch cannot be set directly'
         }
-    
+
     def __init__(self, *args, **kwargs):
         self._unlocked = True
         super().__init__(*args, **kwargs)
+        # dict.__init__ bypasses __setitem__, normalize the channel entries
+        if 'chs' in self:
+            self['chs'] = self['chs']
+        if 'ch_names' in self:
+            self['ch_names'] = self['ch_names']
         self._unlocked = False
-        
+
     def __setitem__(self, key, val):
         """Attribute setter."""
         unlocked = getattr(self, '_unlocked', True)
@@ -29,37 +156,95 @@ class Info(dict):
                 raise RuntimeError(self._attributes[key])
         else:
             raise RuntimeError(f"Setting of key {repr(key)} is not supported")
-        
+
+        if key == 'chs':
+            val = ChannelTable.from_chs(val)
+        elif key == 'ch_names':
+            val = tuple(val)
+
         super().__setitem__(key, val)
-    
+
     def __update__(self, **kwargs):
         """Update method using __setitem__()."""
         for key, val in kwargs.items():
             self[key] = val
-            
-    def __deepcopy__(self, memo):
-        # Create a new instance of the class
-        new_obj = self.__class__()
+
+    def _add_channels(self, ch_names, ch_type=None):
+        """Append channels to the channel table, requires an unlocked Info"""
+        chs = self['chs'].add(ch_names, ch_type)
+        self['chs'] = chs
+        self['ch_names'] = chs.ch_names
+        self['nchan'] = len(chs)
+
+    def _copy(self, copy_value):
+        new_obj = self.__class__.__new__(self.__class__)
         new_obj._unlocked = True
-        # Deep copy the dictionary attributes
         for key, value in self.items():
-            new_obj[key] = deepcopy(value, memo)
-        # Deep copy the attributes that are not part of the dictionary
-        for attr in ['_attributes', '_unlocked']:
-            value = getattr(self, attr)
-            setattr(new_obj, attr, deepcopy(value, memo))
-            
-        new_obj.unlocked = False
+            if key in ('chs', 'ch_names'):
+                # immutable, shared between copies
+                dict.__setitem__(new_obj, key, value)
+            else:
+                new_obj[key] = copy_value(value)
+        new_obj._unlocked = False
         return new_obj
-            
+
+    def __deepcopy__(self, memo):
+        return self._copy(lambda value: deepcopy(value, memo))
+
+    def __copy__(self):
+        return self.copy()
+
     def copy(self):
-        """ Returns a deepcopy of the instance """
-        return deepcopy(self)
-    
+        """Returns a copy of the instance
+
+        The channel table is shared with the copy, only the containers in
+        ``fnames`` and ``misc`` are copied (shallow). The cost does not depend
+        on the number of channels.
+        """
+        def copy_value(value):
+            if isinstance(value, (list, dict)):
+                return value.copy()
+            return value
+
+        return self._copy(copy_value)
+
+    def to_json(self):
+        """Serialize the instance to a JSON string
+
+        Channels are stored as a list of ``{'ch_name', 'ch_type'}`` dicts,
+        NumPy values in ``misc`` as plain numbers and lists.
+        """
+        import json
+
+        def default(value):
+            if hasattr(value, 'tolist'):
+                return value.tolist()
+            if isinstance(value, (tuple, set)):
+                return list(value)
+            raise TypeError(f"{type(value).__name__} in Info is not JSON serializable")
+
+        state = {key: (list(value) if key == 'chs' else value)
+                 for key, value in self.items()}
+        return json.dumps(state, default=default)
+
+    @classmethod
+    def from_json(cls, s):
+        """Create an instance from a string of ``to_json``"""
+        import json
+
+        return cls(json.loads(s))
+
+def _pick_data_channels(info, picks=None):
+    """Return picks, defaulting to all channels except TTL and event channels"""
+    if picks is not None:
+        return list(picks)
+    return [i for i, ch_type in enumerate(info['chs'].ch_types)
+            if ch_type not in ('TTL', 'event_id')]
+
 def create_info(ch_names, sfreq, ch_type=None):
     """
     Create an instance of the Info class.
-    
+
     Parameters
     ----------
     ch_names : int or list of str
@@ -69,7 +254,7 @@ def create_info(ch_names, sfreq, ch_type=None):
         The sample rate in Hz.
     ch_type : str, optional
         The type of channels. Default is None.
-        
+
     Returns
     -------
     info : Info
@@ -80,14 +265,12 @@ def create_info(ch_names, sfreq, ch_type=None):
             ch_names = [f"{ch_type}{i}" for i in range(1, ch_names+1)]
         else:
             ch_names = [str(i) for i in range(1, ch_names+1)]
+    chs = ChannelTable(ch_names, ch_type)
     return Info({
         'fnames': [],
-        'ch_names': ch_names,
+        'ch_names': chs.ch_names,
         'sfreq': sfreq,
-        'chs': [{'ch_name': ch_name, 'ch_type': ch_type} for ch_name in ch_names],
-        'nchan': len(ch_names),
+        'chs': chs,
+        'nchan': len(chs),
         'misc': {}
     })
-
-
-    
\ No newline at end of file
@@ -5,9 +5,12 @@ import numpy as np
 from copy import deepcopy
 import pandas as pd
 from ..mixin import TimeMixin 
-from ..info import Info
-from ..viz.plotter import RawPlot
+from ..info import Info, _pick_data_channels
 import pickle
+from itertools import count
+
+# Versions of data, unique across instances, see BaseRaw._data_changed
+_data_versions = count()
 
 class BaseRaw(TimeMixin):
     """Base class for raw data
@@ -15,7 +18,7 @@ class BaseRaw(TimeMixin):
     Parameters
     ----------
     data : ndarray
-        n_chan x n_times array of data
+        n_times x n_chan array of data
         
     first_samp : int
         Index of the first sample 
@@ -44,7 +47,8 @@ class BaseRaw(TimeMixin):
         self._last_samp = last_samp
         self._first_samp = first_samp
         
-        self._data = self._data[:, self.first_samp:self.last_samp]
+        self._data = self._data[:self.n_times]
+        self._data_version = next(_data_versions)
         
         assert len(self) == self.times.size, "this should not happen"
         
@@ -71,8 +75,61 @@ class BaseRaw(TimeMixin):
     
     @property
     def times(self):
-        """Time points in ms"""
-        return np.arange(self.n_times, dtype=np.float64) / self.info['sfreq']
+        """Time points in s
+        
+        The array is computed once and cached until the number of samples 
+        changes. It is read-only.
+        """
+        times = getattr(self, '_times', None)
+        if times is None or times.size != self.n_times:
+            times = self.index_as_time(np.arange(self.n_times))
+            times.flags.writeable = False
+            self._times = times
+        return times
+    
+    def time_as_index(self, times, use_rounding=False):
+        """Convert time points to sample indices
+        
+
+        Parameters
+        ----------
+        times : float | ndarray
+            Time points in s relative to the first sample.
+        use_rounding : bool, optional
+            If True, round to the nearest sample. Otherwise the index of the 
+            first sample at or after the time point is returned. The default 
+            is False.
+
+        Returns
+        -------
+        index : ndarray
+            Sample indices as int64. Indices are not clipped to the data.
+
+        """
+        index = np.atleast_1d(np.asarray(times, dtype=np.float64)) * self.info['sfreq']
+        if use_rounding:
+            index = np.round(index)
+        else:
+            # guard against floating point error, e.g. 0.3 * 10 = 3.0000000000000004
+            index = np.ceil(index - 1e-9)
+        return index.astype(np.int64)
+    
+    def index_as_time(self, index):
+        """Convert sample indices to time points
+        
+
+        Parameters
+        ----------
+        index : int | ndarray
+            Sample indices relative to the first sample.
+
+        Returns
+        -------
+        times : ndarray
+            Time points in s.
+
+        """
+        return np.atleast_1d(np.asarray(index, dtype=np.float64)) / self.info['sfreq']
     
     @property
     def n_times(self):
@@ -114,6 +171,15 @@ class BaseRaw(TimeMixin):
         """
         return self._data, self.times
     
+    def _data_changed(self):
+        """Give the data a new version, called by methods changing it in place
+        
+        Caches of results derived from the data, e.g. of 
+        ``myopy.pipeline.Pipeline``, compare the version. Writes to ``_data`` 
+        from outside these methods are not tracked.
+        """
+        self._data_version = next(_data_versions)
+    
     def copy(self):
         """ Returns a deepcopy of the instance """
         return deepcopy(self)
@@ -136,10 +202,263 @@ class BaseRaw(TimeMixin):
         
         self._data = new_data
         self._last_samp = last_samp
+        self._times = None
+        self._data_changed()
         
-    def plot(self, picks=None):
+    def filter(self, l_freq, h_freq, picks=None, order=4, zero_phase=False, 
+               n_jobs=1):
+        """Filter data in place with a Butterworth filter
+        
+        If ``l_freq`` is None a low-pass, if ``h_freq`` is None a high-pass 
+        and otherwise a band-pass filter is applied. Use 
+        ``myopy.filter.StreamingFilter`` with ``myopy.filter.design_filter`` 
+        to get the same result block by block.
+
+        Parameters
+        ----------
+        l_freq : float | None
+            Lower pass-band edge in Hz.
+        h_freq : float | None
+            Upper pass-band edge in Hz.
+        picks : list, optional
+            Channels to filter. The default is None, i.e. all channels except 
+            TTL and event channels.
+        order : int, optional
+            Order of the filter. The default is 4.
+        zero_phase : bool, optional
+            If True, filter forward and backward. The default is False.
+        n_jobs : int, optional
+            Number of threads the channels are split across. The default is 1.
+
+        Returns
+        -------
+        raw : instance of BaseRaw
+            The instance itself.
+
+        """
+        from ..filter import design_filter, filter_data
+        
+        sos = design_filter(self.info['sfreq'], l_freq, h_freq, order=order)
+        filter_data(self._data, sos, _pick_data_channels(self.info, picks), 
+                    zero_phase=zero_phase, n_jobs=n_jobs)
+        self._data_changed()
+        return self
+    
+    def notch_filter(self, freqs, picks=None, quality=30., zero_phase=False, 
+                     n_jobs=1):
+        """Remove line noise in place with notch filters
+        
+
+        Parameters
+        ----------
+        freqs : float | list of float
+            Frequencies to remove in Hz.
+        picks : list, optional
+            Channels to filter. The default is None, i.e. all channels except 
+            TTL and event channels.
+        quality : float, optional
+            Quality factor of each notch. The default is 30.
+        zero_phase : bool, optional
+            If True, filter forward and backward. The default is False.
+        n_jobs : int, optional
+            Number of threads the channels are split across. The default is 1.
+
+        Returns
+        -------
+        raw : instance of BaseRaw
+            The instance itself.
+
+        """
+        from ..filter import design_notch, filter_data
+        
+        sos = design_notch(self.info['sfreq'], freqs, quality=quality)
+        filter_data(self._data, sos, _pick_data_channels(self.info, picks), 
+                    zero_phase=zero_phase, n_jobs=n_jobs)
+        self._data_changed()
+        return self
+        
+    def resample(self, sfreq, picks=None, chunk_size=None):
+        """Resample data in place with an anti-aliasing polyphase filter
+        
+        TTL and event channels are resampled by sample and hold, so 
+        ``find_events`` decodes the same events afterwards. Event times are 
+        in s and stay valid.
+
+        Parameters
+        ----------
+        sfreq : float
+            New sample rate in Hz. The ratio to the current sample rate is 
+            approximated by a fraction with a denominator of at most 1000.
+        picks : list, optional
+            Channels to filter. The default is None, i.e. all channels except 
+            TTL and event channels.
+        chunk_size : int, optional
+            Number of samples resampled at once, see 
+            ``myopy.filter.resample_data``. The default is None.
+
+        Returns
+        -------
+        raw : instance of BaseRaw
+            The instance itself.
+
+        """
+        from fractions import Fraction
+        from ..filter import resample_data
+        
+        ratio = Fraction(sfreq / self.info['sfreq']).limit_denominator(1000)
+        if ratio <= 0:
+            raise RuntimeError('sfreq must be positive.')
+        
+        self._data = resample_data(self._data, ratio.numerator, ratio.denominator, 
+                                   picks=_pick_data_channels(self.info, picks), 
+                                   chunk_size=chunk_size)
+        self._last_samp = self.first_samp + self._data.shape[0] - 1
+        self._times = None
+        self._data_changed()
+        
+        # Info might be shared with other instances
+        self.info = self.info.copy()
+        self.info._unlocked = True
+        self.info['sfreq'] = self.info['sfreq'] * ratio.numerator / ratio.denominator
+        self.info._unlocked = False
+        
+        return self
+        
+    def envelope(self, method='rms', window=None, h_freq=None, picks=None, 
+                 out=None, chunk_size=2 ** 16):
+        """Compute the envelope of EMG channels
+        
+        Windows are trailing, see ``myopy.emg.envelope``. The cost per sample 
+        does not depend on the window size.
+
+        Parameters
+        ----------
+        method : str, optional
+            'rms' or 'mav' for the root mean square or mean absolute value of 
+            a moving window, 'lowpass' for the rectified signal low-pass 
+            filtered at ``h_freq``. The default is 'rms'.
+        window : float, optional
+            Window size in s for 'rms' and 'mav'.
+        h_freq : float, optional
+            Cut-off frequency in Hz for 'lowpass'.
+        picks : list, optional
+            Channels to use. The default is None, i.e. all channels except 
+            TTL and event channels.
+        out : ndarray, optional
+            n_times x n_picks array, e.g. float32, the envelope is written to. 
+            If None, the data is replaced in place. The default is None.
+        chunk_size : int, optional
+            Number of samples processed at once. The default is 2 ** 16.
+
+        Returns
+        -------
+        raw | out : instance of BaseRaw | ndarray
+            The instance itself if ``out`` is None, otherwise ``out``.
+
+        """
+        from ..emg.envelope import EnvelopeStream
+        
+        picks = _pick_data_channels(self.info, picks)
+        sfreq = self.info['sfreq']
+        
+        sos = None
+        if method == 'lowpass':
+            from ..filter import design_filter
+            if h_freq is None:
+                raise RuntimeError("method 'lowpass' requires h_freq.")
+            sos = design_filter(sfreq, h_freq=h_freq)
+        elif window is not None:
+            window = max(1, int(round(window * sfreq)))
+        
+        stream = EnvelopeStream(method, len(picks), window=window, sos=sos)
+        for start in range(0, len(self), chunk_size):
+            stop = start + chunk_size
+            env = stream.process(self._data[start:stop, picks])
+            if out is None:
+                self._data[start:stop, picks] = env
+            else:
+                out[start:stop] = env
+        
+        if out is None:
+            self._data_changed()
+        return self if out is None else out
+    
+    def normalize(self, method='zscore', stats=None, picks=None, chunk_size=2 ** 16):
+        """Normalize channels in place
+        
+        Statistics are computed in one pass over the data, chunk by chunk, 
+        unless they are given, and stored in ``info['misc']['normalize']``. 
+        See ``myopy.normalize.Normalizer``.
+
+        Parameters
+        ----------
+        method : str, optional
+            'zscore' or 'mvc'. Ignored if ``stats`` is given. The default is 
+            'zscore'.
+        stats : dict | Normalizer, optional
+            Statistics to apply, e.g. ``info['misc']['normalize']`` of 
+            another recording or a fitted ``Normalizer``. The default is None, 
+            i.e. compute them from this recording.
+        picks : list, optional
+            Channels to normalize. The default is None, i.e. the channels of 
+            ``stats`` or all channels except TTL and event channels.
+        chunk_size : int, optional
+            Number of samples processed at once. The default is 2 ** 16.
+
+        Returns
+        -------
+        raw : instance of BaseRaw
+            The instance itself.
+
+        """
+        from ..normalize import Normalizer
+        
+        if isinstance(stats, dict):
+            stats = Normalizer.from_dict(stats)
+        
+        if picks is None and stats is not None and stats.ch_names is not None:
+            missing = set(stats.ch_names) - set(self.info['ch_names'])
+            if missing:
+                raise RuntimeError(f"Channels {sorted(missing)} are not in the data.")
+            picks = [self.info['ch_names'].index(name) for name in stats.ch_names]
+        picks = _pick_data_channels(self.info, picks)
+        
+        if stats is None:
+            ch_names = [self.info['ch_names'][i] for i in picks]
+            stats = Normalizer(method, ch_names=ch_names)
+            for start in range(0, len(self), chunk_size):
+                stats.partial_fit(self._data[start:start + chunk_size, picks])
+        
+        stats.transform(self._data, picks=picks, out=self._data, chunk_size=chunk_size)
+        self._data_changed()
+        
+        # Info might be shared with other instances
+        self.info = self.info.copy()
+        self.info['misc']['normalize'] = stats.to_dict()
+        
+        return self
+    
+    def plot(self, picks=None, block=True):
+        """Plot raw data
+        
+
+        Parameters
+        ----------
+        picks : list, optional
+            Channels to plot. The default is None, i.e. all channels.
+        block : bool, optional
+            If False, return without running the Qt event loop, see 
+            ``BasePlot.open``. The default is True.
+
+        Returns
+        -------
+        plot : RawPlot
+            The viewer. Keep a reference when not blocking.
+
+        """
+        from ..viz.plotter import RawPlot
         
-        return RawPlot(self.info, self._data, self.times, picks=picks)
+        return RawPlot(self.info, self._data, picks=picks, block=block)
         
 def concatenate_raws(raws):
     """Concatenates a list of raws
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Binary sidecars of parsed tables
+
+``read_table(..., cache=True)`` stores the parsed data of a table as a
+``.npy`` file and its ``Info`` as JSON in a cache directory. Later reads of
+the same table with the same arguments memory-map the ``.npy`` file instead
+of parsing the text. Entries are keyed by the path, size and modification
+time of the table and the arguments of ``read_table``, so a changed table is
+parsed again and its outdated entries are removed. The least recently used
+entries are evicted when the cache grows beyond ``max_bytes``.
+
+The cache directory is ``cache_dir``, ``$MYOPY_CACHE_DIR`` or
+``~/.cache/myopy/tables``.
+"""
+import hashlib
+import json
+import os
+import uuid
+import numpy as np
+
+MAX_BYTES = 2 ** 33
+
+
+def get_cache_dir(cache_dir=None):
+    """Directory of the sidecars"""
+    if cache_dir is not None:
+        return cache_dir
+    return os.environ.get('MYOPY_CACHE_DIR',
+                          os.path.join(os.path.expanduser('~'), '.cache', 'myopy', 'tables'))
+
+
+def _keys(fname, args):
+    """Key of the source path and key of the entry"""
+    fname = os.path.abspath(fname)
+    stat = os.stat(fname)
+    path_key = hashlib.sha1(fname.encode()).hexdigest()[:16]
+    state = json.dumps({'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, **args},
+                       sort_keys=True)
+    return path_key, f"{path_key}-{hashlib.sha1(state.encode()).hexdigest()[:16]}"
+
+
+def _remove(cache_dir, key):
+    for ext in ('.json', '.npy'):
+        try:
+            os.remove(os.path.join(cache_dir, key + ext))
+        except FileNotFoundError:
+            pass
+
+
+def _entries(cache_dir):
+    """Key, size in bytes and last access of each entry, oldest first"""
+    entries = []
+    for name in os.listdir(cache_dir):
+        key, ext = os.path.splitext(name)
+        if ext != '.json':
+            continue
+        try:
+            # the JSON file is touched on every hit
+            last_access = os.stat(os.path.join(cache_dir, name)).st_mtime_ns
+            nbytes = sum(os.path.getsize(os.path.join(cache_dir, key + e))
+                         for e in ('.json', '.npy'))
+        except FileNotFoundError:
+            continue
+        entries.append((last_access, key, nbytes))
+    entries.sort()
+    return [(key, nbytes) for _, key, nbytes in entries]
+
+
+def load(fname, args, cache_dir=None):
+    """Load the sidecar of a table
+
+
+    Parameters
+    ----------
+    fname : str
+        Path of the table.
+    args : dict
+        JSON-serializable arguments the table was parsed with.
+    cache_dir : str, optional
+        The cache directory. The default is None, see ``get_cache_dir``.
+
+    Returns
+    -------
+    entry : tuple of (Info, ndarray) | None
+        The info and the copy-on-write memory-mapped data, None if the table
+        is not cached.
+
+    """
+    from ..info import Info
+
+    cache_dir = get_cache_dir(cache_dir)
+    _, key = _keys(fname, args)
+    fjson = os.path.join(cache_dir, key + '.json')
+    if not os.path.exists(fjson):
+        return None
+    try:
+        with open(fjson, 'r') as f:
+            info = Info.from_json(f.read())
+        # writes to the data are not written back to the file
+        data = np.load(os.path.join(cache_dir, key + '.npy'), mmap_mode='c')
+    except (OSError, ValueError):
+        _remove(cache_dir, key)
+        return None
+    os.utime(fjson)
+    return info, data
+
+
+def save(fname, args, info, data, cache_dir=None, max_bytes=MAX_BYTES):
+    """Store the sidecar of a table
+
+    Outdated entries of the same table are removed and the least recently
+    used entries are evicted until the cache is at most ``max_bytes``.
+
+
+    Parameters
+    ----------
+    fname : str
+        Path of the table.
+    args : dict
+        JSON-serializable arguments the table was parsed with.
+    info : Info
+        The info of the parsed table.
+    data : ndarray
+        The parsed data.
+    cache_dir : str, optional
+        The cache directory. The default is None, see ``get_cache_dir``.
+    max_bytes : int | None, optional
+        Size limit of the cache. The default is ``MAX_BYTES``, i.e. 8 GiB.
+        None for no limit.
+
+    """
+    cache_dir = get_cache_dir(cache_dir)
+    os.makedirs(cache_dir, exist_ok=True)
+    path_key, key = _keys(fname, args)
+
+    for name in os.listdir(cache_dir):
+        other = os.path.splitext(name)[0]
+        if other.startswith(path_key + '-') and other != key:
+            _remove(cache_dir, other)
+
+    # written under temporary names and renamed, the JSON file last, so
+    # readers never see a partial entry
+    tmp = f".{uuid.uuid4().hex}"
+    fnpy = os.path.join(cache_dir, key + '.npy')
+    with open(fnpy + tmp, 'wb') as f:
+        np.save(f, np.ascontiguousarray(data))
+    os.replace(fnpy + tmp, fnpy)
+    fjson = os.path.join(cache_dir, key + '.json')
+    with open(fjson + tmp, 'w') as f:
+        f.write(info.to_json())
+    os.replace(fjson + tmp, fjson)
+
+    if max_bytes is not None:
+        evict(cache_dir, max_bytes, keep=key)
+
+
+def evict(cache_dir=None, max_bytes=MAX_BYTES, keep=None):
+    """Remove least recently used entries until the cache is at most max_bytes"""
+    cache_dir = get_cache_dir(cache_dir)
+    entries = _entries(cache_dir)
+    total = sum(nbytes for _, nbytes in entries)
+    for key, nbytes in entries:
+        if total <= max_bytes:
+            break
+        if key == keep:
+            continue
+        _remove(cache_dir, key)
+        total -= nbytes
+
+
+def clear_cache(cache_dir=None):
+    """Remove all entries of the cache"""
+    cache_dir = get_cache_dir(cache_dir)
+    if os.path.isdir(cache_dir):
+        for name in os.listdir(cache_dir):
+            if name.endswith(('.json', '.npy')):
+                os.remove(os.path.join(cache_dir, name))
@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Lossless compressed storage of raw data
+
+``write_compressed`` stores a ``BaseRaw`` in a container of independently
+compressed chunks of samples:
+
+- Analog channels are quantized to integers ``q`` with ``x = q * step /
+  10 ** decimals`` (or ``/ 2 ** bits``). The smallest scale that gives back
+  every value exactly is used, e.g. 6 decimals for tables written with
+  ``%.6f``. Channels without such a scale keep the bits of their float64
+  values.
+- The integers are delta-encoded per chunk and stored with the smallest
+  integer dtype of the deltas.
+- TTL channels of 0 and 1 are stored packed, 8 samples per byte.
+- Each chunk is compressed with zlib or lzma.
+
+An index of the chunks is stored at the end of the file, so
+``read_compressed`` with ``tmin``/``tmax`` only reads and decompresses the
+chunks of that time range::
+
+    write_compressed(raw, 'sub-01.myz', codec='lzma')
+    raw = read_compressed('sub-01.myz', tmin=60., tmax=90.)
+"""
+import json
+import lzma
+import struct
+import zlib
+import numpy as np
+
+MAGIC = b'MYOPYZ01'
+_FOOTER = struct.Struct('<Q8s')
+_CODECS = ('zlib', 'lzma')
+_MAX_DECIMALS = 12
+# integers are exact in float64 up to 2 ** 53
+_MAX_EXACT = 2.0 ** 53
+
+
+def _same(a, b):
+    """True if two float64 arrays have the same bits, e.g. -0. is not 0."""
+    return np.array_equal(a.view(np.int64), b.view(np.int64))
+
+
+def _decode_values(q, encoding):
+    if encoding['kind'] == 'decimal':
+        return (q * encoding['step']).astype(np.float64) / 10.0 ** encoding['decimals']
+    if encoding['kind'] == 'binary':
+        return (q * encoding['step']).astype(np.float64) / 2.0 ** encoding['bits']
+    return q.view(np.float64)
+
+
+def _try_scale(x, kind, n):
+    """Exact encoding of x with a scale of 10 ** n or 2 ** n, None if there is none"""
+    scaled = x * (10.0 ** n if kind == 'decimal' else 2.0 ** n)
+    if np.abs(scaled).max(initial=0) >= _MAX_EXACT:
+        return None
+    q = np.round(scaled).astype(np.int64)
+    step = max(int(np.gcd.reduce(q)) if q.size else 1, 1)
+    encoding = {'kind': kind, 'decimals' if kind == 'decimal' else 'bits': n, 'step': step}
+    q //= step
+    if not _same(_decode_values(q, encoding), x):
+        return None
+    return encoding, q
+
+
+def _quantize(x, n_probe=4096):
+    """Encoding of a channel and its integers, exact or the float64 bits
+
+    The smallest decimal and binary scales are searched on the first
+    ``n_probe`` samples and checked on all, the one with the smaller
+    integers is used.
+    """
+    candidates = []
+    if np.all(np.isfinite(x)):
+        for kind, scales in (('decimal', range(_MAX_DECIMALS + 1)), ('binary', range(64))):
+            for n in scales:
+                probe = x[:n_probe] * (10.0 ** n if kind == 'decimal' else 2.0 ** n)
+                if np.abs(probe).max(initial=0) >= _MAX_EXACT:
+                    break
+                if _try_scale(x[:n_probe], kind, n) is None:
+                    continue
+                found = _try_scale(x, kind, n)
+                if found is not None:
+                    candidates.append(found)
+                    break
+    if candidates:
+        return min(candidates, key=lambda c: np.abs(c[1]).max(initial=0))
+    return {'kind': 'float64'}, np.ascontiguousarray(x).view(np.int64).copy()
+
+
+def _int_dtype(values):
+    if values.size == 0:
+        return np.dtype(np.int8)
+    low, high = values.min(), values.max()
+    for dtype in (np.int8, np.int16, np.int32):
+        info = np.iinfo(dtype)
+        if info.min <= low and high <= info.max:
+            return np.dtype(dtype)
+    return np.dtype(np.int64)
+
+
+def _compress(buffer, codec, level):
+    if codec == 'zlib':
+        return zlib.compress(buffer, 6 if level is None else level)
+    return lzma.compress(buffer, preset=6 if level is None else level)
+
+
+def _decompress(buffer, codec):
+    if codec == 'zlib':
+        return zlib.decompress(buffer)
+    return lzma.decompress(buffer)
+
+
+def _decode_chunk(buffer, meta, encodings, picks):
+    """n_times x len(picks) float64 array of a decompressed chunk"""
+    n_times = meta['n_times']
+    out = np.empty((n_times, len(picks)))
+    offsets = np.cumsum([0] + [ch['nbytes'] for ch in meta['channels']])
+    for k, pick in enumerate(picks):
+        ch, encoding = meta['channels'][pick], encodings[pick]
+        raw_bytes = buffer[offsets[pick]:offsets[pick + 1]]
+        if encoding['kind'] == 'packed':
+            out[:, k] = np.unpackbits(np.frombuffer(raw_bytes, dtype=np.uint8),
+                                      count=n_times)
+            continue
+        deltas = np.frombuffer(raw_bytes, dtype=ch['dtype'])
+        q = np.empty(n_times, dtype=np.int64)
+        if n_times:
+            # int64 arithmetic wraps, so the deltas of float bits decode too
+            q[0] = ch['first']
+            np.cumsum(deltas, dtype=np.int64, out=q[1:])
+            q[1:] += ch['first']
+        out[:, k] = _decode_values(q, encoding)
+    return out
+
+
+def write_compressed(raw, fname, chunk_size=2 ** 16, codec='zlib', level=None,
+                     verify=True):
+    """Write raw data to a lossless compressed container
+
+
+    Parameters
+    ----------
+    raw : instance of BaseRaw
+        The raw data.
+    fname : str
+        Path of the container.
+    chunk_size : int, optional
+        Number of samples per chunk, the unit of random access. The default
+        is 2 ** 16.
+    codec : str, optional
+        'zlib' or 'lzma'. lzma compresses better and is slower. The default
+        is 'zlib'.
+    level : int, optional
+        Compression level of zlib (0-9) or preset of lzma (0-9). The default
+        is None, i.e. 6.
+    verify : bool, optional
+        If True, every chunk is decoded again and compared with the original
+        values. The default is True.
+
+    Returns
+    -------
+    ratio : float
+        Size of the float64 data divided by the size of the container.
+
+    """
+    import os
+
+    if codec not in _CODECS:
+        raise RuntimeError(f"codec must be one of {_CODECS}, got {codec!r}")
+
+    data = raw._data
+    n_times, n_chan = data.shape
+    ch_types = raw.info['chs'].ch_types
+
+    encodings, channels = [], []
+    for i in range(n_chan):
+        x = np.ascontiguousarray(data[:, i], dtype=np.float64)
+        if ch_types[i] == 'TTL' and np.all((x == 0) | (x == 1)) and _same(np.abs(x), x):
+            encodings.append({'kind': 'packed'})
+            channels.append(x.astype(np.uint8))
+        else:
+            encoding, q = _quantize(x)
+            encodings.append(encoding)
+            channels.append(q)
+
+    chunks = []
+    with open(fname, 'wb') as f:
+        f.write(MAGIC)
+        for start in range(0, n_times, chunk_size):
+            stop = min(start + chunk_size, n_times)
+            parts, meta = [], {'start': start, 'n_times': stop - start, 'channels': []}
+            for encoding, values in zip(encodings, channels):
+                block = values[start:stop]
+                if encoding['kind'] == 'packed':
+                    part = np.packbits(block).tobytes()
+                    meta['channels'].append({'nbytes': len(part)})
+                else:
+                    deltas = np.diff(block)
+                    dtype = _int_dtype(deltas)
+                    part = deltas.astype(dtype).tobytes()
+                    meta['channels'].append({'nbytes': len(part), 'dtype': dtype.str,
+                                             'first': int(block[0])})
+                parts.append(part)
+
+            buffer = b''.join(parts)
+            if verify:
+                decoded = _decode_chunk(buffer, meta, encodings, range(n_chan))
+                if not _same(decoded, np.ascontiguousarray(data[start:stop], dtype=np.float64)):
+                    raise RuntimeError(f"Round trip of samples {start} to {stop} is not lossless.")
+
+            compressed = _compress(buffer, codec, level)
+            meta['offset'] = f.tell()
+            meta['nbytes'] = len(compressed)
+            f.write(compressed)
+            chunks.append(meta)
+
+        footer = json.dumps({'info': json.loads(raw.info.to_json()),
+                             'n_times': n_times, 'chunk_size': chunk_size,
+                             'codec': codec, 'encodings': encodings,
+                             'chunks': chunks}).encode()
+        f.write(footer)
+        f.write(_FOOTER.pack(len(footer), MAGIC))
+
+    return data.nbytes / max(os.path.getsize(fname), 1)
+
+
+def _read_footer(f):
+    f.seek(-_FOOTER.size, 2)
+    size, magic = _FOOTER.unpack(f.read(_FOOTER.size))
+    if magic != MAGIC:
+        raise RuntimeError('Not a compressed MyoPy file.')
+    f.seek(-_FOOTER.size - size, 2)
+    return json.loads(f.read(size))
+
+
+def read_compressed(fname, tmin=None, tmax=None, picks=None):
+    """Read raw data from a compressed container
+
+
+    Parameters
+    ----------
+    fname : str
+        Path of the container.
+    tmin : float, optional
+        Start of the time range in s. The default is None, i.e. the first
+        sample.
+    tmax : float, optional
+        End of the time range in s, included. The default is None, i.e. the
+        last sample.
+    picks : list of int, optional
+        Channels to read. The default is None, i.e. all channels.
+
+    Returns
+    -------
+    raw : instance of BaseRaw
+        The data of the time range, times are relative to its first sample
+        and ``first_samp`` is the index of that sample in the recording.
+
+    """
+    from ..info import Info
+    from .base import BaseRaw
+
+    with open(fname, 'rb') as f:
+        footer = _read_footer(f)
+        info = Info(footer['info'])
+        n_times, sfreq = footer['n_times'], info['sfreq']
+
+        start = 0 if tmin is None else int(np.ceil(tmin * sfreq - 1e-9))
+        stop = n_times if tmax is None else int(np.floor(tmax * sfreq + 1e-9)) + 1
+        start, stop = max(start, 0), min(stop, n_times)
+        if stop <= start:
+            raise RuntimeError(f"No samples between tmin={tmin} and tmax={tmax}.")
+
+        picks = list(range(info['nchan'])) if picks is None else list(picks)
+        data = np.empty((stop - start, len(picks)))
+        for meta in footer['chunks']:
+            first, last = meta['start'], meta['start'] + meta['n_times']
+            if last <= start or first >= stop:
+                continue
+            f.seek(meta['offset'])
+            buffer = _decompress(f.read(meta['nbytes']), footer['codec'])
+            chunk = _decode_chunk(buffer, meta, footer['encodings'], picks)
+            lo, hi = max(first, start), min(last, stop)
+            data[lo - start:hi - start] = chunk[lo - first:hi - first]
+
+    if picks != list(range(info['nchan'])):
+        chs = info['chs'][:0].add([info['ch_names'][p] for p in picks],
+                                  [info['chs'].ch_types[p] for p in picks])
+        info._unlocked = True
+        info['chs'] = chs
+        info['ch_names'] = chs.ch_names
+        info['nchan'] = len(chs)
+        info._unlocked = False
+
+    return BaseRaw(info, data, first_samp=start)
@@ -1,13 +1,18 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
+import os
 from ..base import BaseRaw
+from ..cache import MAX_BYTES
+from ...profiling import instrument
 import numpy as np
 import pandas as pd 
 
 class Tables(BaseRaw):
+    @instrument('read_table', 
+                nbytes=lambda result, self, fname, *args, **kwargs: os.path.getsize(fname))
     def __init__(self, fname, info, col_data, col_events=None, ttl_inversed=True, 
-                 na_to_zero=True, delimiter=','):
+                 na_to_zero=True, delimiter=',', start=0, stop=None):
         """
         Initialize a Tables instance.
         
@@ -29,6 +34,11 @@ class Tables(BaseRaw):
             The delimiter used in the file.
         converters : func
             Function to handle edge cases in table. Default is empty_convert().
+        start : int
+            First row of data to read. Default is 0.
+        stop : int
+            Row of data to stop reading at. Default is None, i.e. the end of 
+            the table.
         """
         
 
@@ -50,16 +60,11 @@ class Tables(BaseRaw):
         if col_events:
             if len(col_events) > 1:
                 _info['misc']['ttl_inversed'] = ttl_inversed
-                ch_type = 'TTL'
-                for i, ch in enumerate(col_events):
-                    ch_name = f"TTL{i+1}"
-                    _info['chs'].append({'ch_name': ch_name, 'ch_type': ch_type})
-                    _info['ch_names'].append(ch_name)
+                ch_names = [f"TTL{i+1}" for i in range(len(col_events))]
+                _info._add_channels(ch_names, 'TTL')
             else:
                 ch_type = 'event_id'
-                _info['chs'].append({'ch_name': ch_type, 'ch_type': ch_type})
-                _info['ch_names'].append(ch_name)
-        _info.update({'nchan': len(_info['ch_names'])})
+                _info._add_channels([ch_type], ch_type)
         
         # Handle duplicates in chs
         # chs = info['chs']
@@ -68,7 +73,11 @@ class Tables(BaseRaw):
             
         _info._unlocked = False
         
-        data = pd.read_csv(fname, delimiter=delimiter, usecols=usecols)
+        # the header is kept, only rows of data are skipped
+        skiprows = range(1, start + 1) if start else None
+        nrows = None if stop is None else max(stop - start, 0)
+        data = pd.read_csv(fname, delimiter=delimiter, usecols=usecols, 
+                           skiprows=skiprows, nrows=nrows)
         
         if na_to_zero:
             data = data.fillna(0)
@@ -84,7 +93,8 @@ class Tables(BaseRaw):
             
 
 def read_table(fname, info, col_data, col_events=None, ttl_inversed=True, 
-               na_to_zero=True, delimiter=','):
+               na_to_zero=True, delimiter=',', start=0, stop=None, cache=False, 
+               cache_dir=None, cache_max_bytes=MAX_BYTES):
     
     """
     Parameters
@@ -103,6 +113,24 @@ def read_table(fname, info, col_data, col_events=None, ttl_inversed=True,
     skiprows : int | list, optional
         Integer or list of integers ofrow idsto skip. The default is 1, corresponds
         to table header.
+    start : int, optional
+        First row of data to read. Times of the returned raw are relative to 
+        this row. The default is 0.
+    stop : int, optional
+        Row of data to stop reading at. The default is None, i.e. the end of 
+        the table.
+    cache : bool, optional
+        If True, the parsed table is stored in a binary sidecar on the first
+        read and memory-mapped (copy-on-write) on later reads, see 
+        ``myopy.io.cache``. The whole table is parsed and cached, ``start`` 
+        and ``stop`` select rows of the cached data. The default is False.
+    cache_dir : str, optional
+        Directory of the sidecars. The default is None, i.e. 
+        ``$MYOPY_CACHE_DIR`` or ``~/.cache/myopy/tables``.
+    cache_max_bytes : int | None, optional
+        Size limit of the cache directory, least recently used sidecars are
+        removed beyond it. None for no limit. The default is 2 ** 33, i.e. 
+        8 GiB.
 
     Returns
     -------
@@ -111,9 +139,43 @@ def read_table(fname, info, col_data, col_events=None, ttl_inversed=True,
 
     """
     
+    if cache:
+        return _read_table_cached(fname, info, col_data, col_events, ttl_inversed, 
+                                  na_to_zero, delimiter, start, stop, cache_dir, 
+                                  cache_max_bytes)
+    
     return Tables(fname=fname, info=info, col_data=col_data, 
                   col_events=col_events, ttl_inversed=ttl_inversed, 
-                  na_to_zero=na_to_zero, delimiter=delimiter)
+                  na_to_zero=na_to_zero, delimiter=delimiter, start=start, 
+                  stop=stop)
+
+
+def _read_table_cached(fname, info, col_data, col_events, ttl_inversed, 
+                       na_to_zero, delimiter, start, stop, cache_dir, max_bytes):
+    """Read a table through its sidecar, parsing and caching it if needed"""
+    import json
+    from .. import cache
+    
+    args = {'info': json.loads(info.to_json()),
+            'col_data': [int(c) for c in col_data],
+            'col_events': None if col_events is None else [int(c) for c in col_events],
+            'ttl_inversed': bool(ttl_inversed),
+            'na_to_zero': bool(na_to_zero),
+            'delimiter': delimiter}
+    
+    entry = cache.load(fname, args, cache_dir)
+    if entry is None:
+        raw = Tables(fname=fname, info=info, col_data=col_data, 
+                     col_events=col_events, ttl_inversed=ttl_inversed, 
+                     na_to_zero=na_to_zero, delimiter=delimiter)
+        cache.save(fname, args, raw.info, raw._data, cache_dir, 
+                   max_bytes)
+        if not start and stop is None:
+            return raw
+        entry = raw.info, raw._data
     
-   
-    
\ No newline at end of file
+    _info, data = entry
+    # a Tables instance without parsing the text
+    raw = Tables.__new__(Tables)
+    BaseRaw.__init__(raw, _info, data[start:stop])
+    return raw
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Compiled kernels of sequential hot loops with NumPy fallbacks
+
+The CFAR loop of ``kang_onset_detection``, its morphological cleanup and the
+trailing windows of ``myopy.emg.envelope`` are compiled with Numba when it
+is installed. Numba is imported and the kernels are compiled (and cached on
+disk, see ``myopy._kernels_numba``) at their first call, so importing MyoPy
+does not get slower. Without
+Numba the NumPy implementations are used, which give the same results::
+
+    from myopy import kernels
+
+    kernels.get_backend()          # 'numba' if installed, otherwise 'numpy'
+    kernels.set_backend('numpy')   # e.g. to compare both
+"""
+import importlib.util
+import numpy as np
+
+_BACKENDS = ('numba', 'numpy')
+_backend = None
+_numba_kernels = None
+
+
+def get_backend():
+    """Name of the backend in use, 'numba' or 'numpy'"""
+    global _backend
+    if _backend is None:
+        _backend = 'numba' if importlib.util.find_spec('numba') else 'numpy'
+    return _backend
+
+
+def set_backend(backend=None):
+    """Select the backend
+
+
+    Parameters
+    ----------
+    backend : str | None, optional
+        'numba', 'numpy' or None to use Numba if it is installed. The
+        default is None.
+
+    """
+    global _backend
+    if backend is not None and backend not in _BACKENDS:
+        raise RuntimeError(f"backend must be one of {_BACKENDS}, got {backend!r}")
+    if backend == 'numba' and not importlib.util.find_spec('numba'):
+        raise RuntimeError('Numba is not installed.')
+    _backend = backend
+
+
+def _numba():
+    """Import the Numba kernels once"""
+    global _numba_kernels
+    if _numba_kernels is None:
+        from . import _kernels_numba
+        _numba_kernels = {'cfar': _kernels_numba.cfar,
+                          'opening': _kernels_numba.opening,
+                          'trailing_mean': _kernels_numba.trailing_mean}
+    return _numba_kernels
+
+
+def _cfar_numpy(mvgav, n_out, n_side, n_guard, alpha, limit, chunk_size=2 ** 12):
+    out = np.zeros(n_out, dtype=bool)
+
+    def _cell(n):
+        cells = np.concatenate([mvgav[n - n_side:n - n_guard],
+                                mvgav[n + n_guard + 1:n + n_side + 1]])
+        if cells.size:
+            cfar_threshold = alpha * np.median(cells)
+            out[n] = mvgav[n] >= min(cfar_threshold, limit)
+
+    # cells whose training cells are cut or wrap around are computed one by
+    # one, all others from a sliding window view chunk by chunk
+    first, last = min(n_side, n_out), max(min(n_out, mvgav.size - n_side), 0)
+    cols = np.r_[0:n_side - n_guard, n_side + n_guard + 1:2 * n_side + 1]
+    for n in list(range(first)) + list(range(max(first, last), n_out)):
+        _cell(n)
+    if last <= first or cols.size == 0:
+        return out
+
+    windows = np.lib.stride_tricks.sliding_window_view(mvgav, 2 * n_side + 1)
+    for start in range(first, last, chunk_size):
+        stop = min(start + chunk_size, last)
+        cfar_threshold = alpha * np.median(windows[start - n_side:stop - n_side][:, cols], axis=1)
+        # like min(cfar_threshold, limit), a nan threshold is kept
+        threshold = np.where(limit < cfar_threshold, limit, cfar_threshold)
+        out[start:stop] = mvgav[start:stop] >= threshold
+    return out
+
+
+def cfar_binarize(mvgav, n_out, n_side, n_guard, alpha, limit):
+    """Cell-averaging CFAR decision of each cell
+
+
+    Parameters
+    ----------
+    mvgav : ndarray
+        The moving average of the signal.
+    n_out : int
+        Number of cells to decide.
+    n_side : int
+        Number of guard and training cells per side.
+    n_guard : int
+        Number of guard cells per side.
+    alpha : float
+        Scale of the median of the training cells.
+    limit : float
+        Upper limit of the threshold.
+
+    Returns
+    -------
+    binarized : ndarray
+        True where a cell is at or above its threshold.
+
+    """
+    mvgav = np.ascontiguousarray(mvgav, dtype=np.float64)
+    n_out = max(int(n_out), 0)
+    if get_backend() == 'numba':
+        return _numba()['cfar'](mvgav, n_out, int(n_side), int(n_guard),
+                                float(alpha), float(limit))
+    return _cfar_numpy(mvgav, n_out, n_side, n_guard, alpha, limit)
+
+
+def binary_opening(x):
+    """Binary erosion followed by dilation with a structure of 3 samples
+
+    Same as ``scipy.ndimage.binary_dilation(scipy.ndimage.binary_erosion(x))``
+    of 1-D data.
+    """
+    x = np.ascontiguousarray(x, dtype=bool)
+    if get_backend() == 'numba':
+        return _numba()['opening'](x)
+
+    eroded = np.zeros(x.size, dtype=bool)
+    eroded[1:-1] = x[:-2] & x[1:-1] & x[2:]
+    out = eroded.copy()
+    out[1:] |= eroded[:-1]
+    out[:-1] |= eroded[1:]
+    return out
+
+
+def trailing_mean(values, tail, n_seen, window, out=None):
+    """Mean of trailing windows of values preceded by the tail of earlier ones
+
+
+    Parameters
+    ----------
+    values : ndarray
+        n_times x n_chan float64 array.
+    tail : ndarray
+        The last up to ``window - 1`` values before ``values``.
+    n_seen : int
+        Number of values before ``values``.
+    window : int
+        Window size in samples. Windows at the start are averaged over the
+        values available.
+    out : ndarray, optional
+        n_times x n_chan float64 array the means are written to. The
+        default is None.
+
+    Returns
+    -------
+    out : ndarray
+        The means.
+
+    """
+    n_times, n_chan = values.shape
+    if out is None:
+        out = np.empty((n_times, n_chan))
+    if get_backend() == 'numba':
+        return _numba()['trailing_mean'](np.ascontiguousarray(values),
+                                         np.ascontiguousarray(tail, dtype=np.float64),
+                                         int(n_seen), int(window), out)
+
+    n_tail = tail.shape[0]
+    csum = np.zeros((n_tail + n_times + 1, n_chan))
+    np.cumsum(tail, axis=0, out=csum[1:n_tail + 1])
+    csum[n_tail + 1:] = values
+    np.cumsum(csum[n_tail:], axis=0, out=csum[n_tail:])
+
+    stop = np.arange(n_tail + 1, n_tail + n_times + 1)
+    start = np.maximum(stop - window, 0)
+    count = np.minimum(n_seen + np.arange(1, n_times + 1), window)
+    np.divide(csum[stop] - csum[start], count[:, None], out=out)
+    return out
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Per-channel normalization with statistics that can be stored and reused
+
+A ``Normalizer`` learns one offset and one scale per channel in a single
+pass over blocks of data and applies ``(x - loc) / scale``:
+
+- 'zscore': loc is the mean and scale the standard deviation.
+- 'mvc': loc is 0 and scale the largest absolute value, e.g. of the
+  envelope of a maximum voluntary contraction. Normalized values are
+  fractions of the MVC.
+
+Statistics are plain lists in ``to_dict()``, so they can be kept in
+``info['misc']`` and applied to another session, to streaming blocks or to
+the columns of ``features`` output.
+"""
+import numpy as np
+
+_METHODS = ('zscore', 'mvc')
+
+
+def _feature_values(data):
+    """Values of the columns of a features DataFrame except 'class'"""
+    import pandas as pd
+
+    if not isinstance(data, pd.DataFrame):
+        return data
+    columns = [c for c in data.columns if c != 'class']
+    return data[columns].to_numpy(dtype=np.float64)
+
+
+class Normalizer:
+    """Per-channel z-score or MVC normalization
+
+    Parameters
+    ----------
+    method : str, optional
+        'zscore' or 'mvc'. The default is 'zscore'.
+    ch_names : list of str, optional
+        Names of the channels, kept with the statistics. The default is
+        None.
+    """
+
+    def __init__(self, method='zscore', ch_names=None):
+        if method not in _METHODS:
+            raise RuntimeError(f"method must be one of {_METHODS}, got {method!r}")
+
+        self.method = method
+        self.ch_names = None if ch_names is None else list(ch_names)
+        self.reset()
+
+    def reset(self):
+        """Forget all statistics"""
+        from .stats import RunningStats
+
+        self._stats = RunningStats(ddof=0)
+        self._peak = None
+        self._loc = None
+        self._scale = None
+
+    def partial_fit(self, block):
+        """Update the statistics with a block of n_times x n_chan data
+
+        Of a DataFrame of ``features`` output all columns except 'class'
+        are used.
+
+        Returns
+        -------
+        normalizer : instance of Normalizer
+            The instance itself.
+        """
+        block = np.asarray(_feature_values(block))
+        if self.method == 'zscore':
+            self._stats.update(block)
+        else:
+            peak = np.abs(block).max(axis=0).astype(np.float64)
+            self._peak = peak if self._peak is None else np.maximum(self._peak, peak)
+        self._loc = self._scale = None
+        return self
+
+    def fit(self, data, chunk_size=2 ** 16):
+        """Compute the statistics of n_times x n_chan data chunk by chunk
+
+        Returns
+        -------
+        normalizer : instance of Normalizer
+            The instance itself.
+        """
+        self.reset()
+        data = _feature_values(data)
+        for start in range(0, data.shape[0], chunk_size):
+            self.partial_fit(data[start:start + chunk_size])
+        return self
+
+    @property
+    def loc(self):
+        """Offset per channel"""
+        self._finalize()
+        return self._loc
+
+    @property
+    def scale(self):
+        """Scale per channel"""
+        self._finalize()
+        return self._scale
+
+    def _finalize(self):
+        if self._scale is not None:
+            return
+        if self.method == 'zscore':
+            if self._stats.n == 0:
+                raise RuntimeError('The normalizer was not fitted.')
+            loc, scale = self._stats.mean.copy(), self._stats.std
+        else:
+            if self._peak is None:
+                raise RuntimeError('The normalizer was not fitted.')
+            loc, scale = np.zeros_like(self._peak), self._peak.copy()
+        # constant channels are only shifted
+        scale[scale == 0] = 1.
+        self._loc, self._scale = loc, scale
+
+    def transform(self, data, picks=None, out=None, chunk_size=2 ** 16):
+        """Normalize data
+
+
+        Parameters
+        ----------
+        data : ndarray | DataFrame
+            n_times x n_chan array, e.g. a streaming block, or a DataFrame of
+            ``features`` output whose columns except 'class' are normalized.
+        picks : list, optional
+            Columns of ``data`` the channels of the normalizer correspond to,
+            the others are left as they are. The default is None, i.e. all
+            columns.
+        out : ndarray, optional
+            Array the result is written to, may be ``data`` itself. The
+            default is None, i.e. a new array.
+        chunk_size : int, optional
+            Number of samples processed at once. The default is 2 ** 16.
+
+        Returns
+        -------
+        out : ndarray | DataFrame
+            The normalized data.
+
+        """
+        import pandas as pd
+
+        if isinstance(data, pd.DataFrame):
+            columns = [c for c in data.columns if c != 'class']
+            df = data.copy()
+            df[columns] = self.transform(_feature_values(data))
+            return df
+
+        loc, scale = self.loc, self.scale
+        if out is None:
+            dtype = data.dtype if data.dtype == np.float32 else np.float64
+            out = np.array(data, dtype=dtype)
+        elif out is not data:
+            out[:] = data
+
+        sl = slice(None) if picks is None else picks
+        for start in range(0, out.shape[0], chunk_size):
+            stop = start + chunk_size
+            out[start:stop, sl] = (out[start:stop, sl] - loc) / scale
+        return out
+
+    def fit_transform(self, data, chunk_size=2 ** 16):
+        """Fit to and normalize n_times x n_chan data"""
+        return self.fit(data, chunk_size=chunk_size).transform(data, chunk_size=chunk_size)
+
+    def to_dict(self):
+        """Statistics as a dict of JSON-serializable values"""
+        return {'method': self.method, 'ch_names': self.ch_names,
+                'loc': self.loc.tolist(), 'scale': self.scale.tolist()}
+
+    @classmethod
+    def from_dict(cls, stats):
+        """Normalizer with statistics of ``to_dict``"""
+        inst = cls(stats['method'], ch_names=stats.get('ch_names'))
+        inst._loc = np.asarray(stats['loc'], dtype=np.float64)
+        inst._scale = np.asarray(stats['scale'], dtype=np.float64)
+        return inst
+
+    def __repr__(self):
+        n_chan = None if self._scale is None else self._scale.size
+        return f"<Normalizer | {self.method}, n_chan={n_chan}>"
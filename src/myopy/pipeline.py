@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import hashlib
+import numpy as np
+import pandas as pd
+from .info import _pick_data_channels
+from .profiling import instrument
+
+
+class Pipeline:
+    """Lazy Raw -> filter -> epochs -> features pipeline
+
+    Steps are only recorded when they are added and executed by ``run()``.
+    Epoch windows, padded by ``pad`` seconds, are merged into segments of at
+    most ``chunk_size`` samples. Each segment is read from the Raw, filtered,
+    cut into epochs and, if a features step is given, reduced to features
+    before the next segment is read. Only the data around epochs is filtered
+    and no full-length intermediate is created.
+
+    Filtering a segment starts from a zero state ``pad`` seconds before the
+    first epoch. The result approaches filtering the whole recording as the
+    filter transient decays within ``pad``.
+
+    With ``cache=True`` the epochs of a run are kept, a rerun that only
+    changes the features step computes the features from them. Methods of
+    the Raw that modify its data in place, e.g. ``filter``, ``normalize``
+    or ``append``, invalidate the cache. Direct writes to ``raw._data`` are
+    not detected.
+
+    Parameters
+    ----------
+    raw : instance of BaseRaw
+        The raw data, may be memory-mapped.
+    chunk_size : int, optional
+        Maximum number of samples of a segment unless a single padded epoch
+        is longer. The default is 2 ** 18.
+    cache : bool, optional
+        Whether to keep the epochs between runs. The default is True.
+
+    Examples
+    --------
+    >>> pipe = (Pipeline(raw)
+    ...         .filter(20., 450.)
+    ...         .epochs(events, event_id=[1, 2], picks=[0, 1], tmin=0, tmax=2.)
+    ...         .features(['MAV', 'RMS']))
+    >>> df = pipe.run()
+    >>> df = pipe.features(['WL']).run()  # epochs are taken from the cache
+    """
+
+    def __init__(self, raw, chunk_size=2 ** 18, cache=True):
+        self.raw = raw
+        self.chunk_size = int(chunk_size)
+        self.cache = cache
+        self._filters = []
+        self._epochs = None
+        self._features = None
+        self._cache = {}
+
+    def filter(self, l_freq, h_freq, order=4, zero_phase=False):
+        """Add a Butterworth filter, see ``BaseRaw.filter``"""
+        self._filters.append(('filter', (l_freq, h_freq, order), zero_phase))
+        return self
+
+    def notch_filter(self, freqs, quality=30., zero_phase=False):
+        """Add notch filters, see ``BaseRaw.notch_filter``"""
+        freqs = tuple(np.atleast_1d(freqs).tolist())
+        self._filters.append(('notch', (freqs, quality), zero_phase))
+        return self
+
+    def epochs(self, events, event_id=None, picks=None, tmin=0, tmax=5.0, pad=1.0):
+        """Set the epochs, parameters as in ``Epochs``
+
+
+        Parameters
+        ----------
+        pad : float, optional
+            Data in s before and after each epoch that is filtered with it.
+            The default is 1.0.
+
+        """
+        events = np.asarray(events)
+        if event_id is None:
+            event_id = np.unique(events[:, 1])
+        events = events[np.isin(events[:, 1], event_id)]
+        if events.size == 0:
+            raise RuntimeError("No events were found.")
+        if tmin > tmax:
+            raise RuntimeError('tmin must be smaller than tmax.')
+        if picks is None:
+            picks = _pick_data_channels(self.raw.info)
+
+        self._epochs = {'events': events, 'event_id': list(event_id),
+                        'picks': list(picks), 'tmin': tmin, 'tmax': tmax,
+                        'pad': pad}
+        return self
+
+    def features(self, features=None):
+        """Set the features, see ``myopy.emg.features.features``
+
+        If None, all default features are computed.
+        """
+        from .emg.features import _FEATURES
+
+        if features is None:
+            features = list(_FEATURES)
+        if isinstance(features, str):
+            features = [features]
+        unknown = set(features) - set(_FEATURES)
+        if unknown:
+            raise RuntimeError(f"Unknown features {sorted(unknown)}")
+
+        self._features = list(features)
+        return self
+
+    def _epochs_key(self):
+        """Identify the raw, filter and epoch steps for the cache"""
+        params = {key: val for key, val in self._epochs.items() if key != 'events'}
+        digest = hashlib.sha1(np.ascontiguousarray(self._epochs['events']).tobytes())
+        # the version changes when methods of raw modify its data in place
+        return (self.raw._data_version, len(self.raw), self.raw.info['sfreq'],
+                repr(self._filters), repr(params), digest.hexdigest())
+
+    def _segments(self, start, n_times, pad):
+        """Merge padded epoch windows into segments
+
+        Yields the first and last sample of the segment in the raw and the
+        indices of its epochs.
+        """
+        order = np.argsort(start, kind='stable')
+        lo = start[order] - pad
+        hi = start[order] + n_times + pad
+
+        first = 0
+        seg_lo, seg_hi = lo[0], hi[0]
+        for i in range(1, order.size):
+            if lo[i] <= seg_hi and hi[i] - seg_lo <= self.chunk_size:
+                seg_hi = max(seg_hi, hi[i])
+                continue
+            yield seg_lo, seg_hi, order[first:i]
+            first, seg_lo, seg_hi = i, lo[i], hi[i]
+        yield seg_lo, seg_hi, order[first:]
+
+    def _design_filters(self):
+        from .filter import design_filter, design_notch
+
+        sfreq = self.raw.info['sfreq']
+        filters = []
+        for kind, params, zero_phase in self._filters:
+            if kind == 'filter':
+                l_freq, h_freq, order = params
+                sos = design_filter(sfreq, l_freq, h_freq, order=order)
+            else:
+                freqs, quality = params
+                sos = design_notch(sfreq, freqs, quality=quality)
+            filters.append((sos, zero_phase))
+        return filters
+
+    def _iter_epochs(self):
+        """Yield the indices and data of the epochs segment by segment"""
+        from .epochs import _n_times
+        from .filter import filter_data
+
+        raw, params = self.raw, self._epochs
+        sfreq = raw.info['sfreq']
+        picks = params['picks']
+        n_times = _n_times(params['tmin'], params['tmax'], sfreq)
+        pad = int(np.ceil(params['pad'] * sfreq))
+        start = raw.time_as_index(params['events'][:, 0] + params['tmin'])
+
+        # filter data channels only, e.g. not TTL channels
+        data_picks = set(_pick_data_channels(raw.info))
+        filt = [i for i, p in enumerate(picks) if p in data_picks]
+        filters = self._design_filters()
+
+        for seg_lo, seg_hi, idx in self._segments(start, n_times, pad if filters else 0):
+            lo, hi = max(seg_lo, 0), min(seg_hi, len(raw))
+            segment = np.zeros((seg_hi - seg_lo, len(picks)))
+            if hi > lo:
+                segment[lo - seg_lo:hi - seg_lo] = raw._data[lo:hi, picks]
+            for sos, zero_phase in filters:
+                filter_data(segment, sos, filt, zero_phase=zero_phase)
+
+            offsets = start[idx] - seg_lo
+            windows = offsets[:, None] + np.arange(n_times)
+            epochs = segment[windows]
+            # samples outside of the recording are zero as in Epochs
+            outside = (windows + seg_lo < 0) | (windows + seg_lo >= len(raw))
+            epochs[outside] = 0.
+            yield idx, epochs
+
+    def _compute_features(self, data):
+        from .emg.features import _FEATURES
+
+        return np.concatenate([_FEATURES[name](data) for name in self._features],
+                              axis=1)
+
+    @instrument('pipeline')
+    def run(self):
+        """Execute the pipeline
+
+
+        Returns
+        -------
+        result : DataFrame | instance of BaseEpochs
+            If a features step is given, a DataFrame with the column 'class'
+            and one column per feature and channel, e.g. 'MAV1', with rows
+            grouped by event id like ``features.get_features()``. Otherwise
+            the epochs.
+
+        """
+        from .epochs import BaseEpochs
+
+        if self._epochs is None:
+            raise RuntimeError('The pipeline has no epochs step.')
+
+        params = self._epochs
+        events = params['events']
+        key = self._epochs_key()
+        cached = self._cache.get(key)
+
+        if self._features is None:
+            if cached is None:
+                for idx, epochs in self._iter_epochs():
+                    if cached is None:
+                        cached = np.empty((events.shape[0],) + epochs.shape[1:])
+                    cached[idx] = epochs
+                if self.cache:
+                    self._cache = {key: cached}
+            epochs = BaseEpochs(self.raw.info.copy(), cached, events,
+                                event_id=params['event_id'], picks=params['picks'],
+                                tmin=params['tmin'], tmax=params['tmax'])
+            # the data is shared with the cache, drop_bads copies it
+            epochs._data_is_view = self.cache
+            return epochs
+
+        if cached is not None:
+            chunks = ((idx, cached[idx]) for idx in
+                      np.array_split(np.arange(events.shape[0]),
+                                     max(1, cached.nbytes // (8 * self.chunk_size))))
+        else:
+            chunks = self._iter_epochs()
+
+        values, store = None, None
+        for idx, epochs in chunks:
+            if self.cache and cached is None:
+                if store is None:
+                    store = np.empty((events.shape[0],) + epochs.shape[1:])
+                store[idx] = epochs
+            feats = self._compute_features(epochs)
+            if values is None:
+                values = np.empty((events.shape[0], feats.shape[1]))
+            values[idx] = feats
+
+        if store is not None:
+            self._cache = {key: store}
+
+        n_chan = len(params['picks'])
+        labels = [f"{name}{i}" for name in self._features for i in range(1, n_chan + 1)]
+        order = np.argsort(events[:, 1], kind='stable')
+        df = pd.DataFrame(values[order], columns=labels)
+        df.insert(0, 'class', events[order, 1])
+        return df
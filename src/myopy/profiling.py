@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Opt-in instrumentation of the processing stages
+
+Key entry points are decorated with ``instrument``. As long as no
+``profile()`` context is active, the decorator only checks an empty list
+before calling the function. Inside the context every call records a span
+with its wall time, the number of bytes it processed and, if requested, the
+peak memory allocated by Python and NumPy while it ran::
+
+    from myopy import profiling
+
+    with profiling.profile(trace_memory=True) as prof:
+        raw = read_table(...)
+        events = find_events(raw)
+
+    prof.report()                 # DataFrame, one row per stage
+    prof.to_trace('trace.json')   # open with chrome://tracing or Perfetto
+"""
+import functools
+import json
+import threading
+import time
+import tracemalloc
+
+# Active profiles, a profile receives the spans of all threads
+_profiles = []
+_local = threading.local()
+
+
+class Span:
+    """Record of one call of an instrumented function"""
+
+    __slots__ = ('name', 'start', 'duration', 'nbytes', 'peak_memory',
+                 'depth', 'thread', '_mem_start', '_mem_peak')
+
+    def __init__(self, name, depth):
+        self.name = name
+        self.depth = depth
+        self.thread = threading.get_ident()
+        self.nbytes = None
+        self.peak_memory = None
+        self.duration = None
+        self.start = time.perf_counter()
+
+    def to_dict(self):
+        return {key: getattr(self, key) for key in
+                ('name', 'start', 'duration', 'nbytes', 'peak_memory',
+                 'depth', 'thread')}
+
+
+class Profile:
+    """Collection of spans recorded while the profile is active
+
+    Parameters
+    ----------
+    trace_memory : bool, optional
+        If True, measure the peak memory of each span with ``tracemalloc``.
+        This slows down allocations. The default is False.
+    callback : callable, optional
+        Called with each finished ``Span``. The default is None.
+    """
+
+    def __init__(self, trace_memory=False, callback=None):
+        self.trace_memory = trace_memory
+        self.callback = callback
+        self.spans = []
+        self._lock = threading.Lock()
+        self._started_tracemalloc = False
+        self._t0 = None
+
+    def __enter__(self):
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+        self._t0 = time.perf_counter()
+        _profiles.append(self)
+        return self
+
+    def __exit__(self, *exc):
+        _profiles.remove(self)
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+
+    def _add(self, span):
+        with self._lock:
+            self.spans.append(span)
+        if self.callback is not None:
+            self.callback(span)
+
+    def to_records(self):
+        """Spans as a list of dicts, start times relative to the profile"""
+        records = []
+        for span in self.spans:
+            record = span.to_dict()
+            record['start'] -= self._t0
+            records.append(record)
+        return records
+
+    def report(self):
+        """Summary per stage
+
+
+        Returns
+        -------
+        report : DataFrame
+            Number of calls, total and mean wall time in s, bytes processed,
+            throughput in MB/s and the largest peak memory in bytes per
+            stage, ordered by total time.
+
+        """
+        import pandas as pd
+
+        columns = ['name', 'duration', 'nbytes', 'peak_memory']
+        df = pd.DataFrame(self.to_records(), columns=columns + ['start'])
+        report = df.groupby('name').agg(
+            calls=('duration', 'size'),
+            total=('duration', 'sum'),
+            mean=('duration', 'mean'),
+            nbytes=('nbytes', 'sum'),
+            peak_memory=('peak_memory', 'max'))
+        report['throughput'] = report['nbytes'] / report['total'] / 1e6
+        return report.sort_values('total', ascending=False)
+
+    def to_trace(self, fname):
+        """Write the spans in the Chrome trace event format
+
+
+        Parameters
+        ----------
+        fname : str
+            Path of the JSON file.
+
+        """
+        events = []
+        for record in self.to_records():
+            events.append({
+                'name': record['name'],
+                'ph': 'X',
+                'ts': record['start'] * 1e6,
+                'dur': record['duration'] * 1e6,
+                'pid': 0,
+                'tid': record['thread'],
+                'args': {'nbytes': record['nbytes'],
+                         'peak_memory': record['peak_memory']},
+            })
+        with open(fname, 'w') as f:
+            json.dump({'traceEvents': events}, f)
+
+
+def profile(trace_memory=False, callback=None):
+    """Record spans of instrumented functions inside a with block
+
+    See ``Profile`` for the parameters.
+    """
+    return Profile(trace_memory=trace_memory, callback=callback)
+
+
+def _stack():
+    stack = getattr(_local, 'stack', None)
+    if stack is None:
+        stack = _local.stack = []
+    return stack
+
+
+def _enter(name):
+    stack = _stack()
+    span = Span(name, len(stack))
+    if tracemalloc.is_tracing():
+        current, peak = tracemalloc.get_traced_memory()
+        # keep the peak of the enclosing span before resetting it
+        if stack:
+            stack[-1]._mem_peak = max(stack[-1]._mem_peak, peak)
+        tracemalloc.reset_peak()
+        span._mem_start = current
+        span._mem_peak = current
+    stack.append(span)
+    return span
+
+
+def _exit(span):
+    span.duration = time.perf_counter() - span.start
+    stack = _stack()
+    stack.pop()
+    if tracemalloc.is_tracing() and hasattr(span, '_mem_start'):
+        peak = max(span._mem_peak, tracemalloc.get_traced_memory()[1])
+        span.peak_memory = peak - span._mem_start
+        if stack and hasattr(stack[-1], '_mem_peak'):
+            stack[-1]._mem_peak = max(stack[-1]._mem_peak, peak)
+    for prof in list(_profiles):
+        prof._add(span)
+
+
+def instrument(name, nbytes=None):
+    """Decorator recording a span for each call inside ``profile()``
+
+
+    Parameters
+    ----------
+    name : str
+        Name of the stage.
+    nbytes : callable, optional
+        Called as ``nbytes(result, *args, **kwargs)`` after the call, returns
+        the number of bytes processed. The default is None.
+
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _profiles:
+                return func(*args, **kwargs)
+
+            span = _enter(name)
+            try:
+                result = func(*args, **kwargs)
+                if nbytes is not None:
+                    span.nbytes = int(nbytes(result, *args, **kwargs))
+            finally:
+                _exit(span)
+            return result
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Synthetic multi-channel EMG recordings with TTL-encoded events
+
+The tables written by ``simulate_table`` have the layout of the exports in
+``datasets/``: Date, Time, 8 FMG, 9 IMU, the EMG and 4 TTL columns,
+tab-separated with CRLF line endings. Events are encoded like in those
+exports: an idle code (7) before, the event id during and 0 after every
+trial.
+"""
+import numpy as np
+from .info import create_info
+
+_N_FMG = 8
+_N_IMU = 9
+_N_TTL = 4
+_IDLE = 7
+
+
+def simulate_data(n_times, sfreq=2000., n_emg=4, event_id=(1, 2, 3, 4, 5, 6),
+                  trial=(2., 5., 7.), seed=0):
+    """Simulate EMG and TTL channels
+
+
+    Parameters
+    ----------
+    n_times : int
+        Number of samples.
+    sfreq : float, optional
+        The sample rate in Hz. The default is 2000.
+    n_emg : int, optional
+        Number of EMG channels. The default is 4.
+    event_id : list of int, optional
+        Event ids drawn for the trials. Must fit into the TTL bits and differ
+        from 0 and 7. The default is (1, 2, 3, 4, 5, 6).
+    trial : tuple of float, optional
+        Duration in s of the idle, event and rest period of each trial. The
+        default is (2., 5., 7.).
+    seed : int, optional
+        Seed of the random number generator. The default is 0.
+
+    Returns
+    -------
+    data : ndarray
+        n_times x (n_emg + 4) array of EMG values in steps of 2 ** -10 and
+        TTL bits, least significant bit first.
+    events : ndarray
+        n_trials x 2 array of event onset in samples and event id.
+
+    """
+    rng = np.random.default_rng(seed)
+    n_idle, n_event, n_rest = (max(1, int(round(t * sfreq))) for t in trial)
+    n_trial = n_idle + n_event + n_rest
+    n_trials = -(-n_times // n_trial)
+
+    ids = rng.choice(np.asarray(event_id), size=n_trials)
+    codes = np.concatenate([np.full(n_idle, _IDLE), np.zeros(n_event, int),
+                            np.zeros(n_rest, int)])
+    codes = np.tile(codes, (n_trials, 1))
+    codes[:, n_idle:n_idle + n_event] = ids[:, None]
+    codes = codes.ravel()[:n_times]
+
+    onsets = np.arange(n_trials) * n_trial + n_idle
+    keep = onsets < n_times
+    events = np.column_stack([onsets[keep], ids[keep]])
+
+    # rectified noise with bursts during events, gain differs per channel
+    active = np.isin(codes, event_id)
+    gain = rng.uniform(0.5, 2., size=n_emg)
+    emg = np.abs(rng.normal(0., 0.05, size=(n_times, n_emg)))
+    emg += active[:, None] * np.abs(rng.normal(0., 0.3, size=(n_times, n_emg))) * gain
+    emg = np.round(emg * 1024) / 1024
+
+    ttl = (codes[:, None] >> np.arange(_N_TTL)) & 1
+
+    return np.column_stack([emg, ttl]).astype(np.float64), events
+
+
+def simulate_raw(n_times, sfreq=2000., n_emg=4, **kwargs):
+    """Simulate an in-memory Raw with TTL channels
+
+    Parameters are passed to ``simulate_data``.
+
+    Returns
+    -------
+    raw : instance of BaseRaw
+        Raw with EMG channels and TTL channels, readable by ``find_events``.
+
+    """
+    from .io.base import BaseRaw
+
+    data, _ = simulate_data(n_times, sfreq=sfreq, n_emg=n_emg, **kwargs)
+    info = create_info([f"EMG{i}" for i in range(1, n_emg + 1)], sfreq, 'EMG')
+    info._unlocked = True
+    info._add_channels([f"TTL{i}" for i in range(1, _N_TTL + 1)], 'TTL')
+    info['misc']['ttl_inversed'] = True
+    info._unlocked = False
+
+    return BaseRaw(info, data)
+
+
+def simulate_table(fname, n_times, sfreq=2000., n_emg=4, chunk_size=2 ** 16,
+                   **kwargs):
+    """Write a synthetic recording in the layout of the table exports
+
+
+    Parameters
+    ----------
+    fname : str
+        Path of the table to write.
+    n_times : int
+        Number of samples (rows).
+    sfreq : float, optional
+        The sample rate in Hz. The default is 2000.
+    n_emg : int, optional
+        Number of EMG channels. The default is 4.
+    chunk_size : int, optional
+        Number of rows formatted at once. The default is 2 ** 16.
+    **kwargs
+        Passed to ``simulate_data``.
+
+    Returns
+    -------
+    params : dict
+        Arguments of ``myopy.io.tables.tables.read_table`` for the table,
+        i.e. fname, info, col_data, col_events and delimiter.
+
+    """
+    data, _ = simulate_data(n_times, sfreq=sfreq, n_emg=n_emg, **kwargs)
+    rng = np.random.default_rng(kwargs.get('seed', 0))
+
+    emg_names = [f"EMG{i}" for i in range(1, n_emg + 1)]
+    header = (['Date', 'Time']
+              + [f"FMG{i}" for i in range(1, _N_FMG + 1)]
+              + [f"IMU{i}" for i in range(1, _N_IMU + 1)]
+              + emg_names
+              + [f"TTL{i}" for i in range(1, _N_TTL + 1)])
+    n_num = _N_FMG + _N_IMU + data.shape[1]
+    fmt = '8/25/2022\t3:52:16 PM\t' + '\t'.join(['%.6f'] * n_num)
+
+    with open(fname, 'w', newline='') as f:
+        f.write('\t'.join(header) + '\t' * 7 + '\r\n')
+        for start in range(0, n_times, chunk_size):
+            block = data[start:start + chunk_size]
+            fmg = rng.integers(30000, 200000, size=(block.shape[0], _N_FMG))
+            imu = rng.integers(-8000, 8000, size=(block.shape[0], _N_IMU))
+            np.savetxt(f, np.column_stack([fmg, imu, block]), fmt=fmt,
+                       newline='\r\n')
+
+    return table_params(fname, sfreq=sfreq, n_emg=n_emg)
+
+
+def table_params(fname, sfreq=2000., n_emg=4):
+    """Arguments of ``read_table`` for a table written by ``simulate_table``
+    
+
+    Parameters
+    ----------
+    fname : str
+        Path of the table.
+    sfreq : float, optional
+        The sample rate in Hz. The default is 2000.
+    n_emg : int, optional
+        Number of EMG channels. The default is 4.
+
+    Returns
+    -------
+    params : dict
+        fname, info, col_data, col_events and delimiter.
+
+    """
+    first_emg = 2 + _N_FMG + _N_IMU
+    return {
+        'fname': fname,
+        'info': create_info([f"EMG{i}" for i in range(1, n_emg + 1)], sfreq, 'EMG'),
+        'col_data': list(range(first_emg, first_emg + n_emg)),
+        'col_events': list(range(first_emg + n_emg, first_emg + n_emg + _N_TTL)),
+        'delimiter': '\t',
+    }
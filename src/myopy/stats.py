@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Mergeable running statistics
+
+``RunningStats`` keeps the number of samples, the mean and the sum of
+squared deviations from the mean (M2) in float64. Batches are merged with
+the pairwise update of Chan et al., which is exact up to rounding and does
+not suffer from the cancellation of sums of squares. Statistics of chunks,
+parallel workers or sessions can be merged in any order::
+
+    stats = RunningStats()
+    for chunk in chunks:
+        stats.update(chunk)
+
+    total = stats_session1 + stats_session2
+"""
+import numpy as np
+
+
+class RunningStats:
+    """Mean and variance of samples added batch by batch
+
+    Parameters
+    ----------
+    ddof : int, optional
+        Delta degrees of freedom of the variance. The default is 1.
+    """
+
+    def __init__(self, ddof=1):
+        self.ddof = ddof
+        self.n = 0
+        self._mean = None
+        self._m2 = None
+
+    def update(self, x, axis=0):
+        """Add a batch of samples
+
+
+        Parameters
+        ----------
+        x : ndarray
+            Samples along ``axis``, any float dtype. The remaining axes are
+            the shape of the statistics.
+        axis : int, optional
+            Axis of the samples. The default is 0.
+
+        Returns
+        -------
+        stats : instance of RunningStats
+            The instance itself.
+
+        """
+        x = np.asarray(x)
+        n = x.shape[axis]
+        if n == 0:
+            return self
+
+        mean = x.mean(axis=axis, dtype=np.float64)
+        dev = x - np.expand_dims(mean, axis)
+        m2 = np.einsum('i...,i...->...', np.moveaxis(dev, axis, 0),
+                       np.moveaxis(dev, axis, 0))
+        return self._merge(n, mean, m2)
+
+    def _merge(self, n, mean, m2):
+        if self.n == 0:
+            self.n, self._mean, self._m2 = n, np.array(mean, dtype=np.float64), \
+                np.array(m2, dtype=np.float64)
+            return self
+
+        if np.shape(mean) != self._mean.shape:
+            raise RuntimeError(f'Cannot merge statistics of shape '
+                               f'{np.shape(mean)} into {self._mean.shape}.')
+
+        total = self.n + n
+        delta = mean - self._mean
+        self._mean += delta * (n / total)
+        self._m2 += m2 + delta ** 2 * (self.n * n / total)
+        self.n = total
+        return self
+
+    def merge(self, other):
+        """Add the samples of another instance, e.g. of another worker
+
+        Returns
+        -------
+        stats : instance of RunningStats
+            The instance itself.
+        """
+        if other.n == 0:
+            return self
+        return self._merge(other.n, other._mean, other._m2)
+
+    def __iadd__(self, other):
+        return self.merge(other)
+
+    def __add__(self, other):
+        return self.copy().merge(other)
+
+    def copy(self):
+        """Return a copy of the instance"""
+        inst = RunningStats(ddof=self.ddof)
+        if self.n:
+            inst._merge(self.n, self._mean, self._m2)
+        return inst
+
+    def _check(self):
+        if self.n == 0:
+            raise RuntimeError('No samples were added.')
+
+    @property
+    def mean(self):
+        """Mean"""
+        self._check()
+        return self._mean
+
+    @property
+    def var(self):
+        """Variance with ``ddof`` delta degrees of freedom"""
+        self._check()
+        if self.n <= self.ddof:
+            return np.full(self._m2.shape, np.nan)
+        return self._m2 / (self.n - self.ddof)
+
+    @property
+    def std(self):
+        """Standard deviation"""
+        return np.sqrt(self.var)
+
+    @property
+    def sem(self):
+        """Standard error of the mean"""
+        return self.std / np.sqrt(self.n)
+
+    def __repr__(self):
+        shape = None if self._mean is None else self._mean.shape
+        return f"<RunningStats | n={self.n}, shape={shape}>"
@@ -0,0 +1,6 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+from .buffer import RingBuffer, RawStream
+from .sources import ReplaySource, SocketSource, serve_replay
+from .aio import (replay_raw, replay_table, buffered, map_blocks, filter_blocks,
+                  feature_blocks, to_stream)
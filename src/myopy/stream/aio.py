@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""asyncio sources, stages and sinks of sample blocks
+
+Sources are async generators of n_times x n_chan blocks, stages take such a
+generator and return another one, so one event loop can drive several
+streams::
+
+    async def amplifier(params):
+        blocks = replay_table(**params, rate=2000.)
+        blocks = filter_blocks(blocks, 2000., 20., 450., picks=[0, 1, 2, 3])
+        async for feats in feature_blocks(blocks, window=400, picks=[0, 1, 2, 3]):
+            ...
+
+    async def main():
+        await asyncio.gather(*(amplifier(p) for p in tables))
+
+Sources are paced by the event loop clock and catch up after a late block,
+so no samples are dropped. Stages run their computation in an executor and
+keep the event loop responsive. ``buffered`` decouples a fast producer from
+a slow consumer through a bounded queue: once ``maxsize`` blocks are
+pending the producer waits, which propagates backpressure to the source.
+"""
+import asyncio
+from collections import deque
+import numpy as np
+
+_END = object()
+
+
+async def replay_raw(raw, rate=None, block_size=32):
+    """Replay a recording block by block
+
+
+    Parameters
+    ----------
+    raw : instance of BaseRaw | ndarray
+        The recording, or an n_times x n_chan array of samples.
+    rate : float, optional
+        Samples per second. If None, the sample rate of ``raw``, i.e. real
+        time. Use ``np.inf`` to replay as fast as possible. The default is
+        None.
+    block_size : int, optional
+        Number of samples per block. The default is 32.
+
+    Yields
+    ------
+    block : ndarray
+        block_size x n_chan view of the samples, the last block may be
+        shorter.
+
+    """
+    data = raw._data if hasattr(raw, '_data') else np.asarray(raw)
+    if rate is None:
+        if not hasattr(raw, 'info'):
+            raise RuntimeError('rate is required to replay an array.')
+        rate = raw.info['sfreq']
+
+    loop = asyncio.get_running_loop()
+    t0 = loop.time()
+    for start in range(0, data.shape[0], block_size):
+        stop = min(start + block_size, data.shape[0])
+        # deadlines are absolute, late blocks are followed without delay
+        delay = t0 + stop / rate - loop.time()
+        await asyncio.sleep(max(delay, 0) if np.isfinite(rate) else 0)
+        yield data[start:stop]
+
+
+async def replay_table(fname, info, col_data, col_events=None, rate=None,
+                       block_size=32, **kwargs):
+    """Replay a table as a stand-in for a device
+
+    The table is read with ``read_table`` in an executor.
+
+    Parameters
+    ----------
+    fname, info, col_data, col_events, **kwargs
+        Arguments of ``myopy.io.tables.tables.read_table``.
+    rate : float, optional
+        Samples per second, see ``replay_raw``. The default is None, i.e.
+        real time.
+    block_size : int, optional
+        Number of samples per block. The default is 32.
+
+    Yields
+    ------
+    block : ndarray
+        block_size x n_chan view of the samples including TTL channels.
+
+    """
+    from ..io.tables.tables import read_table
+
+    loop = asyncio.get_running_loop()
+    raw = await loop.run_in_executor(
+        None, lambda: read_table(fname, info, col_data, col_events, **kwargs))
+    async for block in replay_raw(raw, rate=rate, block_size=block_size):
+        yield block
+
+
+async def buffered(source, maxsize=64):
+    """Consume a source in a task and yield its blocks from a bounded queue
+
+
+    Parameters
+    ----------
+    source : async iterable
+        The blocks.
+    maxsize : int, optional
+        Number of blocks the producer may be ahead. The default is 64.
+
+    Yields
+    ------
+    block : ndarray
+        The blocks of the source.
+
+    """
+    queue = asyncio.Queue(maxsize=maxsize)
+
+    async def _produce():
+        cancelled = False
+        try:
+            async for block in source:
+                await queue.put(block)
+        except asyncio.CancelledError:
+            # the consumer stopped, nobody waits for the end and the queue
+            # may be full
+            cancelled = True
+            raise
+        finally:
+            if not cancelled:
+                await queue.put(_END)
+
+    task = asyncio.ensure_future(_produce())
+    try:
+        while True:
+            block = await queue.get()
+            if block is _END:
+                break
+            yield block
+        # raise errors of the source
+        await task
+    finally:
+        task.cancel()
+
+
+async def map_blocks(func, source, executor=None, n_pending=1):
+    """Apply a function to each block in an executor
+
+
+    Parameters
+    ----------
+    func : callable
+        Called with each block, returns the result to yield.
+    source : async iterable
+        The blocks.
+    executor : Executor, optional
+        The executor, None for the default executor of the loop. The
+        default is None.
+    n_pending : int, optional
+        Number of blocks processed at the same time. Must be 1 for stateful
+        functions, e.g. filters. Results are yielded in order of the blocks.
+        The default is 1.
+
+    Yields
+    ------
+    result
+        The results of ``func``.
+
+    """
+    loop = asyncio.get_running_loop()
+    pending = deque()
+    async for block in source:
+        pending.append(loop.run_in_executor(executor, func, block))
+        if len(pending) >= n_pending:
+            yield await pending.popleft()
+    while pending:
+        yield await pending.popleft()
+
+
+def filter_blocks(source, sfreq, l_freq, h_freq, picks=None, order=4,
+                  executor=None):
+    """Filter blocks causally, see ``myopy.filter.StreamingFilter``
+
+
+    Parameters
+    ----------
+    source : async iterable
+        The blocks.
+    sfreq : float
+        The sample rate in Hz.
+    l_freq : float | None
+        Lower pass-band edge in Hz.
+    h_freq : float | None
+        Upper pass-band edge in Hz.
+    picks : list, optional
+        Channels to filter, the others are passed through, e.g. TTL channels.
+        The default is None, i.e. all channels.
+    order : int, optional
+        Order of the filter. The default is 4.
+    executor : Executor, optional
+        The executor, see ``map_blocks``. The default is None.
+
+    Returns
+    -------
+    blocks : async generator
+        Filtered copies of the blocks.
+
+    """
+    from ..filter import design_filter, StreamingFilter
+
+    sos = design_filter(sfreq, l_freq, h_freq, order=order)
+    state = {}
+
+    def _filter(block):
+        sl = slice(None) if picks is None else picks
+        if 'filter' not in state:
+            n_chan = block.shape[1] if picks is None else len(picks)
+            state['filter'] = StreamingFilter(sos, n_chan)
+        out = np.array(block, dtype=np.float64)
+        out[:, sl] = state['filter'].process(out[:, sl])
+        return out
+
+    return map_blocks(_filter, source, executor=executor)
+
+
+async def feature_blocks(source, window, step=None, features=None, picks=None,
+                         executor=None):
+    """Features of sliding windows
+
+
+    Parameters
+    ----------
+    source : async iterable
+        The blocks.
+    window : int
+        Window size in samples.
+    step : int, optional
+        Samples between the starts of two windows. The default is None, i.e.
+        ``window``.
+    features : list of str, optional
+        Features of ``myopy.emg.features``. The default is None, i.e. all.
+    picks : list, optional
+        Channels to use. The default is None, i.e. all channels.
+    executor : Executor, optional
+        The executor, see ``map_blocks``. The default is None.
+
+    Yields
+    ------
+    values : ndarray
+        n_windows x (n_features * n_chan) array of the windows completed by
+        a block, feature-major like the columns of ``features``. Blocks that
+        complete no window yield nothing.
+
+    """
+    from ..emg.features import _FEATURES
+
+    if features is None:
+        features = list(_FEATURES)
+    step = window if step is None else int(step)
+
+    def _compute(windows):
+        return np.concatenate([_FEATURES[name](windows) for name in features],
+                              axis=1)
+
+    async def _windows():
+        # samples of the current window start onwards
+        tail = None
+        # samples before the next window start that are not received yet,
+        # if step > window
+        skip = 0
+        async for block in source:
+            block = block if picks is None else block[:, picks]
+            if skip:
+                n = min(skip, block.shape[0])
+                block, skip = block[n:], skip - n
+                if block.shape[0] == 0:
+                    continue
+            tail = block if tail is None else np.concatenate([tail, block])
+            n_windows = (tail.shape[0] - window) // step + 1
+            if n_windows < 1:
+                continue
+            index = np.arange(n_windows)[:, None] * step + np.arange(window)
+            windows = tail[index]
+            skip = max(n_windows * step - tail.shape[0], 0)
+            tail = tail[n_windows * step:]
+            yield windows
+
+    async for values in map_blocks(_compute, _windows(), executor=executor):
+        yield values
+
+
+async def to_stream(source, stream):
+    """Push all blocks of a source into a ``RawStream``
+
+
+    Parameters
+    ----------
+    source : async iterable
+        The blocks.
+    stream : instance of RawStream
+        The stream.
+
+    Returns
+    -------
+    n_times : int
+        Number of samples pushed.
+
+    """
+    n_times = 0
+    async for block in source:
+        stream.push(block)
+        n_times += block.shape[0]
+    return n_times
@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Ring buffer and Raw data of an ongoing recording
+
+A producer thread writes blocks of samples into a ``RingBuffer``, consumers
+read the latest samples as views of the buffer. Every sample is stored twice,
+at ``i`` and ``i + capacity``, so any window of at most ``capacity`` samples
+is contiguous in memory and no read has to copy or wrap around.
+
+Views are only valid until the producer overwrites them, i.e. until another
+``capacity - n`` samples are written after a window of ``n`` samples was
+read. Copy windows that are kept longer.
+"""
+import threading
+import numpy as np
+
+
+class RingBuffer:
+    """Preallocated circular buffer of n_times x n_chan samples
+
+    Parameters
+    ----------
+    capacity : int
+        Number of samples kept.
+    n_chan : int
+        Number of channels.
+    dtype : dtype, optional
+        The dtype of the samples. The default is np.float64.
+    """
+
+    def __init__(self, capacity, n_chan, dtype=np.float64):
+        if int(capacity) < 1:
+            raise RuntimeError('capacity must be at least one sample.')
+
+        self.capacity = int(capacity)
+        self.n_chan = int(n_chan)
+        self._data = np.zeros((2 * self.capacity, self.n_chan), dtype=dtype)
+        self._n_written = 0
+        self._cond = threading.Condition(threading.Lock())
+
+    @property
+    def n_written(self):
+        """Number of samples written since the buffer was created"""
+        return self._n_written
+
+    def __len__(self):
+        """Number of samples available"""
+        return min(self._n_written, self.capacity)
+
+    def write(self, block):
+        """Append samples, overwriting the oldest ones
+
+
+        Parameters
+        ----------
+        block : ndarray
+            n_times x n_chan array of samples. Of blocks longer than the
+            buffer only the last ``capacity`` samples are kept.
+
+        """
+        block = np.asarray(block)
+        if block.ndim != 2 or block.shape[1] != self.n_chan:
+            raise RuntimeError(f'block must be n_times x {self.n_chan}, '
+                               f'got {block.shape}.')
+
+        n_times = block.shape[0]
+        cap = self.capacity
+        with self._cond:
+            start = self._n_written
+            if n_times > cap:
+                start += n_times - cap
+                block = block[n_times - cap:]
+
+            pos = start % cap
+            first = min(block.shape[0], cap - pos)
+            rest = block.shape[0] - first
+            self._data[pos:pos + first] = block[:first]
+            self._data[pos + cap:pos + cap + first] = block[:first]
+            if rest:
+                self._data[:rest] = block[first:]
+                self._data[cap:cap + rest] = block[first:]
+
+            self._n_written += n_times
+            self._cond.notify_all()
+
+    def _view(self, start, stop):
+        """Read-only view of samples start to stop, sequence numbers"""
+        cap = self.capacity
+        if stop - start > cap or start < self._n_written - cap:
+            raise RuntimeError(f'Samples {start} to {stop} are no longer in '
+                               f'the buffer.')
+        if stop > self._n_written:
+            raise RuntimeError(f'Samples {start} to {stop} were not written yet.')
+
+        # the window ends in the second copy, so it never wraps around
+        end = (stop - 1) % cap + 1 + cap
+        view = self._data[end - (stop - start):end]
+        view.flags.writeable = False
+        return view
+
+    def get(self, start, stop):
+        """View of the samples between two sequence numbers
+
+
+        Parameters
+        ----------
+        start : int
+            Sequence number of the first sample, counted from the first
+            sample written.
+        stop : int
+            Sequence number after the last sample.
+
+        Returns
+        -------
+        data : ndarray
+            Read-only stop - start x n_chan view of the buffer.
+
+        """
+        with self._cond:
+            return self._view(int(start), int(stop))
+
+    def latest(self, n_times=None):
+        """View of the most recent samples
+
+
+        Parameters
+        ----------
+        n_times : int, optional
+            Number of samples. If fewer samples were written, all of them are
+            returned. The default is None, i.e. all samples in the buffer.
+
+        Returns
+        -------
+        data : ndarray
+            Read-only n_times x n_chan view of the buffer.
+        start : int
+            Sequence number of the first sample of the view.
+
+        """
+        with self._cond:
+            stop = self._n_written
+            n = len(self) if n_times is None else min(int(n_times), len(self))
+            return self._view(stop - n, stop), stop - n
+
+    def wait(self, n_written, timeout=None):
+        """Wait until the buffer holds samples up to a sequence number
+
+
+        Parameters
+        ----------
+        n_written : int
+            Number of samples that have to be written.
+        timeout : float, optional
+            Timeout in s. The default is None, i.e. wait forever.
+
+        Returns
+        -------
+        ready : bool
+            False if the timeout expired.
+
+        """
+        with self._cond:
+            return self._cond.wait_for(lambda: self._n_written >= n_written,
+                                       timeout=timeout)
+
+
+class RawStream:
+    """Raw data of an ongoing recording
+
+    Samples pushed by a producer, e.g. a ``ReplaySource``, are kept in a
+    ``RingBuffer`` of ``buffer_size`` seconds. Windows of the latest samples
+    are read without copying and can be wrapped into a ``BaseRaw``, so
+    ``find_events``, ``Epochs`` or feature extraction run on the newest data::
+
+        stream = RawStream(raw.info, buffer_size=10.)
+        source = ReplaySource(stream, raw).start()
+        while source.is_alive():
+            window = stream.to_raw(2.)
+            events = find_events(window)
+
+    Parameters
+    ----------
+    info : instance of Info
+        The measurement info. Samples have one column per channel.
+    buffer_size : float, optional
+        Length of the buffer in s. The default is 10.
+    """
+
+    def __init__(self, info, buffer_size=10.):
+        self.info = info
+        capacity = int(np.ceil(buffer_size * info['sfreq']))
+        self._buffer = RingBuffer(capacity, info['nchan'])
+
+    @property
+    def buffer(self):
+        """The ring buffer"""
+        return self._buffer
+
+    @property
+    def n_times(self):
+        """Number of samples pushed since the stream was created"""
+        return self._buffer.n_written
+
+    def __len__(self):
+        """Number of samples in the buffer"""
+        return len(self._buffer)
+
+    def push(self, block):
+        """Append a block of n_times x n_chan samples"""
+        self._buffer.write(block)
+
+    def _n_samples(self, window):
+        if window is None:
+            return None
+        return int(round(window * self.info['sfreq']))
+
+    def get_data(self, window=None):
+        """Latest samples and their times
+
+
+        Parameters
+        ----------
+        window : float, optional
+            Length of the window in s. The default is None, i.e. the whole
+            buffer.
+
+        Returns
+        -------
+        data : ndarray
+            Read-only n_times x n_chan view of the buffer.
+        times : ndarray
+            Time points in s since the first sample of the stream.
+
+        """
+        data, start = self._buffer.latest(self._n_samples(window))
+        times = np.arange(start, start + data.shape[0]) / self.info['sfreq']
+        return data, times
+
+    def to_raw(self, window=None, copy=False):
+        """Latest samples as Raw
+
+
+        Parameters
+        ----------
+        window : float, optional
+            Length of the window in s. The default is None, i.e. the whole
+            buffer.
+        copy : bool, optional
+            If False, the Raw holds a read-only view of the buffer, which is
+            overwritten by later samples. Use True for Raw that is modified,
+            e.g. filtered, or kept. The default is False.
+
+        Returns
+        -------
+        raw : instance of BaseRaw
+            Raw of the window, ``raw.first_samp`` is the sequence number of
+            its first sample. Times are relative to the window.
+
+        """
+        from ..io.base import BaseRaw
+
+        data, start = self._buffer.latest(self._n_samples(window))
+        if data.shape[0] == 0:
+            raise RuntimeError('The stream has no samples yet.')
+        if copy:
+            data = data.copy()
+        return BaseRaw(self.info, data, first_samp=int(start))
+
+    def wait(self, n_times, timeout=None):
+        """Wait until ``n_times`` samples were pushed, see ``RingBuffer.wait``"""
+        return self._buffer.wait(n_times, timeout=timeout)
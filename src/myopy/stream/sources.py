@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Producers that push samples into a RawStream from a background thread
+
+``ReplaySource`` replays a recorded Raw, e.g. a table read with
+``read_table``, at its sample rate. ``SocketSource`` receives samples from a
+local TCP socket as a device would send them. Both stand in for an
+acquisition device in closed-loop experiments.
+"""
+import abc
+import socket
+import threading
+import time
+import numpy as np
+
+
+class _Source(abc.ABC):
+    """Base class of producer threads, subclasses implement ``_run``"""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self._stop = threading.Event()
+        self._thread = None
+        self.error = None
+
+    def start(self):
+        """Start pushing samples in a daemon thread
+
+        Returns
+        -------
+        source : instance of _Source
+            The instance itself.
+        """
+        if self._thread is not None:
+            raise RuntimeError('The source was already started.')
+        self._thread = threading.Thread(target=self._target, daemon=True,
+                                        name=type(self).__name__)
+        self._thread.start()
+        return self
+
+    def _target(self):
+        try:
+            self._run()
+        except Exception as e:
+            # keep the error for the consumer, the thread would swallow it
+            self.error = e
+
+    @abc.abstractmethod
+    def _run(self):
+        """Push samples until done or ``_stop`` is set"""
+
+    def stop(self):
+        """Stop pushing samples and wait for the thread"""
+        self._stop.set()
+        self.join()
+
+    def join(self, timeout=None):
+        """Wait until all samples are pushed or the source is stopped"""
+        if self._thread is not None:
+            self._thread.join(timeout)
+        if self.error is not None:
+            raise RuntimeError(f'{type(self).__name__} failed.') from self.error
+
+    def is_alive(self):
+        """Whether the source is still pushing samples"""
+        return self._thread is not None and self._thread.is_alive()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+class ReplaySource(_Source):
+    """Replay a recording into a stream
+
+    Parameters
+    ----------
+    stream : instance of RawStream
+        The stream samples are pushed to.
+    raw : instance of BaseRaw | ndarray
+        The recording, or an n_times x n_chan array of samples.
+    block_size : int, optional
+        Number of samples pushed at once. The default is 32.
+    speed : float | None, optional
+        Replay speed relative to the sample rate of the stream, e.g. 2. for
+        twice as fast. If None, samples are pushed as fast as possible. The
+        default is 1.
+    """
+
+    def __init__(self, stream, raw, block_size=32, speed=1.):
+        super().__init__(stream)
+        self._data = raw._data if hasattr(raw, '_data') else np.asarray(raw)
+        self.block_size = int(block_size)
+        self.speed = speed
+
+    def _run(self):
+        sfreq = self.stream.info['sfreq']
+        t0 = time.perf_counter()
+        for start in range(0, self._data.shape[0], self.block_size):
+            if self._stop.is_set():
+                return
+            stop = start + self.block_size
+            if self.speed is not None:
+                # the block is pushed once its last sample was recorded
+                delay = t0 + min(stop, self._data.shape[0]) / (sfreq * self.speed)
+                delay -= time.perf_counter()
+                if delay > 0:
+                    self._stop.wait(delay)
+            self.stream.push(self._data[start:stop])
+
+
+class SocketSource(_Source):
+    """Receive samples from a TCP socket
+
+    The peer sends samples as little-endian float64 values, one frame of
+    n_chan values per sample. Frames may be split across packets.
+
+    Parameters
+    ----------
+    stream : instance of RawStream
+        The stream samples are pushed to.
+    host : str, optional
+        The host to connect to. The default is 'localhost'.
+    port : int, optional
+        The port to connect to. The default is 5555.
+    recv_size : int, optional
+        Maximum number of bytes received at once. The default is 2 ** 16.
+    """
+
+    def __init__(self, stream, host='localhost', port=5555, recv_size=2 ** 16):
+        super().__init__(stream)
+        self.address = (host, port)
+        self.recv_size = int(recv_size)
+
+    def _run(self):
+        frame = 8 * self.stream.info['nchan']
+        pending = b''
+        with socket.create_connection(self.address) as sock:
+            sock.settimeout(0.1)
+            while not self._stop.is_set():
+                try:
+                    packet = sock.recv(self.recv_size)
+                except socket.timeout:
+                    continue
+                if not packet:
+                    return
+                pending += packet
+                n_frames = len(pending) // frame
+                if n_frames:
+                    block = np.frombuffer(pending[:n_frames * frame], dtype='<f8')
+                    self.stream.push(block.reshape(n_frames, -1))
+                    pending = pending[n_frames * frame:]
+
+
+def serve_replay(raw, host='localhost', port=5555, block_size=32, speed=1.):
+    """Send a recording to the first client of a local TCP socket
+
+    Counterpart of ``SocketSource`` for testing without a device. Returns
+    immediately, the recording is sent by a daemon thread that waits for
+    one client and ends when all samples are sent or the client
+    disconnects. Join the thread to wait for it.
+
+    Parameters
+    ----------
+    raw : instance of BaseRaw | ndarray
+        The recording, or an n_times x n_chan array of samples.
+    host : str, optional
+        The host to listen on. The default is 'localhost'.
+    port : int, optional
+        The port to listen on, 0 picks a free port. The default is 5555.
+    block_size : int, optional
+        Number of samples sent at once. The default is 32.
+    speed : float | None, optional
+        Replay speed relative to the sample rate, see ``ReplaySource``. The
+        default is 1.
+
+    Returns
+    -------
+    server : socket
+        The listening socket, ``server.getsockname()`` gives the port.
+    thread : Thread
+        The daemon thread sending the recording.
+
+    """
+    data = raw._data if hasattr(raw, '_data') else np.asarray(raw)
+    sfreq = raw.info['sfreq'] if hasattr(raw, 'info') else None
+    if speed is not None and sfreq is None:
+        raise RuntimeError('speed requires a Raw with a sample rate.')
+
+    server = socket.create_server((host, port))
+
+    def _serve():
+        with server:
+            conn, _ = server.accept()
+            with conn:
+                t0 = time.perf_counter()
+                for start in range(0, data.shape[0], block_size):
+                    stop = min(start + block_size, data.shape[0])
+                    if speed is not None:
+                        delay = t0 + stop / (sfreq * speed) - time.perf_counter()
+                        if delay > 0:
+                            time.sleep(delay)
+                    try:
+                        conn.sendall(np.ascontiguousarray(data[start:stop], dtype='<f8').tobytes())
+                    except OSError:
+                        return
+
+    thread = threading.Thread(target=_serve, daemon=True, name='serve_replay')
+    thread.start()
+    return server, thread
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import numpy as np
+
+
+class MinMaxPyramid:
+    """Multi-resolution min/max envelope of uniformly sampled channels
+
+    Level 0 is the data itself. Level ``k`` holds the minimum and maximum of
+    consecutive blocks of ``factor ** k`` samples. Levels from
+    ``first_level`` on are computed once, each from the level below, and
+    kept in memory, about ``2 / factor ** first_level`` of the data. Finer
+    levels are computed from the data of the visible range when drawn, which
+    has fewer than ``factor ** first_level`` samples per pixel. Drawing the
+    interleaved minima and maxima of the level that has about one block per
+    pixel looks identical to drawing every sample, but the number of points
+    only depends on the plot width.
+
+    Parameters
+    ----------
+    data : ndarray
+        n_times x n_chan array of data. Only the level 0 slices that are
+        drawn are read from it, so it can be a memory-mapped array.
+    picks : list, optional
+        Channels to use. The default is None, i.e. all channels.
+    x0 : float, optional
+        x position of the first sample. The default is 0.
+    dx : float, optional
+        Distance between two samples. The default is 1.
+    factor : int, optional
+        Number of blocks that are merged per level. The default is 4.
+    first_level : int, optional
+        First level kept in memory. The default is 3, i.e. blocks of 64
+        samples.
+    chunk_size : int, optional
+        Number of samples read from ``data`` at once while building the
+        first level. The default is 2 ** 16.
+    """
+
+    def __init__(self, data, picks=None, x0=0., dx=1., factor=4, first_level=3,
+                 chunk_size=2 ** 16):
+
+        if factor < 2:
+            raise RuntimeError('factor must be at least 2.')
+        if first_level < 1:
+            raise RuntimeError('first_level must be at least 1.')
+
+        if picks is None:
+            picks = np.arange(data.shape[1])
+
+        self._data = data
+        self.picks = np.asarray(picks)
+        self.x0 = float(x0)
+        self.dx = float(dx)
+        self.factor = int(factor)
+        self.first_level = int(first_level)
+        self.n_times = data.shape[0]
+
+        # round chunk size to full blocks of the first level
+        size = self.block_size(self.first_level)
+        chunk_size = max(size, chunk_size - chunk_size % size)
+        self._levels = self._build(chunk_size)
+
+    def _build(self, chunk_size):
+        """Compute min/max per block for the levels kept in memory"""
+        size = self.block_size(self.first_level)
+        mins, maxs = [], []
+        for start in range(0, self.n_times, chunk_size):
+            chunk = np.asarray(self._data[start:start + chunk_size, self.picks])
+            mins.append(self._reduce(chunk, np.minimum, size))
+            maxs.append(self._reduce(chunk, np.maximum, size))
+
+        levels = [(np.concatenate(mins), np.concatenate(maxs))]
+        while levels[-1][0].shape[0] > 1:
+            mins, maxs = levels[-1]
+            levels.append((self._reduce(mins, np.minimum),
+                           self._reduce(maxs, np.maximum)))
+
+        return levels
+
+    def _reduce(self, x, ufunc, size=None):
+        """Reduce consecutive blocks of ``size`` rows, last may be partial
+
+        The default size is ``factor``.
+        """
+        starts = np.arange(0, x.shape[0], self.factor if size is None else size)
+        return ufunc.reduceat(x, starts, axis=0)
+
+    @property
+    def n_levels(self):
+        """Number of levels including the data itself"""
+        return self.first_level + len(self._levels)
+
+    def min(self):
+        """Minimum of each channel"""
+        return self._levels[-1][0][0]
+
+    def max(self):
+        """Maximum of each channel"""
+        return self._levels[-1][1][0]
+
+    def block_size(self, level):
+        """Number of samples per block at a level"""
+        return self.factor ** level
+
+    def select_level(self, x_min, x_max, n_pixels):
+        """Coarsest level with at least one block per pixel in a range"""
+        n_samples = max((x_max - x_min) / self.dx, 1.)
+        n_pixels = max(int(n_pixels), 1)
+        level = 0
+        while (level < self.n_levels - 1
+               and n_samples / self.block_size(level + 1) >= n_pixels):
+            level += 1
+        return level
+
+    def get(self, x_min, x_max, n_pixels, pick=0):
+        """Points to draw for a channel in a range
+
+
+        Parameters
+        ----------
+        x_min : float
+            Start of the visible range.
+        x_max : float
+            End of the visible range.
+        n_pixels : int
+            Width of the visible range in pixels.
+        pick : int, optional
+            Index into ``picks``. The default is 0.
+
+        Returns
+        -------
+        x : ndarray
+            x positions of the points.
+        y : ndarray
+            y positions of the points.
+
+        """
+        level = self.select_level(x_min, x_max, n_pixels)
+        size = self.block_size(level)
+        n_blocks = -(-self.n_times // size)
+
+        # one block of margin on both sides so lines leave the view
+        start = int(np.floor((x_min - self.x0) / self.dx / size)) - 1
+        stop = int(np.ceil((x_max - self.x0) / self.dx / size)) + 2
+        start = min(max(start, 0), n_blocks)
+        stop = min(max(stop, start), n_blocks)
+
+        if level == 0:
+            x = self.x0 + np.arange(start, stop) * self.dx
+            y = np.asarray(self._data[start:stop, self.picks[pick]])
+            return x, y
+
+        if level < self.first_level:
+            data = np.asarray(self._data[start * size:stop * size, self.picks[pick]])
+            mins = self._reduce(data, np.minimum, size)
+            maxs = self._reduce(data, np.maximum, size)
+        else:
+            mins, maxs = self._levels[level - self.first_level]
+            mins, maxs = mins[start:stop, pick], maxs[start:stop, pick]
+
+        x = self.x0 + np.repeat(np.arange(start, stop) * size, 2) * self.dx
+        y = np.empty(2 * (stop - start), dtype=mins.dtype)
+        y[0::2] = mins
+        y[1::2] = maxs
+        return x, y
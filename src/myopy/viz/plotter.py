@@ -9,10 +9,18 @@ from PyQt5.QtCore import Qt
 from pyqtgraph import PlotWidget, plot
 import pyqtgraph as pg
 import numpy as np
+from .lod import MinMaxPyramid
 
 class BasePlot(QMainWindow):
+    """Base class for the viewers
+    
+    An already running QApplication, e.g. from IPython's ``%gui qt``, is 
+    reused. Data is only accessed through ``data.shape`` and slices of 
+    ``data``, so memory-mapped or other lazily loaded arrays are read only 
+    where the pyramid is built and where the top plot shows single samples.
+    """
     def __init__(self):
-        self._app = QApplication(sys.argv)
+        self._app = QApplication.instance() or QApplication(sys.argv)
         super().__init__()
         
         # Initialize the plots and layout
@@ -52,18 +60,46 @@ class BasePlot(QMainWindow):
         self.top.addItem(self._top_vLine, ignoreBounds=True)
         self.top.addItem(self._top_hLine, ignoreBounds=True)
         
+    def init_curves(self, data, picks, x0, dx):
+        """Build the min/max pyramid of the picks and one curve per pick on 
+        the top and bottom plots."""
+        self._pyramid = MinMaxPyramid(data, picks, x0=x0, dx=dx)
+        self._x_bounds = (x0, x0 + (data.shape[0] - 1) * dx)
+        self._top_curves = [self.top.plot() for _ in self.picks]
+        self._bottom_curves = [self.bottom.plot() for _ in self.picks]
+        self.update_bottom_curves()
+        self.update_top_curves()
+        
+    def update_curves(self, widget, curves, x_range, offset=0):
+        """Draw the pyramid level matching the range and width of a plot."""
+        n_pixels = widget.getPlotItem().getViewBox().width()
+        for index, curve in enumerate(curves):
+            x, y = self._pyramid.get(*x_range, n_pixels, pick=index)
+            curve.setData(x, y + index * offset)
+        
+    def update_top_curves(self):
+        self.update_curves(self.top, self._top_curves, self.region.getRegion(), 
+                           offset=1/2)
+        
+    def update_bottom_curves(self):
+        self.update_curves(self.bottom, self._bottom_curves, self._x_bounds)
+        
     def connect_signals(self):
         """Connect the signals for updating the region and plots."""
         self.region.sigRegionChanged.connect(self.update_top_plot)
         self.top.sigRangeChanged.connect(self.update_region)
+        self.top.getPlotItem().getViewBox().sigResized.connect(self.update_top_curves)
+        self.bottom.getPlotItem().getViewBox().sigResized.connect(self.update_bottom_curves)
         proxy = pg.SignalProxy(self.top.scene().sigMouseMoved, rateLimit=60, slot=self.mouse_moved)
         self.top.scene().sigMouseMoved.connect(self.mouse_moved)
         self.top.scene().sigMouseClicked.connect(self.mouse_clicked)
+        self.update_top_plot()
         
     def update_top_plot(self):
         self.region.setZValue(10)
         min_x, max_x = self.region.getRegion()
         self.top.setXRange(min_x, max_x, padding=0)    
+        self.update_top_curves()
 
     def update_region(self, window, viewRange):
         rgn = viewRange[0]
@@ -95,14 +131,39 @@ class BasePlot(QMainWindow):
         """Set the initial region. """
         pass
     
+    def open(self, block=True):
+        """Show the window
+        
+
+        Parameters
+        ----------
+        block : bool, optional
+            If True, run the Qt event loop until the window is closed. 
+            Otherwise return immediately, which requires a running event 
+            loop, e.g. ``%gui qt`` in IPython, or a later call of 
+            ``exec()``. The default is True.
+
+        """
+        self.show()
+        if block:
+            self.exec()
+            
+    def exec(self):
+        """Run the Qt event loop until the window is closed"""
+        self._app.exec()
+    
 
 class RawPlot(BasePlot):
-    def __init__(self, info, data, times, picks=None):
+    def __init__(self, info, data, times=None, picks=None, block=True):
         super().__init__()
+        if picks is None:
+            picks = list(range(data.shape[1]))
         self.picks = picks
         self.info = info
         self._data = data
         self.times = times
+        # Only the first time point is needed, data is sampled uniformly
+        self._first_time = 0. if times is None else float(times[0])
         # Plot the data
         self.plot_data()
         
@@ -113,23 +174,22 @@ class RawPlot(BasePlot):
         # Set the tick marks for the left axis of the top plot
         self.set_tick_marks()
         
-        self.show()
-        self._app.exec()
+        self.open(block=block)
     
     def plot_data(self, **kwargs):
         """Plot the data on the top and bottom plots."""
         
-        for index, p in enumerate(self.picks):
-            self.top.plot(self.times, self._data[:, p] + index/2)
-            self.bottom.plot(self.times, self._data[:, p])
+        self.init_curves(self._data, self.picks, x0=self._first_time, 
+                         dx=1/self.info['sfreq'])
     
     def set_tick_marks(self):
         """Set the tick marks for the left axis of the top plot."""
         
         ticks = []
         ch_names = np.array(self.info['ch_names'])
+        ch_min = self._pyramid.min()
         for index, chan in enumerate(ch_names[self.picks]):
-            pos_y = self._data[:, index].min() + index/2
+            pos_y = ch_min[index] + index/2
             label = chan
             ticks.append((pos_y, label))
         
@@ -139,13 +199,14 @@ class RawPlot(BasePlot):
     
     def set_initial_region(self):
         """Set the initial region to."""
-        self.region.setRegion([0, self.times.max()])
-        self.region.setBounds([0, self.times.max()])
+        self.region.setRegion(self._x_bounds)
+        self.region.setBounds(self._x_bounds)
         #self.region.setClipItem(self.bottom)
 
 
 class EpochsPlot(BasePlot):
-    def __init__(self, epochs, info, data, events, tmin, tmax, picks=None, event_id=None):
+    def __init__(self, epochs, info, data, events, tmin, tmax, picks=None, event_id=None, 
+                 block=True):
         super().__init__()
         self.picks = picks
         self.info = info
@@ -154,16 +215,19 @@ class EpochsPlot(BasePlot):
         self.tmax = tmax
         self.events = events
         self.n_times = self._data.shape[1] * self._data.shape[0]
-        time = abs(tmin) + abs(tmax)
-        self._last_time = self._data.shape[0] * time
-        self.times = np.linspace(0, self._last_time, self.n_times)
-        self.bad_epochs = np.full((1, self._data.shape[0]), False)[0]
-        #print(self.bad_epochs)
+        # epochs are laid out back to back, each as long as its samples
+        self._epoch_time = self._data.shape[1] / self.info['sfreq']
+        self._last_time = self._data.shape[0] * self._epoch_time
+        self.times = np.arange(self.n_times) / self.info['sfreq']
+        # Shared with epochs, clicks mark epochs as bad while the window is open
+        self.bad_epochs = epochs.bad_epochs
         
         self._segments = self._get_segments()
-        self._segment_boundings = self.init_segment_boxes()
+        self._bad_shading = self.init_segment_boxes()
         # Plot the data
         self.plot_data()
+        # Shade epochs already marked as bad, e.g. by reject()
+        self._update_segment_box()
         
         # Set the initial region and connect the signals for updating the region and plots
         self.set_initial_region()
@@ -172,33 +236,27 @@ class EpochsPlot(BasePlot):
         # Set the tick marks for the left axis of the top plot
         self.set_tick_marks()
         
-        self.show()
-        self._app.exec()
-        
-        # This is bad, change later
-        epochs.bad_epochs = self.bad_epochs
+        self.open(block=block)
         
     def set_initial_region(self):
         """Set the initial region to."""
-        self.region.setRegion([0, self.times.max()])
-        self.region.setBounds([0, self.times.max()])
+        self.region.setRegion(self._x_bounds)
+        self.region.setBounds(self._x_bounds)
         
     def init_segment_boxes(self):
-        """Initialize the bounding boxes of segments to track its state"""
-        bounding_boxes = []
-        
-        for segment in self._segments:
-            box = pg.LinearRegionItem(values=(segment[0], segment[1]), 
-                                      movable=False, brush=pg.mkBrush(None),
-                                      pen=pg.mkPen(None), bounds=(segment[0], segment[1]))
-            box.setZValue(10)
-            self.top.addItem(box, ignoreBounds=True)
-            bounding_boxes.append(box)
-        
-        return bounding_boxes
-    
+        """Initialize a single item shading all bad segments"""
+        shading = pg.BarGraphItem(x0=[], x1=[], y0=[], y1=[], 
+                                  brush=(0, 0, 255, 50), pen=pg.mkPen(None))
+        shading.setZValue(10)
+        self.top.addItem(shading, ignoreBounds=True)
         
-
+        return shading
+    
+    def _y_extent(self):
+        """Lower and upper bound of the stacked channels in the top plot"""
+        offsets = np.arange(len(self._pyramid.picks)) / 2
+        return ((self._pyramid.min() + offsets).min(), 
+                (self._pyramid.max() + offsets).max())
         
     def plot_data(self, **kwargs):
         """Plot the data on the top and bottom plots."""
@@ -207,33 +265,31 @@ class EpochsPlot(BasePlot):
                            self._data.shape[2]))
         
         # Plot data
-        for idx, p in enumerate(self.picks):
-            self.top.plot(self.times, data[:, p] + idx/2)
-            self.bottom.plot(self.times, data[:, p])
-        
-        # Plot seperators
-        for i, segment in enumerate(self._segments):
-            label = str(self.events[i, 1])
-            v_bar = pg.InfiniteLine(pos=segment[1], angle=90, label=label, 
-                                    labelOpts={'rotateAxis':(1,0), 'anchors':[(1,0.8),(1,0.8)], 'color':'r'})
-            self.top.addItem(v_bar)
+        self.init_curves(data, np.arange(data.shape[1]), x0=self.times[0], 
+                         dx=1. / self.info['sfreq'])
+        
+        # Plot seperators as one item of disconnected vertical lines
+        y_min, y_max = self._y_extent()
+        x = np.repeat(self._segments[:, 1], 2)
+        y = np.tile([y_min, y_max], self._segments.shape[0])
+        self._separators = pg.PlotCurveItem(x=x, y=y, connect='pairs', 
+                                            pen=pg.mkPen('r'))
+        self.top.addItem(self._separators, ignoreBounds=True)
 
         """Set the tick marks for the y-axis and x-axis of the top plot """
         
         y_ticks = []
         ch_names = np.array(self.info['ch_names'])
+        ch_min = self._pyramid.min()
         for index, chan in enumerate(ch_names[self.picks]):
-            pos_y = self._data[:, index].min() + index/2
+            pos_y = ch_min[index] + index/2
             label = chan
             y_ticks.append((pos_y, label))
         
-        x_ticks = []
+        # Epoch index and event id, the axis only draws the visible ticks
         x_tick_pos = self._get_x_tick_pos()
-        
-        for i, pos in enumerate(x_tick_pos):
-            pos_x = pos
-            label = str(i)
-            x_ticks.append((pos_x, label))
+        x_ticks = [(pos_x, f"{i}: {event}") for i, (pos_x, event) 
+                   in enumerate(zip(x_tick_pos, self.events[:, 1]))]
         
         
         self.top.getPlotItem().getAxis('left').setTicks([
@@ -253,43 +309,41 @@ class EpochsPlot(BasePlot):
         
     def _get_segments(self):
         """Get start and end points of segments"""
-        tuple_list = []
         
-        dist = abs(self.tmin) + abs(self.tmax)
-        #last_time = int(self._last_time * 1000)
+        dist = self._epoch_time
+        starts = np.arange(self._data.shape[0]) * dist
         
-        for i in np.arange(0, self._last_time, dist):
-            tuple_list.append((i, i + dist))
-        
-        segments = np.array(tuple_list)
+        segments = np.column_stack([starts, starts + dist])
         
         return segments
 
     def _get_x_tick_pos(self):
         """Get positions for tick marks on the x-axis"""
         
-        pos = []
-        for tup in self._segments:
-            value = (tup[0] + tup[1]) // 2
-            pos.append(value)
-            
-        return pos
+        return (self._segments[:, 0] + self._segments[:, 1]) / 2
+    
+    def _segment_at(self, x):
+        """Index of the segment containing x or None"""
+        dist = self._segments[0, 1] - self._segments[0, 0]
+        if dist <= 0:
+            return None
+        index = int(np.floor((x - self._segments[0, 0]) / dist))
+        if 0 <= index < self._segments.shape[0]:
+            return index
+        return None
     
     def _clicked_on_segment(self, x):
         
-        for index, segment in enumerate(self._segments):
-            if self._in_range(x, segment):
-                #print(f"Value {x} is in segment {segment} at index {index}")
-                self._update_segment_box(index)
-                self.bad_epochs[index] = not self.bad_epochs[index]
+        index = self._segment_at(x)
+        if index is not None:
+            self.bad_epochs[index] = not self.bad_epochs[index]
+            self._update_segment_box()
                 
-    def _update_segment_box(self, index):
-        
-        if not self.bad_epochs[index]:
-            self._segment_boundings[index].setBrush((0, 0, 255, 50))
-        else:
-            self._segment_boundings[index].setBrush(None)
-        
-    def _in_range(self, val, t):
-        return t[0] <= val <= t[1]
-
+    def _update_segment_box(self):
+        """Shade all bad segments"""
+        
+        bad = self._segments[self.bad_epochs]
+        y_min, y_max = self._y_extent()
+        self._bad_shading.setOpts(x0=bad[:, 0], x1=bad[:, 1], 
+                                  y0=np.full(bad.shape[0], y_min), 
+                                  y1=np.full(bad.shape[0], y_max))
@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import os
+
+import numpy as np
+
+from myopy.io.tables.tables import read_table
+from myopy.simulation import simulate_table
+
+
+def _tables(directory, n):
+    return [simulate_table(str(directory / f"{i:02d}-01.txt"), 2000, seed=i)
+            for i in range(n)]
+
+
+def _n_entries(cache_dir):
+    return len([f for f in os.listdir(cache_dir) if f.endswith('.npy')])
+
+
+def test_cached_read_equals_parsed(tmp_path):
+    params, = _tables(tmp_path, 1)
+    cache_dir = str(tmp_path / 'cache')
+    expected = read_table(**params)
+
+    for _ in range(2):
+        raw = read_table(**params, cache=True, cache_dir=cache_dir)
+        np.testing.assert_array_equal(raw._data, expected._data)
+        assert raw.info == expected.info
+
+
+def test_cache_max_bytes(tmp_path):
+    tables = _tables(tmp_path, 3)
+    limited, unlimited = str(tmp_path / 'limited'), str(tmp_path / 'unlimited')
+    for params in tables:
+        read_table(**params, cache=True, cache_dir=limited, cache_max_bytes=1)
+        read_table(**params, cache=True, cache_dir=unlimited, cache_max_bytes=None)
+
+    assert _n_entries(limited) == 1
+    assert _n_entries(unlimited) == 3
@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import numpy as np
+import pytest
+
+from myopy.catalog import Catalog
+from myopy.epochs import Epochs
+from myopy.events import find_events
+from myopy.io.tables.tables import read_table
+from myopy.simulation import simulate_table
+
+
+@pytest.fixture(scope='module')
+def study(tmp_path_factory):
+    directory = tmp_path_factory.mktemp('study')
+    for seed, name in enumerate(['01-01.txt', '02-01.txt']):
+        params = simulate_table(str(directory / name), 20000, sfreq=1000., seed=seed)
+    del params['fname']
+    return str(directory), params
+
+
+def test_epochs_match_whole_file(study):
+    directory, params = study
+    with Catalog() as catalog:
+        catalog.scan(directory, **params)
+        event_id = int(catalog.events()['event_id'].iloc[0])
+        for fname, epochs in catalog.epochs(event_id, tmin=-0.2, tmax=0.5):
+            raw = read_table(fname, **params)
+            expected = Epochs(raw, find_events(raw), event_id=[event_id],
+                              picks=[0, 1, 2, 3], tmin=-0.2, tmax=0.5)
+            np.testing.assert_array_equal(epochs._data, expected._data)
+            np.testing.assert_allclose(epochs.events, expected.events)
+
+
+def test_epochs_skip_files_with_all_epochs_rejected(study):
+    directory, params = study
+    with Catalog() as catalog:
+        catalog.scan(directory, **params)
+        event_id = catalog.events()['event_id'].unique().tolist()
+        with pytest.warns(UserWarning, match='were rejected'):
+            assert list(catalog.epochs(event_id, tmin=0, tmax=0.5,
+                                       reject=dict(flat=1e9))) == []
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import numpy as np
+import pytest
+
+from myopy.io.base import BaseRaw
+from myopy.io.compressed import read_compressed, write_compressed
+from myopy.simulation import simulate_raw
+
+
+def _raw():
+    """Raw with decimal, binary and unquantizable channels and TTL bits"""
+    raw = simulate_raw(5000, sfreq=1000.)
+    rng = np.random.default_rng(0)
+    raw._data[:, 0] = np.round(rng.standard_normal(5000), 6)
+    raw._data[:, 1] = rng.integers(-2 ** 15, 2 ** 15, 5000) / 1024.
+    raw._data[[3, 7], 2] = [-0., np.nan]
+    raw.info._unlocked = True
+    raw.info['misc']['subject'] = '01'
+    raw.info._unlocked = False
+    return raw
+
+
+def _assert_same(a, b):
+    np.testing.assert_array_equal(a.view(np.int64), b.view(np.int64))
+
+
+@pytest.mark.parametrize('codec', ['zlib', 'lzma'])
+def test_round_trip_is_lossless(tmp_path, codec):
+    raw = _raw()
+    fname = str(tmp_path / 'raw.myz')
+    ratio = write_compressed(raw, fname, chunk_size=1000, codec=codec)
+    back = read_compressed(fname)
+
+    assert isinstance(back, BaseRaw)
+    assert ratio > 1
+    _assert_same(back._data, raw._data)
+    assert back.info == raw.info
+    assert back.info['chs'] == raw.info['chs']
+    assert back.info['misc'] == raw.info['misc']
+
+
+@pytest.mark.parametrize('codec', ['zlib', 'lzma'])
+def test_time_range_and_picks(tmp_path, codec):
+    raw = _raw()
+    fname = str(tmp_path / 'raw.myz')
+    write_compressed(raw, fname, chunk_size=1000, codec=codec)
+    part = read_compressed(fname, tmin=1.5, tmax=2.2, picks=[1, 5])
+
+    _assert_same(part._data, np.ascontiguousarray(raw._data[1500:2201][:, [1, 5]]))
+    assert part.first_samp == 1500
+    assert part.info['ch_names'] == (raw.info['ch_names'][1], raw.info['ch_names'][5])
+    assert part.info['sfreq'] == raw.info['sfreq']
@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import numpy as np
+
+from myopy.dataset import EpochsDataset, batch_iter
+
+
+def _dataset(n=103):
+    # every sample holds its own index
+    data = np.broadcast_to(np.arange(n, dtype=np.float64)[:, None, None], (n, 5, 2))
+    return EpochsDataset(data, labels=np.arange(n))
+
+
+def _pass(dataset, **kwargs):
+    batches = list(batch_iter(dataset, batch_size=10, **kwargs))
+    for X, y in batches:
+        assert X.dtype == np.float32 and X.flags.c_contiguous
+        np.testing.assert_array_equal(X[:, 0, 0], y)
+    return np.concatenate([y for _, y in batches]), [len(y) for _, y in batches]
+
+
+def test_batch_iter_is_deterministic_and_covers_every_epoch_once():
+    dataset = _dataset()
+
+    order, sizes = _pass(dataset, seed=3)
+    np.testing.assert_array_equal(np.sort(order), np.arange(103))
+    assert sizes == [10] * 10 + [3]
+
+    # the same seed gives the same order, with and without prefetching
+    np.testing.assert_array_equal(_pass(dataset, seed=3)[0], order)
+    np.testing.assert_array_equal(_pass(dataset, seed=3, n_prefetch=0)[0], order)
+    assert not np.array_equal(_pass(dataset, seed=4)[0], order)
+
+    np.testing.assert_array_equal(_pass(dataset, shuffle=False)[0], np.arange(103))
+    order, sizes = _pass(dataset, seed=3, drop_last=True)
+    assert sizes == [10] * 10 and np.unique(order).size == 100
@@ -0,0 +1,30 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import numpy as np
+import pytest
+
+from myopy.emg.envelope import EnvelopeStream, envelope
+from myopy.filter import design_filter
+
+
+@pytest.mark.parametrize('method', ['rms', 'mav', 'lowpass'])
+def test_stream_matches_envelope(method):
+    rng = np.random.default_rng(0)
+    data = rng.standard_normal((20000, 3))
+    params = dict(window=150) if method != 'lowpass' else dict(sos=design_filter(1000., h_freq=10.))
+    expected = envelope(data, method=method, chunk_size=data.shape[0], **params)
+
+    stream = EnvelopeStream(method, data.shape[1], **params)
+    sizes = rng.integers(0, 400, size=200)
+    # blocks shorter than the window, empty and single samples
+    sizes[:4] = [1, 0, 3, 149]
+    bounds = np.concatenate([[0], np.cumsum(sizes)[np.cumsum(sizes) < data.shape[0]],
+                             [data.shape[0]]])
+    out = np.concatenate([stream.process(data[lo:hi])
+                          for lo, hi in zip(bounds[:-1], bounds[1:])])
+
+    if method == 'lowpass':
+        np.testing.assert_array_equal(out, expected)
+    else:
+        # running sums of other blocks round differently
+        np.testing.assert_allclose(out, expected, rtol=1e-10, atol=1e-12)
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import numpy as np
+
+from myopy.epochs import REJECT_FLAT, REJECT_PEAK_TO_PEAK, Epochs
+from myopy.simulation import simulate_raw
+
+
+def _epochs():
+    raw = simulate_raw(20000, sfreq=1000.)
+    events = np.column_stack([np.arange(1., 17.), np.tile([1, 2], 8)])
+    return Epochs(raw, events, picks=[0, 1, 2, 3], tmin=0, tmax=0.5)
+
+
+def test_drop_bads_of_parent_keeps_view_data():
+    epo = _epochs()
+    child = epo[2:6]
+    expected = child._data.copy()
+
+    epo.bad_epochs[0] = True
+    epo.drop_bads()
+
+    np.testing.assert_array_equal(child._data, expected)
+    np.testing.assert_array_equal(epo._data[1:5], expected)
+
+
+def test_drop_bads_of_view_keeps_parent_data():
+    epo = _epochs()
+    expected = epo._data.copy()
+    child = epo[2:6]
+
+    child.bad_epochs[0] = True
+    child.drop_bads()
+
+    np.testing.assert_array_equal(epo._data, expected)
+    np.testing.assert_array_equal(child._data, expected[3:6])
+
+
+def test_drop_bads_compacts_unshared_data():
+    epo = _epochs()
+    expected = epo._data.copy()
+    buffer = epo._data
+
+    epo.bad_epochs[[0, 5, 6]] = True
+    epo.drop_bads()
+
+    keep = np.setdiff1d(np.arange(16), [0, 5, 6])
+    np.testing.assert_array_equal(epo._data, expected[keep])
+    assert np.shares_memory(epo._data, buffer)
+
+
+def test_epoch_length_has_no_floating_point_error():
+    raw = simulate_raw(5000, sfreq=1000.)
+    events = np.array([[1., 1], [2., 1]])
+    epo = Epochs(raw, events, picks=[0, 1], tmin=0.1, tmax=0.3)
+
+    assert epo._data.shape[1] == 201
+    np.testing.assert_array_equal(epo._data[0], raw._data[1100:1301, :2])
+
+
+def test_reject_marks_and_drops_epochs_over_threshold():
+    raw = simulate_raw(20000, sfreq=1000.)
+    # artifacts in the epochs of the events at 3 s (EMG2) and 10 s (EMG4)
+    raw._data[3100, 1] = 10.
+    raw._data[10200, 3] = -10.
+    # a flat channel in the epoch of the event at 6 s
+    raw._data[6000:6501, 0] = 0.
+    events = np.column_stack([np.arange(1., 17.), np.tile([1, 2], 8)])
+    epo = Epochs(raw, events, picks=[0, 1, 2, 3], tmin=0, tmax=0.5)
+
+    epo.reject(peak_to_peak=5., flat=1e-3)
+
+    np.testing.assert_array_equal(np.flatnonzero(epo.bad_epochs), [2, 5, 9])
+    assert epo.reject_log[2].tolist() == [0, REJECT_PEAK_TO_PEAK, 0, 0]
+    assert epo.reject_log[5].tolist() == [REJECT_FLAT, 0, 0, 0]
+    assert epo.reject_log[9].tolist() == [0, 0, 0, REJECT_PEAK_TO_PEAK]
+    assert not epo.reject_log[~epo.bad_epochs].any()
+
+    epo.drop_bads()
+    assert len(epo) == 13
+    np.testing.assert_array_equal(epo.dropped_events[:, 0], [3., 6., 10.])
+    np.testing.assert_array_equal(epo.dropped_log[:, 1], [REJECT_PEAK_TO_PEAK, 0, 0])
+
+    # rejected when created from raw, the epochs are not extracted
+    direct = Epochs(raw, events, picks=[0, 1, 2, 3], tmin=0, tmax=0.5,
+                    reject=dict(peak_to_peak=5., flat=1e-3))
+    np.testing.assert_array_equal(direct._data, epo._data)
+    np.testing.assert_array_equal(direct.dropped_events, epo.dropped_events)
+    np.testing.assert_array_equal(direct.dropped_log, epo.dropped_log)
@@ -0,0 +1,22 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import json
+import subprocess
+import sys
+
+import pytest
+
+_CODE = """
+import json, sys
+import {module}
+print(json.dumps(sorted(m for m in sys.modules
+                        if m.split('.')[0] in ('PyQt5', 'PyQt6', 'pyqtgraph', 'scipy'))))
+"""
+
+
+@pytest.mark.parametrize('module', ['myopy', 'myopy.io.tables', 'myopy.epochs',
+                                    'myopy.pipeline', 'myopy.catalog'])
+def test_import_does_not_load_gui_or_scipy(module):
+    out = subprocess.run([sys.executable, '-c', _CODE.format(module=module)],
+                         check=True, capture_output=True, text=True).stdout
+    assert json.loads(out.strip().splitlines()[-1]) == []
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import numpy as np
+import pytest
+
+from myopy import kernels
+from myopy.algorithms.detection import kang_onset_detection
+from myopy.emg.envelope import envelope
+from myopy.simulation import simulate_raw
+
+pytest.importorskip('numba')
+
+
+@pytest.fixture(autouse=True)
+def reset_backend():
+    yield
+    kernels.set_backend(None)
+
+
+def _both(func):
+    """Results of func with the NumPy and the Numba backend"""
+    results = []
+    for backend in ('numpy', 'numba'):
+        kernels.set_backend(backend)
+        results.append(func())
+    return results
+
+
+@pytest.mark.parametrize('n_times', [100, 10 ** 4])
+def test_kang_onset_detection_backends_equal(n_times):
+    signal = np.ascontiguousarray(simulate_raw(n_times)._data[:, 0])
+    expected, result = _both(lambda: kang_onset_detection(signal, n_train=20, n_guard=4,
+                                                          threshold=1.))
+    for a, b in zip(expected, result):
+        np.testing.assert_array_equal(a, b)
+
+
+def test_envelope_backends_equal():
+    data = np.ascontiguousarray(simulate_raw(10 ** 4)._data[:, :4])
+    expected, result = _both(lambda: envelope(data, 'rms', window=200))
+    np.testing.assert_allclose(result, expected, rtol=1e-10, atol=1e-12)
+
+
+@pytest.mark.parametrize('n_side, n_guard', [(24, 4), (3, 0), (50, 49)])
+def test_cfar_binarize_backends_equal(n_side, n_guard):
+    mvgav = np.random.default_rng(0).random(500)
+    expected, result = _both(lambda: kernels.cfar_binarize(mvgav, 490, n_side, n_guard,
+                                                           1.5, 0.8))
+    np.testing.assert_array_equal(result, expected)
+
+
+def test_binary_opening_backends_equal():
+    x = np.random.default_rng(0).random(1000) > 0.3
+    expected, result = _both(lambda: kernels.binary_opening(x))
+    np.testing.assert_array_equal(result, expected)
+
+
+def test_trailing_mean_backends_equal():
+    rng = np.random.default_rng(0)
+    values, tail = rng.random((300, 3)), rng.random((9, 3))
+    expected, result = _both(lambda: kernels.trailing_mean(values, tail, 50, 10))
+    np.testing.assert_allclose(result, expected, rtol=1e-12)
@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import numpy as np
+import pandas as pd
+import pytest
+
+from myopy.normalize import Normalizer
+
+
+def _features():
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({'class': np.repeat([1, 2], 25),
+                         'MAV1': rng.uniform(1, 2, 50),
+                         'MAV2': rng.uniform(3, 5, 50)})
+
+
+@pytest.mark.parametrize('method', ['zscore', 'mvc'])
+def test_fit_transform_features_data_frame(method):
+    df = _features()
+    normalized = Normalizer(method).fit(df).transform(df)
+
+    values = df[['MAV1', 'MAV2']].to_numpy()
+    expected = Normalizer(method).fit_transform(values)
+    np.testing.assert_allclose(normalized[['MAV1', 'MAV2']].to_numpy(), expected)
+    np.testing.assert_array_equal(normalized['class'], df['class'])
+
+
+def test_partial_fit_features_data_frame():
+    df = _features()
+    normalizer = Normalizer().partial_fit(df[:20]).partial_fit(df[20:])
+
+    values = df[['MAV1', 'MAV2']].to_numpy()
+    np.testing.assert_allclose(normalizer.loc, values.mean(axis=0))
+    np.testing.assert_allclose(normalizer.scale, values.std(axis=0))
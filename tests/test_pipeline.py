@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import numpy as np
+
+from myopy.epochs import Epochs
+from myopy.pipeline import Pipeline
+from myopy.simulation import simulate_raw
+
+
+def test_cached_epochs_follow_in_place_changes_of_raw():
+    raw = simulate_raw(20000, sfreq=1000.)
+    events = np.column_stack([np.arange(1., 17.), np.tile([1, 2], 8)])
+    pipe = Pipeline(raw).epochs(events, event_id=[1, 2], picks=[0, 1], tmin=0, tmax=0.5)
+
+    before = pipe.run()._data.copy()
+    raw.normalize()
+    after = pipe.run()._data
+
+    assert not np.allclose(before, after)
+    np.testing.assert_allclose(after[0], raw._data[1000:1501, :2])
+
+
+def test_epochs_match_epochs_at_fractional_times():
+    raw = simulate_raw(20000, sfreq=1000.)
+    events = np.column_stack([np.arange(1., 17.), np.tile([1, 2], 8)])
+    # (0.3 - 0.1) * 1000 is 199.99999999999997
+    epo = Epochs(raw, events, event_id=[1, 2], picks=[0, 1], tmin=0.1, tmax=0.3)
+    result = Pipeline(raw).epochs(events, event_id=[1, 2], picks=[0, 1],
+                                  tmin=0.1, tmax=0.3).run()
+
+    assert result._data.shape == (16, 201, 2)
+    np.testing.assert_array_equal(result._data, epo._data)
+    np.testing.assert_array_equal(result.times, epo.times)
+    assert result.to_data_frame().shape == epo.to_data_frame().shape
+
+
+def test_drop_bads_keeps_cached_epochs():
+    raw = simulate_raw(20000, sfreq=1000.)
+    events = np.column_stack([np.arange(1., 17.), np.tile([1, 2], 8)])
+    pipe = Pipeline(raw, cache=True).epochs(events, event_id=[1, 2], picks=[0, 1],
+                                            tmin=0, tmax=0.5)
+
+    first = pipe.run()
+    expected = first._data.copy()
+    first.bad_epochs[[0, 3]] = True
+    first.drop_bads()
+
+    np.testing.assert_array_equal(first._data, np.delete(expected, [0, 3], axis=0))
+    np.testing.assert_array_equal(pipe.run()._data, expected)
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import os
+
+import numpy as np
+import pytest
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+pytest.importorskip('PyQt5')
+pytest.importorskip('pyqtgraph')
+
+from myopy.epochs import Epochs
+from myopy.simulation import simulate_raw
+
+
+def test_raw_plot_opens():
+    raw = simulate_raw(20000, sfreq=1000.)
+    plot = raw.plot(picks=[0, 1, 2, 3], block=False)
+
+    assert plot.isVisible()
+    plot.close()
+
+
+def test_epochs_plot_opens_with_bad_epochs():
+    raw = simulate_raw(20000, sfreq=1000.)
+    events = np.column_stack([np.arange(1., 17.), np.tile([1, 2], 8)])
+    epo = Epochs(raw, events, picks=[0, 1, 2, 3], tmin=0, tmax=0.5)
+    epo.bad_epochs[[1, 4]] = True
+    plot = epo.plot(block=False)
+
+    assert plot.isVisible()
+    assert plot.bad_epochs is epo.bad_epochs
+    plot.close()
+
+
+def test_pyramid_levels_match_data():
+    from myopy.viz.lod import MinMaxPyramid
+
+    data = np.random.default_rng(0).standard_normal((10001, 3))
+    pyramid = MinMaxPyramid(data, picks=[0, 2], factor=4, first_level=3, chunk_size=1000)
+    # only the levels from blocks of 64 samples on are kept
+    assert sum(mins.nbytes + maxs.nbytes for mins, maxs in pyramid._levels) < data.nbytes / 16
+
+    for level in range(1, pyramid.n_levels - 1):
+        size = pyramid.block_size(level)
+        n_blocks = -(-data.shape[0] // size)
+        n_pixels = data.shape[0] // size
+        assert pyramid.select_level(0, data.shape[0], n_pixels) == level
+        x, y = pyramid.get(0, data.shape[0], n_pixels, pick=1)
+        padded = np.full(n_blocks * size, np.nan)
+        padded[:data.shape[0]] = data[:, 2]
+        blocks = padded.reshape(n_blocks, size)
+        np.testing.assert_array_equal(y[0::2], np.nanmin(blocks, axis=1))
+        np.testing.assert_array_equal(y[1::2], np.nanmax(blocks, axis=1))
+        np.testing.assert_array_equal(x[0::2], np.arange(n_blocks) * size)
+
+    np.testing.assert_array_equal(pyramid.min(), data[:, [0, 2]].min(axis=0))
+    np.testing.assert_array_equal(pyramid.max(), data[:, [0, 2]].max(axis=0))
+
+
+def test_epochs_ticks_at_segment_centers():
+    raw = simulate_raw(20000, sfreq=1000.)
+    events = np.column_stack([np.arange(1., 6.), np.ones(5)])
+    epo = Epochs(raw, events, picks=[0, 1], tmin=0, tmax=0.25)
+    plot = epo.plot(block=False)
+
+    # 251 samples per epoch, the centers are not whole seconds
+    np.testing.assert_allclose(plot._get_x_tick_pos(), (np.arange(5) + 0.5) * 0.251)
+    plot.close()
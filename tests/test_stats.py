@@ -0,0 +1,24 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import numpy as np
+
+from myopy.stats import RunningStats
+
+
+def test_merge_matches_concatenated_data():
+    rng = np.random.default_rng(0)
+    # a large offset makes naive sums of squares lose precision
+    batches = [1e4 + rng.standard_normal((n, 501, 4)) for n in (1, 7, 0, 30, 12)]
+    data = np.concatenate(batches)
+
+    workers = [RunningStats(), RunningStats()]
+    for i, batch in enumerate(batches):
+        workers[i % 2].update(batch)
+    stats = workers[0] + workers[1]
+
+    assert stats.n == data.shape[0]
+    np.testing.assert_allclose(stats.mean, data.mean(axis=0), rtol=1e-12)
+    np.testing.assert_allclose(stats.var, data.var(axis=0, ddof=1), rtol=1e-9)
+    # merging into an empty instance and merging an empty instance
+    merged = RunningStats().merge(workers[0]).merge(RunningStats()).merge(workers[1])
+    np.testing.assert_allclose(merged.var, stats.var, rtol=1e-12)
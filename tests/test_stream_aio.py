@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import asyncio
+
+import numpy as np
+import pytest
+
+from myopy.emg.features import _FEATURES
+from myopy.stream.aio import buffered, feature_blocks
+
+
+async def _blocks(data, block_size):
+    for start in range(0, data.shape[0], block_size):
+        yield data[start:start + block_size]
+
+
+async def _collect(source):
+    return [block async for block in source]
+
+
+@pytest.mark.parametrize('window, step, block_size', [(4, 10, 7), (4, 2, 7),
+                                                      (5, 5, 3), (3, 17, 40)])
+def test_feature_blocks_match_offline_windows(window, step, block_size):
+    rng = np.random.default_rng(0)
+    data = rng.standard_normal((203, 2))
+
+    values = asyncio.run(_collect(feature_blocks(
+        _blocks(data, block_size), window, step=step, features=['MAV', 'WL'])))
+    values = np.concatenate(values)
+
+    starts = np.arange(0, data.shape[0] - window + 1, step)
+    windows = data[starts[:, None] + np.arange(window)]
+    expected = np.concatenate([_FEATURES['MAV'](windows), _FEATURES['WL'](windows)],
+                              axis=1)
+    np.testing.assert_allclose(values, expected)
+
+
+def test_buffered_producer_stops_with_full_queue():
+    async def main():
+        data = np.zeros((100, 1))
+        source = buffered(_blocks(data, 1), maxsize=2)
+        await source.__anext__()
+        # let the producer fill the queue, then stop consuming
+        await asyncio.sleep(0.01)
+        await source.aclose()
+        await asyncio.sleep(0.01)
+        return [t for t in asyncio.all_tasks()
+                if t is not asyncio.current_task() and not t.done()]
+
+    assert asyncio.run(main()) == []
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+import numpy as np
+import pytest
+
+from myopy.emg.transformer import EMGFeatureTransformer
+
+pytest.importorskip('sklearn')
+
+
+def _data(n_epochs=60):
+    rng = np.random.default_rng(0)
+    y = np.tile([1, 2], n_epochs // 2)
+    # class 2 has twice the amplitude on the first channel
+    X = rng.standard_normal((n_epochs, 200, 3))
+    X[y == 2, :, 0] *= 2
+    return X, y
+
+
+def test_cross_validated_pipeline():
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.model_selection import cross_val_score
+    from sklearn.pipeline import make_pipeline
+    from sklearn.preprocessing import StandardScaler
+
+    X, y = _data()
+    clf = make_pipeline(EMGFeatureTransformer(['MAV', 'RMS']), StandardScaler(),
+                        LogisticRegression())
+    scores = cross_val_score(clf, X, y, cv=3)
+
+    assert scores.shape == (3,)
+    assert scores.mean() > 0.9
+    clf.fit(X, y)
+    assert clf[:-1].get_feature_names_out().tolist() == \
+        ['MAV1', 'MAV2', 'MAV3', 'RMS1', 'RMS2', 'RMS3']
+
+
+def test_transform_checks_channels_of_fit():
+    X, y = _data()
+    transformer = EMGFeatureTransformer(['MAV']).fit(X, y)
+
+    assert transformer.transform(X).shape == (60, 3)
+    with pytest.raises(RuntimeError, match='fitted with 3'):
+        transformer.transform(X[:, :, :2])
+    # stateless, usable without fit
+    assert EMGFeatureTransformer(['MAV']).transform(X[:, :, :2]).shape == (60, 2)